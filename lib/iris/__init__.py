@@ -126,8 +126,8 @@ __version__ = '1.12.0-DEV'
 
 # Restrict the names imported when using "from iris import *"
 __all__ = ['load', 'load_cube', 'load_cubes', 'load_raw',
-           'save', 'Constraint', 'AttributeConstraint', 'sample_data_path',
-           'site_configuration', 'Future', 'FUTURE',
+           'save', 'Constraint', 'AttributeConstraint', 'Range', 'OneOf',
+           'sample_data_path', 'site_configuration', 'Future', 'FUTURE',
            'IrisDeprecation']
 
 
@@ -138,6 +138,8 @@ if iris.config.IMPORT_LOGGER:
 
 Constraint = iris._constraints.Constraint
 AttributeConstraint = iris._constraints.AttributeConstraint
+Range = iris._constraints.Range
+OneOf = iris._constraints.OneOf
 
 
 class Future(threading.local):
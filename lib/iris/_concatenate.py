@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2013 - 2016, Met Office
+# (C) British Crown Copyright 2013 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -23,6 +23,7 @@ from __future__ import (absolute_import, division, print_function)
 from six.moves import (filter, input, map, range, zip)  # noqa
 import six
 
+import bisect
 from collections import defaultdict, namedtuple
 from copy import deepcopy
 
@@ -31,6 +32,7 @@ import numpy as np
 
 import iris.coords
 import iris.cube
+import iris._merge
 from iris.util import guess_coord_axis, array_equal, unify_time_units
 
 
@@ -256,6 +258,7 @@ def concatenate(cubes, error_on_mismatch=False, check_aux_coords=True):
 
     """
     proto_cubes_by_name = defaultdict(list)
+    proto_cubes_by_key = defaultdict(list)
     # Initialise the nominated axis (dimension) of concatenation
     # which requires to be negotiated.
     axis = None
@@ -264,10 +267,17 @@ def concatenate(cubes, error_on_mismatch=False, check_aux_coords=True):
     for cube in cubes:
         name = cube.standard_name or cube.long_name
         proto_cubes = proto_cubes_by_name[name]
+        key = iris._merge.signature_key(cube, exact_shape=False)
+        candidates = proto_cubes_by_key[key]
         registered = False
 
+        # Only the proto-cubes with a matching signature key can accept
+        # the cube, unless the reason for a mismatch must be reported.
+        if error_on_mismatch:
+            candidates = proto_cubes
+
         # Register cube with an existing proto-cube.
-        for proto_cube in proto_cubes:
+        for proto_cube in candidates:
             registered = proto_cube.register(cube, axis, error_on_mismatch,
                                              check_aux_coords)
             if registered:
@@ -276,7 +286,9 @@ def concatenate(cubes, error_on_mismatch=False, check_aux_coords=True):
 
         # Create a new proto-cube for an unregistered cube.
         if not registered:
-            proto_cubes.append(_ProtoCube(cube))
+            proto_cube = _ProtoCube(cube)
+            proto_cubes.append(proto_cube)
+            proto_cubes_by_key[key].append(proto_cube)
 
     # Construct a concatenated cube from each of the proto-cubes.
     concatenated_cubes = iris.cube.CubeList()
@@ -298,6 +310,34 @@ def concatenate(cubes, error_on_mismatch=False, check_aux_coords=True):
     return concatenated_cubes
 
 
+def _ascending(lower, upper):
+    """
+    Determine whether the extent `lower` lies strictly before the extent
+    `upper`, in terms of both the points and any bounds.
+
+    Args:
+
+    * lower:
+        The :class:`_CoordExtent` that is first in ascending order.
+
+    * upper:
+        The :class:`_CoordExtent` that is second in ascending order.
+
+    Returns:
+        Boolean.
+
+    """
+    # Check the points - must be strictly monotonic.
+    result = lower.points.max < upper.points.min
+
+    # Check the bounds - must be strictly monotonic.
+    if result and upper.bounds is not None:
+        result = (lower.bounds[0].max < upper.bounds[0].min and
+                  lower.bounds[1].max < upper.bounds[1].min)
+
+    return result
+
+
 class _CubeSignature(object):
     """
     Template for identifying a specific type of :class:`iris.cube.Cube` based
@@ -623,6 +663,10 @@ class _ProtoCube(object):
         self._skeletons = []
         self._add_skeleton(self._coord_signature, cube.lazy_data())
 
+        # The ascending extents of the source-cubes, for the candidate
+        # axis of concatenation.
+        self._dim_extents = {}
+
         # The nominated axis of concatenation.
         self._axis = None
 
@@ -739,6 +783,8 @@ class _ProtoCube(object):
         if match:
             # Register the cube as a source-cube for this proto-cube.
             self._add_skeleton(coord_signature, cube.lazy_data())
+            bisect.insort(self._sorted_extents(candidate_axis),
+                          coord_signature.dim_extents[candidate_axis])
             # Declare the nominated axis of concatenation.
             self._axis = candidate_axis
 
@@ -896,6 +942,10 @@ class _ProtoCube(object):
         this :class:`_ProtoCube` into non-overlapping segments for the
         given axis.
 
+        The extents already registered are held in ascending order, and
+        never overlap. So the new extent need only be compared with its
+        immediate neighbours in that order.
+
         Args:
 
         * extent:
@@ -908,50 +958,26 @@ class _ProtoCube(object):
             Boolean.
 
         """
-        result = True
-
-        # Add the new extent to the current extents collection.
-        dim_extents = [skeleton.signature.dim_extents[axis]
-                       for skeleton in self._skeletons]
-        dim_extents.append(extent)
-
-        # Sort into the appropriate dimension order.
-        order = self._coord_signature.dim_order[axis]
-        dim_extents.sort(reverse=(order == _DECREASING))
+        dim_extents = self._sorted_extents(axis)
+        index = bisect.bisect(dim_extents, extent)
 
         # Ensure that the extents don't overlap.
-        if len(dim_extents) > 1:
-            for i, extent in enumerate(dim_extents[1:]):
-                # Check the points - must be strictly monotonic.
-                if order == _DECREASING:
-                    big = dim_extents[i].points.min
-                    small = extent.points.max
-                else:
-                    small = dim_extents[i].points.max
-                    big = extent.points.min
-
-                if small >= big:
-                    result = False
-                    break
-
-                # Check the bounds - must be strictly monotonic.
-                if extent.bounds is not None:
-                    if order == _DECREASING:
-                        big_0 = dim_extents[i].bounds[0].min
-                        big_1 = dim_extents[i].bounds[1].min
-                        small_0 = extent.bounds[0].max
-                        small_1 = extent.bounds[1].max
-                    else:
-                        small_0 = dim_extents[i].bounds[0].max
-                        small_1 = dim_extents[i].bounds[1].max
-                        big_0 = extent.bounds[0].min
-                        big_1 = extent.bounds[1].min
-
-                    lower_bound_fail = small_0 >= big_0
-                    upper_bound_fail = small_1 >= big_1
-
-                    if lower_bound_fail or upper_bound_fail:
-                        result = False
-                        break
+        result = True
+        if index > 0:
+            result = _ascending(dim_extents[index - 1], extent)
+        if result and index < len(dim_extents):
+            result = _ascending(extent, dim_extents[index])
 
         return result
+
+    def _sorted_extents(self, axis):
+        """
+        Returns the extents of the registered source-cubes for the given
+        axis, in ascending order.
+
+        """
+        if axis not in self._dim_extents:
+            dim_extents = sorted(skeleton.signature.dim_extents[axis]
+                                 for skeleton in self._skeletons)
+            self._dim_extents = {axis: dim_extents}
+        return self._dim_extents[axis]
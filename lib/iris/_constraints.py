@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2010 - 2016, Met Office
+# (C) British Crown Copyright 2010 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -26,10 +26,12 @@ import six
 import collections
 import operator
 
+import cf_units
 import numpy as np
 
 import iris.coords
 import iris.exceptions
+import iris.time
 
 
 class Constraint(object):
@@ -48,8 +50,9 @@ class Constraint(object):
 
         Args:
 
-        * name:   string or None
+        * name:   string, :class:`iris.OneOf` or None
             If a string, it is used as the name to match against Cube.name().
+            If a :class:`iris.OneOf`, Cube.name() must be one of its values.
         * cube_func:   callable or None
             If a callable, it must accept a Cube as its first and only argument
             and return either True or False.
@@ -77,6 +80,22 @@ class Constraint(object):
               returning True or False if the value of the Cell is desired.
               e.g. ``model_level_number=lambda cell: 5 < cell < 10``
 
+            * :class:`iris.Range` - the interval within which the coordinate
+              values must lie. e.g. ``model_level_number=iris.Range(5, 10)``
+
+            * :class:`iris.OneOf` - the possible values that the coordinate
+              may have to match. e.g. ``model_level_number=iris.OneOf(10, 12)``
+
+            Other than for arbitrary callables, the coordinate values are
+            matched without constructing a :class:`iris.coords.Cell` for
+            each point, which is much faster for long coordinates.
+
+        Names, attributes and coordinate values given as plain values,
+        lists, :class:`iris.Range` or :class:`iris.OneOf` are declarative,
+        and constraint-aware file loaders, such as those for PP and
+        FieldsFiles, use them to skip fields which cannot match before
+        any cube is built for them.
+
         The :ref:`user guide <loading_iris_cubes>` covers cube much of
         constraining in detail, however an example which uses all of the
         features of this class is given here for completeness::
@@ -92,7 +111,7 @@ class Constraint(object):
         :class:`iris.coords.Cell`.
 
         """
-        if not (name is None or isinstance(name, six.string_types)):
+        if not (name is None or isinstance(name, (six.string_types, OneOf))):
             raise TypeError('name must be None or string, got %r' % name)
         if not (cube_func is None or callable(cube_func)):
             raise TypeError('cube_func must be None or callable, got %r'
@@ -137,11 +156,42 @@ class Constraint(object):
         """
         match = True
         if self._name:
-            match = self._name == cube.name()
+            match = self._name_match(cube.name())
         if match and self._cube_func:
             match = self._cube_func(cube)
         return match
 
+    def _name_match(self, name):
+        if isinstance(self._name, OneOf):
+            result = self._name(name)
+        else:
+            result = self._name == name
+        return result
+
+    def _may_match(self, names, attributes, coords_and_dims):
+        """
+        Return whether a cube with the given metadata might match this
+        constraint, without building the cube.
+
+        Only the declarative parts of the constraint are evaluated, so a
+        result of True does not guarantee a match, but a result of False
+        guarantees that no part of the cube matches.
+
+        Args:
+
+        * names:
+            The names which the cube could have.
+        * attributes:
+            The attributes of the cube.
+        * coords_and_dims:
+            A list of (coordinate, dimensions) pairs for the cube.
+
+        """
+        if self._name and not any(self._name_match(name) for name in names):
+            return False
+        return all(coord_constraint._may_match(coords_and_dims)
+                   for coord_constraint in self._coord_constraints)
+
     def extract(self, cube):
         """
         Return the subset of the given cube which matches this constraint,
@@ -213,6 +263,15 @@ class ConstraintCombination(Constraint):
         return self.operator(self.lhs._CIM_extract(cube),
                              self.rhs._CIM_extract(cube))
 
+    def _may_match(self, names, attributes, coords_and_dims):
+        result = True
+        if self.operator is operator.__and__:
+            result = (self.lhs._may_match(names, attributes,
+                                          coords_and_dims) and
+                      self.rhs._may_match(names, attributes,
+                                          coords_and_dims))
+        return result
+
 
 class _CoordConstraint(object):
     """Represents the atomic elements which might build up a Constraint."""
@@ -287,13 +346,197 @@ class _CoordConstraint(object):
             if coord.cell(i) == self._coord_thing:
                 r[i] = True
         else:
-            r = np.array([call_func(cell) for cell in coord.cells()])
+            r = self._array_match(coord)
+            if r is None:
+                r = np.array([call_func(cell) for cell in coord.cells()])
         if dims:
             cube_cim[dims[0]] = r
         elif not all(r):
             cube_cim.all_false()
         return cube_cim
 
+    def _may_match(self, coords_and_dims):
+        """
+        Return whether a cube with the given coordinates might have
+        points which match the constraint.
+
+        """
+        for coord, dims in coords_and_dims:
+            if coord.name() == self.coord_name:
+                break
+        else:
+            # The coordinate may yet be provided by an aux factory.
+            return True
+        result = True
+        if len(dims) <= 1:
+            r = self._array_match(coord)
+            if r is not None:
+                result = bool(r.any() if dims else r.all())
+        return result
+
+    def _array_match(self, coord):
+        """
+        Returns the boolean array of the points of the coordinate which
+        match the constraint, as calculated from the points and bounds
+        arrays, or None if the constraint cannot be evaluated this way.
+
+        """
+        thing = self._coord_thing
+        if isinstance(thing, Range):
+            values = [value for value in (thing.minimum, thing.maximum)
+                      if value is not None]
+        elif isinstance(thing, OneOf):
+            values = thing = list(thing.values)
+        elif callable(thing):
+            return None
+        elif (isinstance(thing, collections.Iterable) and
+                not isinstance(thing, (six.string_types, iris.coords.Cell))):
+            values = thing = list(thing)
+        else:
+            values = [thing]
+
+        if iris.FUTURE.cell_datetime_objects and \
+                coord.units.is_time_reference():
+            # The cells are datetimes, which can only be matched with
+            # partial datetimes when they are unbounded.
+            if coord.has_bounds() or not all(
+                    isinstance(value, iris.time.PartialDateTime) and
+                    value.microsecond is None for value in values):
+                return None
+            components = _date_components(coord)
+
+            def compare(op, value):
+                return _compare_date_components(components, op, value)
+        else:
+            if coord.points.dtype.kind not in 'biuf' or not all(
+                    isinstance(value, (six.integer_types, float, np.number))
+                    for value in values):
+                return None
+            points = coord.points
+            bounds = coord.bounds
+            if any(isinstance(value, (float, np.floating))
+                   for value in values):
+                # As for iris.coords.Cell, compare floats in at least double
+                # precision, rather than in that of the points.
+                dtype = np.promote_types(points.dtype, np.float64)
+                points = points.astype(dtype)
+                if bounds is not None:
+                    bounds = bounds.astype(dtype)
+            if bounds is not None:
+                lower = bounds.min(axis=-1)
+                upper = bounds.max(axis=-1)
+
+            def compare(op, value):
+                # Follow the comparison rules of iris.coords.Cell, where a
+                # bounded cell is equal to any value within its bounds.
+                if bounds is None:
+                    result = op(points, value)
+                elif op is operator.eq:
+                    result = (lower <= value) & (value <= upper)
+                elif op in (operator.gt, operator.le):
+                    result = op(lower, value)
+                else:
+                    result = op(upper, value)
+                return result
+
+        if isinstance(thing, Range):
+            result = np.ones(coord.shape, dtype=bool)
+            if thing.minimum is not None:
+                op = operator.ge if thing.min_inclusive else operator.gt
+                result &= compare(op, thing.minimum)
+            if thing.maximum is not None:
+                op = operator.le if thing.max_inclusive else operator.lt
+                result &= compare(op, thing.maximum)
+        elif isinstance(thing, list):
+            result = np.zeros(coord.shape, dtype=bool)
+            for value in thing:
+                result |= compare(operator.eq, value)
+        else:
+            result = compare(operator.eq, thing)
+        return result
+
+
+#: The calendar components of a datetime, in order of significance.
+_DATE_FIELDS = ('year', 'month', 'day', 'hour', 'minute', 'second')
+
+#: The start of the Gregorian part of the mixed Julian/Gregorian calendar,
+#: in seconds since 1970-01-01.
+_GREGORIAN_START = -12219292800
+
+
+def _date_components(coord):
+    """
+    Returns a dictionary of the integer arrays of each calendar component
+    of the points of the time coordinate.
+
+    """
+    points = coord.points
+    units = coord.units
+    calendar = units.calendar
+    if calendar in (cf_units.CALENDAR_GREGORIAN, cf_units.CALENDAR_STANDARD,
+                    cf_units.CALENDAR_PROLEPTIC_GREGORIAN):
+        epoch = cf_units.Unit('seconds since 1970-01-01', calendar=calendar)
+        seconds = units.convert(np.asarray(points, dtype=np.float64), epoch)
+        if calendar == cf_units.CALENDAR_PROLEPTIC_GREGORIAN or \
+                not seconds.size or seconds.min() >= _GREGORIAN_START:
+            # Derive the components with numpy datetime arithmetic,
+            # which uses the proleptic Gregorian calendar.
+            microseconds = np.round(seconds * 1e6).astype(np.int64)
+            dates = np.datetime64('1970-01-01', 'us') + \
+                microseconds.astype('m8[us]')
+            years = dates.astype('M8[Y]')
+            months = dates.astype('M8[M]')
+            days = dates.astype('M8[D]')
+            day_seconds = (dates - days).astype(np.int64) // 1000000
+            return {'year': years.astype(np.int64) + 1970,
+                    'month': (months - years.astype('M8[M]')).astype(
+                        np.int64) + 1,
+                    'day': (days - months.astype('M8[D]')).astype(
+                        np.int64) + 1,
+                    'hour': day_seconds // 3600,
+                    'minute': day_seconds // 60 % 60,
+                    'second': day_seconds % 60}
+
+    dates = np.asarray(units.num2date(points)).ravel()
+    return {name: np.array([getattr(date, name) for date in dates],
+                           dtype=np.int64).reshape(points.shape)
+            for name in _DATE_FIELDS}
+
+
+def _compare_date_components(components, op, partial):
+    """
+    Returns the boolean array result of comparing each datetime, given by
+    its calendar components, with the partial datetime.
+
+    The comparison is lexicographic over the fields of the partial datetime
+    which are specified, as for :class:`iris.time.PartialDateTime`.
+
+    """
+    shape = components['year'].shape
+    # Where the partial datetime is greater than the datetime.
+    greater = np.zeros(shape, dtype=bool)
+    # Where a specified field of the partial datetime differs.
+    differ = np.zeros(shape, dtype=bool)
+    for name in _DATE_FIELDS:
+        value = getattr(partial, name)
+        if value is not None:
+            component = components[name]
+            first = ~differ & (component != value)
+            greater |= first & (component < value)
+            differ |= first
+
+    if op is operator.eq:
+        result = ~differ
+    elif op is operator.lt:
+        result = greater
+    elif op is operator.le:
+        result = greater | ~differ
+    elif op is operator.gt:
+        result = differ & ~greater
+    else:
+        result = ~greater
+    return result
+
 
 class _ColumnIndexManager(object):
     """
@@ -436,6 +679,93 @@ def as_constraint(thing):
         raise TypeError('%r cannot be cast to a constraint.' % thing)
 
 
+class Range(object):
+    """
+    The interval of coordinate values to be matched by a :class:`Constraint`.
+
+    """
+    def __init__(self, minimum=None, maximum=None, min_inclusive=True,
+                 max_inclusive=False):
+        """
+        Example usage::
+
+            iris.Constraint(latitude=iris.Range(-30, 30))
+
+            iris.Constraint(time=iris.Range(PartialDateTime(month=6),
+                                            PartialDateTime(month=9)))
+
+        Kwargs:
+
+        * minimum:
+            The lower limit of the values, or None for no lower limit.
+        * maximum:
+            The upper limit of the values, or None for no upper limit.
+        * min_inclusive:
+            Whether the lower limit is itself matched. Defaults to True.
+        * max_inclusive:
+            Whether the upper limit is itself matched. Defaults to False.
+
+        A range matches a :class:`iris.coords.Cell` in the same way as the
+        equivalent comparison function, e.g. ``lambda cell: -30 <= cell <
+        30``, but is evaluated directly from the coordinate points and
+        bounds.
+
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.min_inclusive = min_inclusive
+        self.max_inclusive = max_inclusive
+
+    def __repr__(self):
+        return 'Range(%r, %r, min_inclusive=%r, max_inclusive=%r)' % (
+            self.minimum, self.maximum, self.min_inclusive,
+            self.max_inclusive)
+
+    def __call__(self, cell):
+        result = True
+        if self.minimum is not None:
+            if self.min_inclusive:
+                result = cell >= self.minimum
+            else:
+                result = cell > self.minimum
+        if result and self.maximum is not None:
+            if self.max_inclusive:
+                result = cell <= self.maximum
+            else:
+                result = cell < self.maximum
+        return result
+
+
+class OneOf(object):
+    """
+    The set of values to be matched by a :class:`Constraint`.
+
+    """
+    def __init__(self, *values):
+        """
+        Example usage::
+
+            iris.Constraint(model_level_number=iris.OneOf(10, 12))
+
+            iris.Constraint(name=iris.OneOf('air_temperature',
+                                            'surface_temperature'))
+
+            iris.AttributeConstraint(STASH=iris.OneOf('m01s00i004',
+                                                      'm01s16i203'))
+
+        Unlike a list of values, a set of values can be used for names and
+        attributes as well as for coordinates.
+
+        """
+        self.values = values
+
+    def __repr__(self):
+        return 'OneOf(%s)' % ', '.join(repr(value) for value in self.values)
+
+    def __call__(self, value):
+        return value in self.values
+
+
 class AttributeConstraint(Constraint):
     """Provides a simple Cube-attribute based :class:`Constraint`."""
     def __init__(self, **attributes):
@@ -447,6 +777,9 @@ class AttributeConstraint(Constraint):
             iris.AttributeConstraint(
                 STASH=lambda stash: stash.endswith('i005'))
 
+            iris.AttributeConstraint(
+                STASH=iris.OneOf('m01s16i004', 'm01s16i203'))
+
         .. note:: Attribute constraint names are case sensitive.
 
         """
@@ -454,10 +787,13 @@ class AttributeConstraint(Constraint):
         Constraint.__init__(self, cube_func=self._cube_func)
 
     def _cube_func(self, cube):
+        return self._attributes_match(cube.attributes)
+
+    def _attributes_match(self, attributes, missing_match=False):
         match = True
         for name, value in six.iteritems(self._attributes):
-            if name in cube.attributes:
-                cube_attr = cube.attributes.get(name)
+            if name in attributes:
+                cube_attr = attributes.get(name)
                 # if we have a callable, then call it with the value,
                 # otherwise, assert equality
                 if callable(value):
@@ -468,10 +804,15 @@ class AttributeConstraint(Constraint):
                     if cube_attr != value:
                         match = False
                         break
-            else:
+            elif not missing_match:
                 match = False
                 break
         return match
 
+    def _may_match(self, names, attributes, coords_and_dims):
+        # Any missing attributes may yet be added to the cube when it is
+        # built.
+        return self._attributes_match(attributes, missing_match=True)
+
     def __repr__(self):
         return 'AttributeConstraint(%r)' % self._attributes
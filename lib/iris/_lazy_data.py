@@ -0,0 +1,195 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Routines for realising deferred (biggus) data.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+from collections import namedtuple
+
+import biggus
+import numpy as np
+import numpy.ma as ma
+
+
+#: The maximum number of bytes read at once when evaluating an aggregation
+#: in blocks aligned with the chunks of its source data, unless a single
+#: chunk is larger.  This is the value of biggus's own MAX_CHUNK_SIZE, which
+#: is not part of its public interface.
+_MAX_BLOCK_BYTES = 8 * 1024 * 1024 * 2
+
+# A block of source data, as passed to the streams handler of a biggus
+# aggregation.
+_Chunk = namedtuple('_Chunk', 'keys data')
+
+
+def _whole_proxy(array):
+    # Return the data proxy wrapped by a biggus array, if the array
+    # represents the entire, unindexed content of the proxy.
+    if not isinstance(array, (biggus.NumpyArrayAdapter,
+                              biggus.OrthoArrayAdapter)):
+        return None
+    proxy = array.concrete
+    keys = getattr(array, '_keys', None)
+    if keys is None or any(key != slice(None) for key in keys):
+        return None
+    if tuple(array.shape) != tuple(proxy.shape):
+        return None
+    return proxy
+
+
+def _batch_stack(array):
+    # Return the stack of an ArrayStack together with a flat list of the
+    # data proxies it contains, if all of its items are entire proxies of a
+    # single type which supports batch reading.
+    if not isinstance(array, biggus.ArrayStack):
+        return None
+    stack = array._stack
+    proxies = [_whole_proxy(item) for item in stack.flat]
+    if not proxies or any(proxy is None for proxy in proxies):
+        return None
+    proxy_types = set(type(proxy) for proxy in proxies)
+    if len(proxy_types) != 1:
+        return None
+    if not hasattr(proxy_types.pop(), '_batch_read'):
+        return None
+    return stack, proxies
+
+
+def _aligned_slices(shape, chunks, itemsize):
+    # Return, for each dimension, the slices which divide it into blocks
+    # of whole chunks, with blocks of at most _MAX_BLOCK_BYTES bytes of
+    # items of the given size where the chunks allow.  As for biggus, the
+    # blocks span the trailing dimensions first.
+    max_elems = max(1, _MAX_BLOCK_BYTES // itemsize)
+    all_slices = []
+    n_elems = 1
+    for size, chunk in reversed(list(zip(shape, chunks))):
+        chunk = max(1, min(chunk, size))
+        n_chunks = max(1, max_elems // (n_elems * chunk))
+        step = min(size, n_chunks * chunk)
+        slices = [slice(start, min(start + step, size))
+                  for start in range(0, size, step)]
+        all_slices.insert(0, slices)
+        n_elems *= step
+    return all_slices
+
+
+def _block_keys(shape, chunks, axis, itemsize):
+    # Generate the keys of the blocks of an array of the given shape and
+    # item size, which are aligned with the given chunks, in an order where
+    # the blocks with the same keys over the other dimensions follow each
+    # other, in the order of the given axis.
+    if 0 in shape:
+        return
+    all_slices = _aligned_slices(shape, chunks, itemsize)
+    order = [dim for dim in range(len(shape)) if dim != axis] + [axis]
+    for index in np.ndindex(*[len(all_slices[dim]) for dim in order]):
+        keys = [None] * len(shape)
+        for dim, i in zip(order, index):
+            keys[dim] = all_slices[dim][i]
+        yield tuple(keys)
+
+
+def _chunks(array):
+    # Return the shape of the chunks of the data on disk of a biggus array,
+    # if it is the entire content of a data proxy which describes them.
+    return getattr(_whole_proxy(array), 'chunks', None)
+
+
+def _chunked_aggregation(array):
+    # Return the source array and the aggregation axis of a biggus
+    # aggregation, if its source is the entire content of a data proxy
+    # which describes the chunking of its data on disk.
+    sources = getattr(array, 'sources', None)
+    axis = getattr(array, '_axis', None)
+    if (axis is None or not hasattr(array, 'streams_handler') or
+            sources is None or len(sources) != 1):
+        return None
+    source, = sources
+    chunks = _chunks(source)
+    if chunks is None or len(chunks) != source.ndim or 0 in source.shape:
+        return None
+    return source, axis, chunks
+
+
+def _aligned_aggregation(array, source, axis, chunks):
+    # Evaluate a biggus aggregation by feeding its streams handler with
+    # blocks of the source which are aligned with the chunks of the data,
+    # so that each chunk is read just once.  Blocks with the same keys
+    # over the other dimensions are fed consecutively, in the order of
+    # the aggregation axis, just as the biggus engine does.
+    handler = array.streams_handler(True)
+    result = ma.empty(array.shape, dtype=array.dtype)
+
+    def store(chunk):
+        if chunk is not None:
+            if chunk.keys:
+                result[tuple(chunk.keys)] = chunk.data
+            else:
+                result[...] = chunk.data
+
+    for keys in _block_keys(source.shape, chunks, axis,
+                            source.dtype.itemsize):
+        data = source[keys].masked_array()
+        store(handler.process_chunks([_Chunk(keys, data)]))
+    store(handler.finalise())
+    return result
+
+
+def masked_array(array):
+    """
+    Return the content of a :class:`biggus.Array` as a
+    :class:`numpy.ma.MaskedArray`.
+
+    When the array is a stack of entire data proxies which support batch
+    reading, such as the fields of a merged PP cube, their data is read
+    together and decoded directly into a single preallocated array.
+
+    When the array is a lazy aggregation, such as a collapse over time, of
+    an entire data proxy which provides the shape of the chunks of its data
+    on disk, such as a chunked netCDF4 variable, the data is read in blocks
+    of whole chunks, so that each chunk is read just once.
+
+    Otherwise, this is equivalent to `array.masked_array()`.
+
+    """
+    aggregation = _chunked_aggregation(array)
+    if aggregation is not None:
+        return _aligned_aggregation(array, *aggregation)
+
+    batch = _batch_stack(array)
+    if batch is None:
+        return array.masked_array()
+
+    stack, proxies = batch
+    result = np.empty(array.shape, dtype=array.dtype)
+    mask = None
+    for i, data in type(proxies[0])._batch_read(proxies):
+        index = np.unravel_index(i, stack.shape)
+        result[index] = data
+        if ma.is_masked(data):
+            if mask is None:
+                mask = np.zeros(array.shape, dtype=bool)
+            mask[index] = ma.getmaskarray(data)
+    if mask is None:
+        mask = ma.nomask
+    return ma.MaskedArray(result, mask=mask,
+                          fill_value=getattr(array, 'fill_value', None))
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2010 - 2016, Met Office
+# (C) British Crown Copyright 2010 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -663,6 +663,106 @@ def derive_relation_matrix(indexes):
     return relation_matrix
 
 
+def encode_positions(positions):
+    """
+    Encode the scalar values of each candidate dimension as an array of
+    integer codes, with one code per source-cube.
+
+    Equal scalar values of a candidate dimension share the same code,
+    and codes are allocated in order of first occurrence.
+
+    For example:
+
+        >>> from iris._merge import encode_positions
+        >>> positions = [{'a': 0, 'b': 10, 'c': 100},
+        ...              {'a': 1, 'b': 10, 'c': 200},
+        ...              {'a': 2, 'b': 20, 'c': 300}]
+        ...
+        >>> scalars, codes = encode_positions(positions)
+        >>> for k in sorted(codes):
+        ...     print('%r: %r' % (k, codes[k]))
+        ...
+        'a': array([0, 1, 2])
+        'b': array([0, 0, 1])
+        'c': array([0, 1, 2])
+
+    Args:
+
+    * positions:
+        A list containing a dictionary of candidate dimension key to
+        scalar value pairs for each source-cube.
+
+    Returns:
+        A tuple containing a dictionary of scalar value to code for each
+        candidate dimension, and a dictionary of code arrays for each
+        candidate dimension.
+
+    """
+    scalars = {}
+    codes = {}
+
+    for name in positions[0]:
+        code_by_scalar = {}
+        codes[name] = np.fromiter(
+            (code_by_scalar.setdefault(position[name], len(code_by_scalar))
+             for position in positions),
+            dtype=np.intp, count=len(positions))
+        scalars[name] = code_by_scalar
+
+    return scalars, codes
+
+
+def derive_coded_relation_matrix(scalars, codes):
+    """
+    Construct a mapping for each candidate dimension that specifies
+    which of the other candidate dimensions are separable or inseparable.
+
+    This is equivalent to :func:`iris._merge.derive_relation_matrix`,
+    but operates on the integer codes of each candidate dimension.
+
+    A candidate dimension X and Y are separable if each scalar value of
+    X maps to the same set of scalar values of Y. This is the case only
+    when the distinct (X, Y) value pairs form the complete product of the
+    values of X and Y, which is a symmetric relationship.
+
+    Also see :func:`iris._merge.encode_positions`.
+
+    Args:
+
+    * scalars:
+        The dictionary of scalar value to code for each candidate
+        dimension.
+
+    * codes:
+        The dictionary of code arrays for each candidate dimension.
+
+    Returns:
+        The relation dictionary for each candidate dimension.
+
+    """
+    names = list(codes)
+    relation_matrix = {name: _Relation(set(), set()) for name in names}
+
+    for i, name in enumerate(names):
+        size = len(scalars[name])
+        for other_name in names[i + 1:]:
+            other_size = len(scalars[other_name])
+            product = size * other_size
+            # There cannot be more distinct pairs than source-cubes.
+            separable = product <= codes[name].size
+            if separable and product > 1:
+                pairs = codes[name] * other_size + codes[other_name]
+                separable = np.unique(pairs).size == product
+            if separable:
+                relation_matrix[name].separable.add(other_name)
+                relation_matrix[other_name].separable.add(name)
+            else:
+                relation_matrix[name].inseparable.add(other_name)
+                relation_matrix[other_name].inseparable.add(name)
+
+    return relation_matrix
+
+
 def derive_groups(relation_matrix):
     """
     Determine all related (chained) groups of inseparable candidate dimensions.
@@ -1068,6 +1168,41 @@ def derive_space(groups, relation_matrix, positions, function_matrix=None):
     return space
 
 
+def signature_key(cube, exact_shape=True):
+    """
+    Construct a hashable key from the metadata of a cube.
+
+    Cubes which may be registered with the same :class:`ProtoCube`, or
+    with the same :class:`iris._concatenate._ProtoCube`, always share the
+    same key, so cubes with different keys need never be compared in
+    detail. The converse is not true, and cubes with the same key may still
+    fail to register.
+
+    Args:
+
+    * cube:
+        The :class:`iris.cube.Cube` to be keyed.
+
+    Kwargs:
+
+    * exact_shape:
+        Whether the key includes the shape of the cube, or only its number
+        of dimensions, as for concatenation, where the cubes differ in
+        length along one dimension. Defaults to True.
+
+    Returns:
+        A hashable tuple.
+
+    """
+    defn = cube.metadata
+    coords = sorted((coord.name(), tuple(cube.coord_dims(coord)))
+                    for coord in cube.dim_coords + cube.aux_coords)
+    shape = cube.shape if exact_shape else cube.ndim
+    return (defn.standard_name, defn.long_name, defn.var_name,
+            frozenset(defn.attributes), defn.cell_methods,
+            shape, cube.dtype, tuple(coords))
+
+
 class ProtoCube(object):
     """
     Framework for merging source-cubes into one or more higher
@@ -1102,6 +1237,15 @@ class ProtoCube(object):
         self._skeletons = []
         self._add_cube(cube, coord_payload)
 
+        self._init_space()
+
+        # cell measures are not merge candidates
+        # they are checked and preserved through merge
+        self._cell_measures_and_dims = cube._cell_measures_and_dims
+
+    def _init_space(self):
+        """Initialise the state which describes the merged space."""
+
         # Proto-coordinates constructed from merged scalars.
         self._dim_templates = []
         self._aux_templates = []
@@ -1126,10 +1270,6 @@ class ProtoCube(object):
         self._vector_dim_coords_dims = []
         self._vector_aux_coords_dims = []
 
-        # cell measures are not merge candidates
-        # they are checked and preserved through merge
-        self._cell_measures_and_dims = cube._cell_measures_and_dims
-
     def _report_duplicate(self, nd_indexes, group_by_nd_index):
         # Find the first offending source-cube with duplicate metadata.
         index = [group_by_nd_index[nd_index][1]
@@ -1159,18 +1299,53 @@ class ProtoCube(object):
             A :class:`iris.cube.CubeList` of merged cubes.
 
         """
-        positions = [{i: v for i, v in enumerate(skeleton.scalar_values)}
-                     for skeleton in self._skeletons]
-        indexes = build_indexes(positions)
-        relation_matrix = derive_relation_matrix(indexes)
+        positions = self._positions()
+        space, indexes, function_matrix = self._analyse_space(positions)
+        self._define_space(space, positions, indexes, function_matrix)
+        self._build_coordinates()
+        return self._merge_cubes(positions, unique)
+
+    def _positions(self):
+        """
+        Returns the dictionary of candidate dimension key to scalar value
+        pairs for each source-cube.
+
+        """
+        return [{i: v for i, v in enumerate(skeleton.scalar_values)}
+                for skeleton in self._skeletons]
+
+    def _analyse_space(self, positions):
+        """
+        Determine the relationship between all the candidate dimensions
+        of the source-cubes.
+
+        Args:
+
+        * positions:
+            A list containing a dictionary of candidate dimension key to
+            scalar value pairs for each source-cube.
+
+        Returns:
+            A tuple containing the space dictionary, the index dictionary
+            and the function mapping dictionary for each candidate
+            dimension.
+
+        """
+        indexes, codes = encode_positions(positions)
+        relation_matrix = derive_coded_relation_matrix(indexes, codes)
         groups = derive_groups(relation_matrix)
 
         function_matrix = {}
         space = derive_space(groups, relation_matrix, positions,
                              function_matrix=function_matrix)
-        self._define_space(space, positions, indexes, function_matrix)
-        self._build_coordinates()
+        return space, indexes, function_matrix
 
+    def _merge_cubes(self, positions, unique):
+        """
+        Returns the list of cubes resulting from stacking the source-cube
+        data within the defined space.
+
+        """
         # All the final, merged cubes will end up here.
         merged_cubes = iris.cube.CubeList()
 
@@ -1180,6 +1355,15 @@ class ProtoCube(object):
             group = group_by_nd_index.setdefault(self._nd_index(position), [])
             group.append(index)
 
+        # Every cell of the merged space must be filled by a source-cube.
+        size = int(np.prod(self._stack_shape))
+        if len(group_by_nd_index) != size:
+            msg = 'Source cubes fill only {} of the {} cells of the {!r} ' \
+                'merged cube.'
+            name = self._cube_signature.defn.name()
+            raise iris.exceptions.MergeError(
+                [msg.format(len(group_by_nd_index), size, name)])
+
         # Determine the largest group of source-cubes that want to occupy
         # the same nd-index in the final merged cube.
         group_depth = max([len(group) for group in group_by_nd_index.values()])
@@ -1191,12 +1375,7 @@ class ProtoCube(object):
 
         # Generate group-depth merged cubes from the source-cubes.
         for level in range(group_depth):
-            # Stack up all the data from all of the relevant source
-            # cubes in a single biggus ArrayStack.
-            # If it turns out that all the source cubes already had
-            # their data loaded then at the end we can convert the
-            # ArrayStack back to a numpy array.
-            stack = np.empty(self._stack_shape, 'object')
+            sources = []
             all_have_data = True
             for nd_index in nd_indexes:
                 # Get the data of the current existing or last known
@@ -1204,26 +1383,67 @@ class ProtoCube(object):
                 group = group_by_nd_index[nd_index]
                 offset = min(level, len(group) - 1)
                 data = self._skeletons[group[offset]].data
-                # Ensure the data is represented as a biggus.Array and
-                # slot that Array into the stack.
                 if isinstance(data, biggus.Array):
                     all_have_data = False
-                else:
-                    data = biggus.NumpyArrayAdapter(data)
-                stack[nd_index] = data
+                sources.append((nd_index, data))
 
-            merged_data = biggus.ArrayStack(stack)
             if all_have_data:
-                merged_data = merged_data.masked_array()
-                # Unmask the array only if it is filled.
-                if (ma.isMaskedArray(merged_data) and
-                        ma.count_masked(merged_data) == 0):
-                    merged_data = merged_data.data
+                # All the source cubes already had their data loaded, so
+                # copy it straight into the merged array.
+                merged_data = self._stack_data(sources)
+            else:
+                # Stack up all the data from all of the relevant source
+                # cubes in a single biggus ArrayStack.
+                stack = np.empty(self._stack_shape, 'object')
+                for nd_index, data in sources:
+                    # Ensure the data is represented as a biggus.Array and
+                    # slot that Array into the stack.
+                    if not isinstance(data, biggus.Array):
+                        data = biggus.NumpyArrayAdapter(data)
+                    stack[nd_index] = data
+                merged_data = biggus.ArrayStack(stack)
             merged_cube = self._get_cube(merged_data)
             merged_cubes.append(merged_cube)
 
         return merged_cubes
 
+    def _stack_data(self, sources):
+        """
+        Returns the merged array of the loaded data of the source-cubes.
+
+        The merged array is allocated once, and the data of each
+        source-cube is copied directly into place. The result is only a
+        masked array if the data of a source-cube is actually masked, in
+        which case it has the fill value common to the masked source data,
+        if there is one.
+
+        Args:
+
+        * sources:
+            A list of (nd-index, data) pairs for each source-cube.
+
+        """
+        signature = self._cube_signature
+        shape = tuple(self._stack_shape) + tuple(signature.data_shape)
+        merged_data = np.empty(shape, dtype=signature.data_type)
+        mask = None
+        fill_values = set()
+        for nd_index, data in sources:
+            merged_data[nd_index] = data
+            if isinstance(data, ma.MaskedArray):
+                fill_values.add(data.fill_value.item())
+            if ma.is_masked(data):
+                if mask is None:
+                    mask = np.zeros(shape, dtype=bool)
+                mask[nd_index] = ma.getmaskarray(data)
+        if mask is not None:
+            fill_value = None
+            if len(fill_values) == 1:
+                fill_value, = fill_values
+            merged_data = ma.MaskedArray(merged_data, mask=mask,
+                                         fill_value=fill_value)
+        return merged_data
+
     def register(self, cube, error_on_mismatch=False):
         """
         Add a compatible :class:`iris.cube.Cube` as a source-cube for
@@ -1306,7 +1526,9 @@ class ProtoCube(object):
             scalar value pairs for each source-cube.
 
         * indexes:
-            A cross-reference dictionary for each candidate dimension.
+            A dictionary for each candidate dimension, keyed by its
+            distinct scalar values, as the scalar value to code
+            dictionary of :func:`encode_positions`.
 
         * function_matrix:
             The function mapping dictionary for each candidate dimension that
@@ -1686,3 +1908,150 @@ class ProtoCube(object):
                                      vector_aux_coords_and_dims)
 
         return _CoordPayload(scalar, vector, factory_defns)
+
+
+class IncrementalProtoCube(ProtoCube):
+    """
+    A :class:`ProtoCube` which continues to accept source-cubes after it
+    has been merged.
+
+    The structure of the merged space is derived by the first call to
+    :meth:`merge`. Subsequent merges re-use that structure, extending the
+    merged dimensions with the scalar values of any newly registered
+    source-cubes, without re-analysing the source-cubes already merged.
+
+    For example::
+
+        proto_cube = IncrementalProtoCube(cubes[0])
+        for cube in cubes[1:]:
+            proto_cube.register(cube, error_on_mismatch=True)
+        merged = proto_cube.merge()
+        ...
+        for cube in new_cubes:
+            proto_cube.register(cube, error_on_mismatch=True)
+        merged = proto_cube.merge()
+
+    A source-cube which would change the structure of the merged space,
+    for example by varying a scalar coordinate of the merged cube, or by
+    breaking the functional relationship of an auxiliary coordinate, is
+    rejected by :meth:`register` with a :class:`~iris.exceptions.MergeError`.
+    A merge raises a :class:`~iris.exceptions.MergeError` while the
+    registered source-cubes only partially fill the extended space, in
+    which case the remaining source-cubes may be registered before merging
+    again.
+
+    """
+    def __init__(self, cube):
+        # The derived structure of the merged space, which is only
+        # available after the first merge.
+        self._space = None
+        self._indexes = None
+        self._function_matrix = None
+        self._scalars = None
+        super(IncrementalProtoCube, self).__init__(cube)
+
+    def merge(self, unique=True):
+        """
+        Returns the list of cubes resulting from merging all the
+        registered source-cubes.
+
+        Kwargs:
+
+        * unique:
+            If True, raises `iris.exceptions.DuplicateDataError` if
+            duplicate cubes are detected.
+
+        Returns:
+            A :class:`iris.cube.CubeList` of merged cubes.
+
+        """
+        positions = self._positions()
+        if self._space is None:
+            space, indexes, function_matrix = self._analyse_space(positions)
+            indexes = {name: set(index)
+                       for name, index in six.iteritems(indexes)}
+        else:
+            space = self._space
+            indexes = self._indexes
+            function_matrix = self._function_matrix
+
+        self._init_space()
+        self._define_space(space, positions, indexes, function_matrix)
+        self._build_coordinates()
+        merged_cubes = self._merge_cubes(positions, unique)
+
+        if self._space is None:
+            # Retain the structure of the space, including the candidate
+            # dimensions which remain scalar coordinates of the merged
+            # cubes.
+            self._space = space
+            self._indexes = indexes
+            self._function_matrix = function_matrix
+            self._scalars = {name: positions[0][name]
+                             for name, independents in six.iteritems(space)
+                             if independents is None and
+                             not _is_combination(name) and
+                             name not in self._nd_names}
+        return merged_cubes
+
+    def _add_cube(self, cube, coord_payload):
+        """Create and add the source-cube skeleton to the ProtoCube."""
+        if self._space is not None:
+            self._extend_space(coord_payload.scalar.values)
+        super(IncrementalProtoCube, self)._add_cube(cube, coord_payload)
+
+    def _extend_space(self, scalar_values):
+        """
+        Extend the merged space with the scalar values of a new
+        source-cube, raising a :class:`~iris.exceptions.MergeError` if
+        they do not fit the structure of the space.
+
+        """
+        position = {i: v for i, v in enumerate(scalar_values)}
+        defns = self._coord_signature.scalar_defns
+        msgs = []
+
+        for name, value in six.iteritems(self._scalars):
+            if position[name] != value:
+                msg = 'Scalar coordinate {!r} differs: {!r} != {!r}'
+                msgs.append(msg.format(defns[name].name(), value,
+                                       position[name]))
+
+        functions = []
+        for name, independents in six.iteritems(self._space):
+            if independents is None:
+                continue
+            cell = tuple(_position_value(position, independent)
+                         for independent in independents)
+            function_mapping = self._function_matrix[name]
+            if cell not in function_mapping:
+                functions.append((function_mapping, cell, position[name]))
+            elif function_mapping[cell] != position[name]:
+                msg = 'Coordinate {!r} is no longer a function of the ' \
+                    'merged dimensions: {!r} != {!r}'
+                msgs.append(msg.format(defns[name].name(),
+                                       function_mapping[cell],
+                                       position[name]))
+
+        if msgs:
+            msgs.insert(0, 'Source cube changes the structure of the merged '
+                        'cube.')
+            raise iris.exceptions.MergeError(msgs)
+
+        for function_mapping, cell, value in functions:
+            function_mapping[cell] = value
+        for name, index in six.iteritems(self._indexes):
+            index.add(position[name])
+
+
+def _position_value(position, name):
+    """
+    Returns the scalar value of the candidate dimension for the position,
+    where the value of a combination candidate dimension is the tuple of
+    the values of its members.
+
+    """
+    if _is_combination(name):
+        return tuple(position[int(member) if member.isdigit() else member]
+                     for member in name.split(_COMBINATION_JOIN))
+    return position[name]
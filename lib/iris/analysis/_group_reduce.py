@@ -0,0 +1,315 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Lazy, vectorised aggregation of groups of elements along one dimension of
+an array, as used by :meth:`iris.cube.Cube.aggregated_by`.
+
+The data is read in blocks, aligned with the chunks of the data on disk
+where they are known, and the elements of each block are reduced group by
+group with segmented reductions, such as :meth:`numpy.add.reduceat`.  Only
+the running results of the groups, and a single block, are held in memory.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+import six
+
+import biggus
+import numpy as np
+import numpy.ma as ma
+
+import iris.analysis
+import iris._lazy_data
+
+
+def _reduction(aggregator, kwargs):
+    # Return the name of the group reduction equivalent to the aggregator
+    # with the given keywords, or None if there is none.
+    reductions = {iris.analysis._count: 'count',
+                  ma.max: 'max',
+                  ma.average: 'mean',
+                  ma.min: 'min',
+                  iris.analysis._sum: 'sum'}
+    reduction = reductions.get(getattr(aggregator, 'call_func', None))
+    allowed = set(['mdtol'])
+    if reduction in ('mean', 'sum'):
+        allowed.add('weights')
+    elif reduction == 'count':
+        if not callable(kwargs.get('function')):
+            return None
+        allowed.add('function')
+    if reduction is None or set(kwargs) - allowed:
+        return None
+    return reduction
+
+
+def _is_scalar(key):
+    return isinstance(key, six.integer_types + (np.integer,))
+
+
+def _full_keys(keys, ndim):
+    # Return the given index keys as a tuple with one key per dimension.
+    if not isinstance(keys, tuple):
+        keys = (keys,)
+    if Ellipsis in keys:
+        i = keys.index(Ellipsis)
+        fill = (slice(None),) * (ndim - len(keys) + 1)
+        keys = keys[:i] + fill + keys[i + 1:]
+    return keys + (slice(None),) * (ndim - len(keys))
+
+
+def _result_dtype(reduction, dtype):
+    # Return the data type of the named reduction of data of the given type,
+    # as for the equivalent aggregator.
+    sample = np.zeros(1, dtype=dtype)
+    if reduction == 'mean':
+        dtype = np.mean(sample).dtype
+    elif reduction == 'sum':
+        dtype = np.sum(sample).dtype
+    elif reduction == 'count':
+        dtype = np.sum(sample.astype(bool)).dtype
+    return dtype
+
+
+class _GroupReduction(object):
+    """
+    A deferred aggregation of each group of elements along one dimension of
+    a lazy array, which supports orthogonal indexing.
+
+    """
+    def __init__(self, array, axis, group_ids, n_groups, reduction, kwargs):
+        self._array = array
+        self._axis = axis
+        self._group_ids = group_ids
+        self._n_groups = n_groups
+        self._sizes = np.bincount(group_ids, minlength=n_groups)
+        self._reduction = reduction
+        self._kwargs = kwargs
+        weights = kwargs.get('weights')
+        if weights is not None:
+            weights = biggus.NumpyArrayAdapter(np.asarray(weights))
+        self._weights = weights
+        self._chunks = iris._lazy_data._chunks(array)
+        shape = list(array.shape)
+        shape[axis] = n_groups
+        self.shape = tuple(shape)
+        self.dtype = _result_dtype(reduction, array.dtype)
+        if reduction in ('mean', 'sum') and weights is not None:
+            self.dtype = np.result_type(self.dtype, weights.dtype)
+        self.fill_value = None
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __repr__(self):
+        fmt = '<{self.__class__.__name__} {self._reduction}' \
+              ' shape={self.shape} dtype={self.dtype!r}>'
+        return fmt.format(self=self)
+
+    def __getitem__(self, keys):
+        keys = _full_keys(keys, self.ndim)
+
+        # Read only the source elements of the requested groups.
+        group_key = keys[self._axis]
+        if isinstance(group_key, tuple):
+            group_key = list(group_key)
+        requested = np.arange(self._n_groups)[group_key]
+        groups = np.unique(requested)
+        indices = np.flatnonzero(np.in1d(self._group_ids, groups))
+        if indices.size == self._group_ids.size:
+            element_key = slice(None)
+        elif not indices.size:
+            element_key = slice(0, 0)
+        elif indices[-1] - indices[0] + 1 == indices.size:
+            element_key = slice(int(indices[0]), int(indices[-1]) + 1)
+        else:
+            element_key = indices
+        source_keys = list(keys)
+        source_keys[self._axis] = element_key
+        source_keys = tuple(source_keys)
+        source = self._array[source_keys]
+        weights = None
+        if self._weights is not None:
+            weights = self._weights[source_keys]
+
+        # Aggregate the groups, numbered in order of their original number,
+        # and finally select the groups in the requested order.
+        axis = self._axis - len([key for key in keys[:self._axis]
+                                 if _is_scalar(key)])
+        chunks = None
+        if self._chunks is not None:
+            # The source keeps the axis, even for a scalar key.
+            chunks = [chunk for dim, (chunk, key)
+                      in enumerate(zip(self._chunks, keys))
+                      if dim == self._axis or not _is_scalar(key)]
+        group_ids = np.searchsorted(groups, self._group_ids[indices])
+        result = self._reduce(source, weights, axis, chunks, group_ids,
+                              self._sizes[groups])
+        select = np.searchsorted(groups, requested)
+        if select.ndim == 0:
+            select = int(select)
+        return result[(slice(None),) * axis + (select,)]
+
+    def _reduce(self, source, weights, axis, chunks, group_ids, sizes):
+        # Aggregate every group of the source, block by block, with the
+        # corresponding weights, if any, given the group of each element
+        # along the axis and the number of elements of each group.
+        reduction = self._reduction
+        shape = list(source.shape)
+        shape[axis] = sizes.size
+        # Whether the elements of each group follow each other, so that
+        # no block needs sorting.
+        ordered = bool(np.all(np.diff(group_ids) >= 0))
+        counts = np.zeros(shape, dtype=np.intp)
+        if reduction == 'mean':
+            totals = np.zeros(shape, dtype=np.result_type(self.dtype,
+                                                          np.float64))
+            if weights is not None:
+                weight_totals = np.zeros(shape, dtype=totals.dtype)
+        elif reduction in ('sum', 'count'):
+            totals = np.zeros(shape, dtype=self.dtype)
+        elif reduction == 'min':
+            fill = ma.minimum_fill_value(np.zeros(1, dtype=source.dtype))
+            totals = np.empty(shape, dtype=source.dtype)
+            totals.fill(fill)
+        else:
+            fill = ma.maximum_fill_value(np.zeros(1, dtype=source.dtype))
+            totals = np.empty(shape, dtype=source.dtype)
+            totals.fill(fill)
+
+        chunks = chunks or (1,) * source.ndim
+        # The blocks are sized by the larger of the source and working
+        # precisions, as each block is converted to the working precision.
+        itemsize = max(source.dtype.itemsize, totals.dtype.itemsize)
+        for keys in iris._lazy_data._block_keys(source.shape, chunks, axis,
+                                                itemsize):
+            data = source[keys].masked_array()
+            if weights is not None:
+                block_weights = weights[keys].ndarray()
+            # Sort the elements of the block by group, if need be, and find
+            # the start of the run of elements of each group.
+            ids = group_ids[keys[axis]]
+            if not ordered:
+                order = np.argsort(ids, kind='mergesort')
+                ids = ids[order]
+                data = data.take(order, axis=axis)
+                if weights is not None:
+                    block_weights = block_weights.take(order, axis=axis)
+            starts = np.concatenate([[0], np.flatnonzero(np.diff(ids)) + 1])
+            ids = ids[starts]
+            group_keys = list(keys)
+            group_keys[axis] = ids
+            group_keys = tuple(group_keys)
+
+            valid = ~ma.getmaskarray(data)
+            counts[group_keys] += np.add.reduceat(valid.astype(np.intp),
+                                                  starts, axis=axis)
+            if reduction in ('mean', 'sum'):
+                values = data.filled(0).astype(totals.dtype)
+                if weights is not None:
+                    values *= block_weights
+                totals[group_keys] += np.add.reduceat(values, starts,
+                                                      axis=axis)
+                if reduction == 'mean' and weights is not None:
+                    values = np.where(valid, block_weights, 0)
+                    weight_totals[group_keys] += np.add.reduceat(
+                        values.astype(totals.dtype), starts, axis=axis)
+            elif reduction == 'count':
+                hits = ma.filled(self._kwargs['function'](data), False)
+                hits = np.logical_and(hits, valid).astype(totals.dtype)
+                totals[group_keys] += np.add.reduceat(hits, starts,
+                                                      axis=axis)
+            elif reduction == 'min':
+                values = np.minimum.reduceat(data.filled(fill), starts,
+                                             axis=axis)
+                totals[group_keys] = np.minimum(totals[group_keys], values)
+            else:
+                values = np.maximum.reduceat(data.filled(fill), starts,
+                                             axis=axis)
+                totals[group_keys] = np.maximum(totals[group_keys], values)
+
+        # As for the aggregators, a group with no valid data is masked, as
+        # is any group with too small a fraction of valid data.
+        mask = counts == 0
+        mdtol = self._kwargs.get('mdtol')
+        if mdtol is not None:
+            sizes_shape = [1] * len(shape)
+            sizes_shape[axis] = sizes.size
+            sizes = sizes.reshape(sizes_shape)
+            mask |= 1 - mdtol > counts / sizes
+        if reduction == 'mean':
+            if weights is None:
+                totals = totals / np.maximum(counts, 1)
+            else:
+                # A group whose valid data has no weight has no mean.
+                mask |= weight_totals == 0
+                weight_totals[weight_totals == 0] = 1
+                totals = totals / weight_totals
+        return ma.MaskedArray(totals.astype(self.dtype), mask=mask)
+
+
+def group_reduce(array, axis, groups, aggregator, **kwargs):
+    """
+    Return a lazy array of the aggregation of each group of elements along
+    one dimension of a lazy array, or None if the aggregator is not
+    supported.
+
+    The supported aggregators are :data:`~iris.analysis.COUNT`,
+    :data:`~iris.analysis.MAX`, :data:`~iris.analysis.MEAN`,
+    :data:`~iris.analysis.MIN` and :data:`~iris.analysis.SUM`, with no
+    keywords other than "mdtol", "weights" for MEAN and SUM, and "function"
+    for COUNT.
+
+    Args:
+
+    * array (:class:`biggus.Array`):
+        The data to aggregate.
+    * axis (int):
+        The dimension of the groups.
+    * groups (list):
+        The index key, a slice or a tuple of indices, of the elements of
+        each group along the dimension, as given by
+        :meth:`iris.analysis._Groupby.group`.  Each element must be in
+        exactly one group.
+    * aggregator (:class:`iris.analysis.Aggregator`):
+        The aggregator to apply to each group.
+
+    Kwargs:
+
+    * kwargs:
+        Aggregator keyword arguments.  Any weights must have the same shape
+        as the array.
+
+    Returns:
+        A :class:`biggus.Array`, or None.
+
+    """
+    kwargs = dict(list(getattr(aggregator, '_kwargs', {}).items()) +
+                  list(kwargs.items()))
+    reduction = _reduction(aggregator, kwargs)
+    if reduction is None:
+        return None
+    group_ids = np.empty(array.shape[axis], dtype=np.intp)
+    for i, group in enumerate(groups):
+        if isinstance(group, tuple):
+            group = list(group)
+        group_ids[group] = i
+    proxy = _GroupReduction(array, axis, group_ids, len(groups), reduction,
+                            kwargs)
+    return biggus.OrthoArrayAdapter(proxy)
@@ -0,0 +1,255 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Lazy aggregation of a rolling window along one dimension of an array, as
+used by :meth:`iris.cube.Cube.rolling_window`.
+
+The data is read in blocks which overlap by one window less one element,
+and the windows of each block are reduced with kernels whose cost does not
+depend on the length of the window: sums and counts are differences of
+cumulative sums, and extrema use the van Herk/Gil-Werman algorithm, which
+combines the running extrema of consecutive segments of one window length.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+import biggus
+import numpy as np
+import numpy.ma as ma
+
+from iris.analysis._group_reduce import (_full_keys, _is_scalar, _reduction,
+                                         _result_dtype)
+import iris._lazy_data
+
+
+def _window_sums(array, window, axis):
+    # Return the sums of each window of the array along the axis, from the
+    # differences of its cumulative sums.
+    shape = list(array.shape)
+    shape[axis] = 1
+    totals = np.concatenate([np.zeros(shape, dtype=array.dtype),
+                             np.cumsum(array, axis=axis)], axis=axis)
+    n_windows = array.shape[axis] - window + 1
+    before = (slice(None),) * axis
+    return (totals[before + (slice(window, None),)] -
+            totals[before + (slice(None, n_windows),)])
+
+
+def _window_sums_of_reals(array, window, axis):
+    # Return the sums of each window of the array along the axis, as for
+    # _window_sums, except that a NaN or infinite element only affects the
+    # sums of the windows which contain it, rather than every later
+    # cumulative sum.
+    if array.dtype.kind != 'f':
+        return _window_sums(array, window, axis)
+    finite = np.isfinite(array)
+    if finite.all():
+        return _window_sums(array, window, axis)
+    result = _window_sums(np.where(finite, array, 0), window, axis)
+    nans, positive, negative = [
+        _window_sums(flags.astype(np.intp), window, axis) > 0
+        for flags in (np.isnan(array), array == np.inf, array == -np.inf)]
+    result[positive] = np.inf
+    result[negative] = -np.inf
+    result[nans | (positive & negative)] = np.nan
+    return result
+
+
+def _window_extrema(array, window, axis, ufunc):
+    # Return the extrema of each window of the array along the axis, as
+    # given by the ufunc numpy.minimum or numpy.maximum.  The elements are
+    # divided into segments of one window length, and the running extrema
+    # are found forwards and backwards within each segment.  Every window
+    # spans the end of one segment and the start of the next, or is a
+    # segment, so its extremum is that of a backward and a forward value.
+    array = np.rollaxis(array, axis, array.ndim)
+    length = array.shape[-1]
+    n_segments = -(-length // window)
+    padding = n_segments * window - length
+    if padding:
+        # The padding elements are never part of a window.
+        array = np.concatenate([array] + [array[..., -1:]] * padding,
+                               axis=-1)
+    segments = array.reshape(array.shape[:-1] + (n_segments, window))
+    forwards = ufunc.accumulate(segments, axis=-1).reshape(array.shape)
+    backwards = ufunc.accumulate(segments[..., ::-1], axis=-1)
+    backwards = backwards[..., ::-1].reshape(array.shape)
+    n_windows = length - window + 1
+    result = ufunc(backwards[..., :n_windows],
+                   forwards[..., window - 1:window - 1 + n_windows])
+    return np.rollaxis(result, result.ndim - 1, axis)
+
+
+class _RollingReduction(object):
+    """
+    A deferred aggregation of each rolling window along one dimension of a
+    lazy array, which supports orthogonal indexing.
+
+    """
+    def __init__(self, array, axis, window, reduction, kwargs):
+        self._array = array
+        self._axis = axis
+        self._window = window
+        self._reduction = reduction
+        self._kwargs = kwargs
+        self._chunks = iris._lazy_data._chunks(array)
+        shape = list(array.shape)
+        shape[axis] -= window - 1
+        self.shape = tuple(shape)
+        self.dtype = _result_dtype(reduction, array.dtype)
+        # Floating point sums are accumulated in double precision.
+        self._work_dtype = self.dtype
+        if reduction in ('mean', 'sum') and self.dtype.kind not in 'biu':
+            self._work_dtype = np.result_type(self.dtype, np.float64)
+        self.fill_value = None
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __repr__(self):
+        fmt = '<{self.__class__.__name__} {self._reduction}' \
+              ' window={self._window} shape={self.shape}' \
+              ' dtype={self.dtype!r}>'
+        return fmt.format(self=self)
+
+    def __getitem__(self, keys):
+        keys = _full_keys(keys, self.ndim)
+
+        # Read only the source elements spanned by the requested windows.
+        window_key = keys[self._axis]
+        if isinstance(window_key, tuple):
+            window_key = list(window_key)
+        indices = np.arange(self.shape[self._axis])[window_key]
+        start = stop = 0
+        if indices.size:
+            start, stop = int(indices.min()), int(indices.max()) + 1
+        source_keys = list(keys)
+        source_keys[self._axis] = slice(start, stop + self._window - 1)
+        source = self._array[tuple(source_keys)]
+
+        axis = self._axis - len([key for key in keys[:self._axis]
+                                 if _is_scalar(key)])
+        chunks = None
+        if self._chunks is not None:
+            # The source keeps the axis, even for a scalar key.
+            chunks = [chunk for dim, (chunk, key)
+                      in enumerate(zip(self._chunks, keys))
+                      if dim == self._axis or not _is_scalar(key)]
+        result = self._reduce(source, axis, chunks)
+        select = indices - start
+        if select.ndim == 0:
+            select = int(select)
+        return result[(slice(None),) * axis + (select,)]
+
+    def _reduce(self, source, axis, chunks):
+        # Aggregate every window of the source, block by block.
+        window = self._window
+        shape = list(source.shape)
+        shape[axis] -= window - 1
+        result = np.empty(shape, dtype=self.dtype)
+        mask = np.zeros(shape, dtype=bool)
+        chunks = list(chunks or (1,) * source.ndim)
+        # Blocks of at least one window along the axis re-read at most as
+        # many elements as they aggregate.
+        chunks[axis] = max(chunks[axis], window)
+        # The blocks are sized by the larger of the source and working
+        # precisions, as each block is converted to the working precision.
+        itemsize = max(source.dtype.itemsize, self._work_dtype.itemsize)
+        for keys in iris._lazy_data._block_keys(shape, chunks, axis,
+                                                itemsize):
+            source_keys = list(keys)
+            source_keys[axis] = slice(keys[axis].start,
+                                      keys[axis].stop + window - 1)
+            data = source[tuple(source_keys)].masked_array()
+            result[keys], mask[keys] = self._aggregate(data, axis)
+        return ma.MaskedArray(result, mask=mask)
+
+    def _aggregate(self, data, axis):
+        # Return the aggregate of every window of a block of data, and its
+        # mask.
+        reduction = self._reduction
+        window = self._window
+        valid = ~ma.getmaskarray(data)
+        counts = _window_sums(valid.astype(np.intp), window, axis)
+        if reduction in ('mean', 'sum'):
+            result = _window_sums_of_reals(
+                data.filled(0).astype(self._work_dtype), window, axis)
+            if reduction == 'mean':
+                result = result / np.maximum(counts, 1)
+        elif reduction == 'count':
+            hits = ma.filled(self._kwargs['function'](data), False)
+            hits = np.logical_and(hits, valid).astype(self.dtype)
+            result = _window_sums(hits, window, axis)
+        elif reduction == 'min':
+            fill = ma.minimum_fill_value(data)
+            result = _window_extrema(data.filled(fill), window, axis,
+                                     np.minimum)
+        else:
+            fill = ma.maximum_fill_value(data)
+            result = _window_extrema(data.filled(fill), window, axis,
+                                     np.maximum)
+
+        # As for the aggregators, a window with no valid data is masked, as
+        # is any window with too small a fraction of valid data.
+        mask = counts == 0
+        mdtol = self._kwargs.get('mdtol')
+        if mdtol is not None:
+            mask |= 1 - mdtol > counts / window
+        return result.astype(self.dtype), mask
+
+
+def rolling_reduce(array, axis, window, aggregator, **kwargs):
+    """
+    Return a lazy array of the aggregation of each rolling window along one
+    dimension of a lazy array, or None if the aggregator is not supported.
+
+    The supported aggregators are :data:`~iris.analysis.COUNT`,
+    :data:`~iris.analysis.MAX`, :data:`~iris.analysis.MEAN`,
+    :data:`~iris.analysis.MIN` and :data:`~iris.analysis.SUM`, with no
+    keywords other than "mdtol" and, for COUNT, "function".
+
+    Args:
+
+    * array (:class:`biggus.Array`):
+        The data to aggregate.
+    * axis (int):
+        The dimension along which the window rolls.
+    * window (int):
+        The length of the window.
+    * aggregator (:class:`iris.analysis.Aggregator`):
+        The aggregator to apply to each window.
+
+    Kwargs:
+
+    * kwargs:
+        Aggregator keyword arguments.
+
+    Returns:
+        A :class:`biggus.Array`, or None.
+
+    """
+    kwargs = dict(list(getattr(aggregator, '_kwargs', {}).items()) +
+                  list(kwargs.items()))
+    reduction = _reduction(aggregator, kwargs)
+    if (reduction is None or 'weights' in kwargs or
+            not 1 <= window <= array.shape[axis]):
+        return None
+    proxy = _RollingReduction(array, axis, window, reduction, kwargs)
+    return biggus.OrthoArrayAdapter(proxy)
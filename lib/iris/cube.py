@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2010 - 2016, Met Office
+# (C) British Crown Copyright 2010 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -40,12 +40,15 @@ from iris._deprecation import warn_deprecated
 import iris.analysis
 from iris.analysis.cartography import wrap_lons
 import iris.analysis.maths
+import iris.analysis._group_reduce
 import iris.analysis._interpolate_private
+import iris.analysis._rolling_reduce
 import iris.aux_factory
 import iris.coord_systems
 import iris.coords
 import iris._concatenate
 import iris._constraints
+import iris._lazy_data
 import iris._merge
 import iris.exceptions
 import iris.util
@@ -442,13 +445,18 @@ class CubeList(list):
 
         """
         # Register each of our cubes with its appropriate ProtoCube.
+        # Only those ProtoCubes whose signature key matches that of the
+        # cube are candidates for registration.
         proto_cubes_by_name = {}
+        proto_cubes_by_key = {}
         for cube in self:
             name = cube.standard_name
             proto_cubes = proto_cubes_by_name.setdefault(name, [])
+            key = iris._merge.signature_key(cube)
+            candidates = proto_cubes_by_key.setdefault(key, [])
             proto_cube = None
 
-            for target_proto_cube in proto_cubes:
+            for target_proto_cube in candidates:
                 if target_proto_cube.register(cube):
                     proto_cube = target_proto_cube
                     break
@@ -456,6 +464,7 @@ class CubeList(list):
             if proto_cube is None:
                 proto_cube = iris._merge.ProtoCube(cube)
                 proto_cubes.append(proto_cube)
+                candidates.append(proto_cube)
 
         # Emulate Python 2 behaviour.
         def _none_sort(item):
@@ -1683,7 +1692,7 @@ bound=(1994-12-01 00:00:00, 1998-12-01 00:00:00)
         data = self._my_data
         if not isinstance(data, np.ndarray):
             try:
-                data = data.masked_array()
+                data = iris._lazy_data.masked_array(data)
             except MemoryError:
                 msg = "Failed to create the cube's data as there was not" \
                       " enough memory available.\n" \
@@ -3395,14 +3404,22 @@ bound=(1994-12-01 00:00:00, 1998-12-01 00:00:00)
         Kwargs:
 
         * kwargs:
-            Aggregator and aggregation function keyword arguments.
+            Aggregator and aggregation function keyword arguments. The weights
+            argument to a weighted aggregator, if any, should be an array with
+            the same shape as the cube, or a 1d array with the same length as
+            the grouped dimension.
 
         Returns:
             :class:`iris.cube.Cube`.
 
         .. note::
 
-            This operation does not yet have support for lazy evaluation.
+            Lazy evaluation is supported for the
+            :data:`~iris.analysis.COUNT`, :data:`~iris.analysis.MAX`,
+            :data:`~iris.analysis.MEAN`, :data:`~iris.analysis.MIN` and
+            :data:`~iris.analysis.SUM` aggregators.  For these, the data is
+            read in blocks and all the groups are aggregated together, so
+            the data of a lazy cube is not loaded into memory at once.
 
         For example:
 
@@ -3441,11 +3458,11 @@ bound=(1994-12-01 00:00:00, 1998-12-01 00:00:00)
         groupby_coords = []
         dimension_to_groupby = None
 
-        # We can't handle weights
+        # We can't return the weights of each group.
         if isinstance(aggregator, iris.analysis.WeightedAggregator) and \
-                aggregator.uses_weighting(**kwargs):
-            raise ValueError('Invalid Aggregation, aggregated_by() cannot use'
-                             ' weights.')
+                kwargs.get('returned', False):
+            raise ValueError('Invalid Aggregation, aggregated_by() cannot'
+                             ' return weights.')
 
         coords = self._as_list_of_coords(coords)
         for coord in sorted(coords, key=lambda coord: coord._as_defn()):
@@ -3471,6 +3488,20 @@ bound=(1994-12-01 00:00:00, 1998-12-01 00:00:00)
             lambda coord_: coord_ not in groupby_coords,
             self.coords(dimensions=dimension_to_groupby)))
 
+        # Broadcast any weights to the shape of the cube.
+        if kwargs.get('weights') is not None:
+            weights = np.asarray(kwargs['weights'])
+            if weights.shape == (self.shape[dimension_to_groupby],):
+                weights = iris.util.broadcast_to_shape(
+                    weights, self.shape, (dimension_to_groupby,))
+            elif weights.shape != self.shape:
+                raise ValueError('Weights for grouped aggregation must be an '
+                                 'array with the same shape as the cube, or '
+                                 'a 1d array with the same length as the '
+                                 'grouped dimension.')
+            kwargs = dict(kwargs)
+            kwargs['weights'] = weights
+
         # Create the aggregation group-by instance.
         groupby = iris.analysis._Groupby(groupby_coords, shared_coords)
 
@@ -3488,30 +3519,55 @@ bound=(1994-12-01 00:00:00, 1998-12-01 00:00:00)
         data_shape = list(self.shape + aggregator.aggregate_shape(**kwargs))
         data_shape[dimension_to_groupby] = len(groupby)
 
-        # Aggregate the group-by data.
-        cube_slice = [slice(None, None)] * len(data_shape)
-
-        for i, groupby_slice in enumerate(groupby.group()):
-            # Slice the cube with the group-by slice to create a group-by
-            # sub-cube.
-            cube_slice[dimension_to_groupby] = groupby_slice
-            groupby_sub_cube = self[tuple(cube_slice)]
-            # Perform the aggregation over the group-by sub-cube and
-            # repatriate the aggregated data into the aggregate-by cube data.
-            cube_slice[dimension_to_groupby] = i
-            result = aggregator.aggregate(groupby_sub_cube.data,
-                                          axis=dimension_to_groupby,
-                                          **kwargs)
-
-            # Determine aggregation result data type for the aggregate-by cube
-            # data on first pass.
-            if i == 0:
-                if isinstance(self.data, ma.MaskedArray):
-                    aggregateby_data = ma.zeros(data_shape, dtype=result.dtype)
-                else:
-                    aggregateby_data = np.zeros(data_shape, dtype=result.dtype)
+        # Aggregate all the groups at once, where the aggregator allows.
+        aggregateby_data = iris.analysis._group_reduce.group_reduce(
+            self.lazy_data(), dimension_to_groupby, list(groupby.group()),
+            aggregator, **kwargs)
+        if aggregateby_data is not None and not self.has_lazy_data():
+            aggregateby_data = aggregateby_data.masked_array()
+            # Groups without a result, such as those whose weights sum to
+            # zero, stay masked, even for unmasked data.
+            if not isinstance(self.data, ma.MaskedArray) and \
+                    not ma.is_masked(aggregateby_data):
+                aggregateby_data = aggregateby_data.filled()
+
+        # Otherwise, aggregate the group-by data one group at a time.
+        if aggregateby_data is None:
+            cube_slice = [slice(None, None)] * len(data_shape)
+
+            for i, groupby_slice in enumerate(groupby.group()):
+                # Slice the cube with the group-by slice to create a
+                # group-by sub-cube.
+                cube_slice[dimension_to_groupby] = groupby_slice
+                groupby_sub_cube = self[tuple(cube_slice)]
+                groupby_kwargs = kwargs
+                if kwargs.get('weights') is not None:
+                    weights_slice = cube_slice[:self.ndim]
+                    if isinstance(groupby_slice, tuple):
+                        weights_slice[dimension_to_groupby] = \
+                            list(groupby_slice)
+                    groupby_kwargs = dict(kwargs)
+                    groupby_kwargs['weights'] = \
+                        kwargs['weights'][tuple(weights_slice)]
+                # Perform the aggregation over the group-by sub-cube and
+                # repatriate the aggregated data into the aggregate-by cube
+                # data.
+                cube_slice[dimension_to_groupby] = i
+                result = aggregator.aggregate(groupby_sub_cube.data,
+                                              axis=dimension_to_groupby,
+                                              **groupby_kwargs)
+
+                # Determine aggregation result data type for the
+                # aggregate-by cube data on first pass.
+                if i == 0:
+                    if isinstance(self.data, ma.MaskedArray):
+                        aggregateby_data = ma.zeros(data_shape,
+                                                    dtype=result.dtype)
+                    else:
+                        aggregateby_data = np.zeros(data_shape,
+                                                    dtype=result.dtype)
 
-            aggregateby_data[tuple(cube_slice)] = result
+                aggregateby_data[tuple(cube_slice)] = result
 
         # Add the aggregation meta data to the aggregate-by cube.
         aggregator.update_metadata(aggregateby_cube,
@@ -3564,7 +3620,12 @@ bound=(1994-12-01 00:00:00, 1998-12-01 00:00:00)
 
         .. note::
 
-            This operation does not yet have support for lazy evaluation.
+            Lazy evaluation is supported for the
+            :data:`~iris.analysis.COUNT`, :data:`~iris.analysis.MAX`,
+            :data:`~iris.analysis.MEAN`, :data:`~iris.analysis.MIN` and
+            :data:`~iris.analysis.SUM` aggregators without weights.  For
+            these, the data is read in blocks, and the cost of each window
+            does not depend on its length.
 
         For example:
 
@@ -3654,13 +3715,6 @@ bound=(1994-12-01 00:00:00, 1998-12-01 00:00:00)
         key[dimension] = slice(None, self.shape[dimension] - window + 1)
         new_cube = self[tuple(key)]
 
-        # take a view of the original data using the rolling_window function
-        # this will add an extra dimension to the data at dimension + 1 which
-        # represents the rolled window (i.e. will have a length of window)
-        rolling_window_data = iris.util.rolling_window(self.data,
-                                                       window=window,
-                                                       axis=dimension)
-
         # now update all of the coordinates to reflect the aggregation
         for coord_ in self.coords(dimensions=dimension):
             if coord_.has_bounds():
@@ -3699,22 +3753,39 @@ bound=(1994-12-01 00:00:00, 1998-12-01 00:00:00)
             new_cube, [coord],
             action='with a rolling window of length %s over' % window,
             **kwargs)
-        # and perform the data transformation, generating weights first if
-        # needed
-        if isinstance(aggregator, iris.analysis.WeightedAggregator) and \
-                aggregator.uses_weighting(**kwargs):
-            if 'weights' in kwargs:
-                weights = kwargs['weights']
-                if weights.ndim > 1 or weights.shape[0] != window:
-                    raise ValueError('Weights for rolling window aggregation '
-                                     'must be a 1d array with the same length '
-                                     'as the window.')
-                kwargs = dict(kwargs)
-                kwargs['weights'] = iris.util.broadcast_to_shape(
-                    weights, rolling_window_data.shape, (dimension + 1,))
-        data_result = aggregator.aggregate(rolling_window_data,
-                                           axis=dimension + 1,
-                                           **kwargs)
+        # and perform the data transformation, lazily where the aggregator
+        # allows
+        data_result = iris.analysis._rolling_reduce.rolling_reduce(
+            self.lazy_data(), dimension, window, aggregator, **kwargs)
+        if data_result is not None and not self.has_lazy_data():
+            data_result = data_result.masked_array()
+            if not isinstance(self.data, ma.MaskedArray):
+                data_result = data_result.filled()
+
+        if data_result is None:
+            # take a view of the original data using the rolling_window
+            # function this will add an extra dimension to the data at
+            # dimension + 1 which represents the rolled window (i.e. will
+            # have a length of window)
+            rolling_window_data = iris.util.rolling_window(self.data,
+                                                           window=window,
+                                                           axis=dimension)
+            # generating weights first if needed
+            if isinstance(aggregator, iris.analysis.WeightedAggregator) and \
+                    aggregator.uses_weighting(**kwargs):
+                if 'weights' in kwargs:
+                    weights = kwargs['weights']
+                    if weights.ndim > 1 or weights.shape[0] != window:
+                        raise ValueError('Weights for rolling window '
+                                         'aggregation must be a 1d array '
+                                         'with the same length as the '
+                                         'window.')
+                    kwargs = dict(kwargs)
+                    kwargs['weights'] = iris.util.broadcast_to_shape(
+                        weights, rolling_window_data.shape, (dimension + 1,))
+            data_result = aggregator.aggregate(rolling_window_data,
+                                               axis=dimension + 1,
+                                               **kwargs)
         result = aggregator.post_process(new_cube, data_result, [coord],
                                          **kwargs)
         return result
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2010 - 2016, Met Office
+# (C) British Crown Copyright 2010 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -25,6 +25,9 @@ from six.moves import (filter, input, map, range, zip)  # noqa
 from iris.io.format_picker import (FileExtension, FormatAgent,
                                    FormatSpecification, MagicNumber,
                                    UriProtocol, LeadingLine)
+from ._cf_cache import CF_CACHE
+from ._decode_pool import DECODE_POOL
+from ._file_pool import FILE_POOL
 from . import abf
 from . import um
 try:
@@ -41,7 +44,7 @@ from . import nimrod
 from . import pp
 
 
-__all__ = ['FORMAT_AGENT']
+__all__ = ['CF_CACHE', 'DECODE_POOL', 'FILE_POOL', 'FORMAT_AGENT']
 
 
 FORMAT_AGENT = FormatAgent()
@@ -95,14 +98,16 @@ FORMAT_AGENT.add_spec(FormatSpecification('NetCDF',
                                           MagicNumber(4),
                                           0x43444601,
                                           netcdf.load_cubes,
-                                          priority=5))
+                                          priority=5,
+                                          constraint_aware_handler=True))
 
 
 FORMAT_AGENT.add_spec(FormatSpecification('NetCDF 64 bit offset format',
                                           MagicNumber(4),
                                           0x43444602,
                                           netcdf.load_cubes,
-                                          priority=5))
+                                          priority=5,
+                                          constraint_aware_handler=True))
 
 
 # This covers both v4 and v4 classic model.
@@ -110,14 +115,16 @@ FORMAT_AGENT.add_spec(FormatSpecification('NetCDF_v4',
                                           MagicNumber(8),
                                           0x894844460D0A1A0A,
                                           netcdf.load_cubes,
-                                          priority=5))
+                                          priority=5,
+                                          constraint_aware_handler=True))
 
 
 _nc_dap = FormatSpecification('NetCDF OPeNDAP',
                               UriProtocol(),
                               lambda protocol: protocol in ['http', 'https'],
                               netcdf.load_cubes,
-                              priority=6)
+                              priority=6,
+                              constraint_aware_handler=True)
 FORMAT_AGENT.add_spec(_nc_dap)
 del _nc_dap
 
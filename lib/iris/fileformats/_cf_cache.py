@@ -0,0 +1,172 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+A cache of the CF structure of netCDF files, so that loading the same files
+again does not repeat the identification of the CF-netCDF variables.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+from six.moves import cPickle as pickle
+
+from collections import OrderedDict
+import hashlib
+import os
+import tempfile
+import threading
+
+
+#: The default maximum number of files whose structure is kept in memory.
+DEFAULT_MAX_ENTRIES = 128
+
+
+class CFStructureCache(object):
+    """
+    A bounded, thread-safe, least-recently-used cache of the CF structure of
+    netCDF files, as identified by :class:`iris.fileformats.cf.CFReader`.
+
+    Each entry is keyed by the path of a file together with its size and
+    modification time, so a file which is replaced or modified is parsed
+    again.  The cache holds at most :attr:`max_entries` entries in memory,
+    and, if :attr:`cache_dir` is set, also keeps each entry in a file of
+    that directory, so that it may be shared between processes.
+
+    The attributes :attr:`hits` and :attr:`misses` count the number of
+    requests satisfied by the cache and the number of files parsed,
+    respectively.
+
+    """
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, cache_dir=None):
+        #: The maximum number of entries which are kept in memory.
+        #: Zero disables the in-memory cache.
+        self.max_entries = max_entries
+        #: The directory in which entries are kept on disk, or None to
+        #: disable the disk cache.
+        self.cache_dir = cache_dir
+        #: The number of requests which found a cached entry.
+        self.hits = 0
+        #: The number of requests which found no cached entry.
+        self.misses = 0
+        self._lock = threading.Lock()
+        # The entries, with the least recently used first.
+        self._entries = OrderedDict()
+
+    def __repr__(self):
+        fmt = '<{self.__class__.__name__} max_entries={self.max_entries}' \
+              ' cache_dir={self.cache_dir!r} hits={self.hits}' \
+              ' misses={self.misses}>'
+        return fmt.format(self=self)
+
+    @property
+    def enabled(self):
+        """Whether either the in-memory or the disk cache is in use."""
+        return self.max_entries > 0 or self.cache_dir is not None
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, 'cf_{}.pickle'.format(digest))
+
+    def _disk_get(self, key):
+        # Return the entry for the key from the disk cache, if any.
+        try:
+            with open(self._disk_path(key), 'rb') as fh:
+                disk_key, entry = pickle.load(fh)
+        except Exception:
+            # A missing, incomplete or incompatible file is simply a miss.
+            return None
+        if disk_key != key:
+            return None
+        return entry
+
+    def _disk_put(self, key, entry):
+        # Write the entry to the disk cache, via a temporary file so that a
+        # concurrent reader never sees a partial entry.
+        path = self._disk_path(key)
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir,
+                                             suffix='.tmp')
+            with os.fdopen(fd, 'wb') as fh:
+                pickle.dump((key, entry), fh, pickle.HIGHEST_PROTOCOL)
+            os.rename(temp_path, path)
+        except (IOError, OSError, pickle.PicklingError):
+            # The disk cache is only an optimisation.
+            pass
+
+    def get(self, key):
+        """
+        Return the cached entry for the key, or None.
+
+        Args:
+
+        * key (tuple):
+            Identifies a parsed file and the options it was parsed with.
+
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+        if entry is None and self.cache_dir is not None:
+            entry = self._disk_get(key)
+            if entry is not None:
+                self._remember(key, entry)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """
+        Cache the entry for the key.
+
+        Args:
+
+        * key (tuple):
+            Identifies a parsed file and the options it was parsed with.
+
+        * entry:
+            The picklable structure of the file.
+
+        """
+        self._remember(key, entry)
+        if self.cache_dir is not None:
+            self._disk_put(key, entry)
+
+    def _remember(self, key, entry):
+        # Add an entry to the in-memory cache, evicting the least recently
+        # used entries as required.
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > max(self.max_entries, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Empty the in-memory cache.  The files of the disk cache are kept.
+
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+#: The cache of the CF structure of the netCDF files read by
+#: :class:`iris.fileformats.cf.CFReader`.
+CF_CACHE = CFStructureCache()
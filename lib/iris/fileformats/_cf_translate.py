@@ -0,0 +1,253 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Direct translation of the common cases of CF-netCDF data variables into
+cubes, without running the PyKE inference engine.
+
+The translation applies the same rules as the PyKE rule base
+"fc_rules_cf.krb", in the same order, and builds the cube with the same
+helper functions.  Data variables which use anything beyond a
+latitude-longitude or rotated pole grid mapping, or whose coordinates could
+be classified more than one way, are left to the rule base.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+import six
+
+
+# The formula types which are recognised by the rule base.
+_FORMULA_TYPES = ('atmosphere_hybrid_height_coordinate',
+                  'atmosphere_hybrid_sigma_pressure_coordinate',
+                  'ocean_sigma_z_coordinate', 'ocean_sigma_coordinate',
+                  'ocean_s_coordinate', 'ocean_s_coordinate_g1',
+                  'ocean_s_coordinate_g2')
+
+
+def _rules_module():
+    # The rule base helper functions, from the compiled rule base, or None
+    # if it is not available.
+    try:
+        from iris.fileformats._pyke_rules.compiled_krb import fc_rules_cf_fc
+    except ImportError:
+        fc_rules_cf_fc = None
+    return fc_rules_cf_fc
+
+
+def _grid_mapping(engine, fc):
+    # Return the name and kind of the grid mapping of the data variable,
+    # either of which may be None, or None if the rule base is needed.
+    cf_group = engine.cf_var.cf_group
+    names = list(cf_group.grid_mappings.keys())
+    if len(names) > 1:
+        return None
+    name = kind = None
+    if names:
+        name, = names
+        mapping_name = getattr(cf_group[name], fc.CF_ATTR_GRID_MAPPING_NAME,
+                               None)
+        if mapping_name is not None:
+            kind = mapping_name.lower()
+        if kind not in (None, fc.CF_GRID_MAPPING_LAT_LON,
+                        fc.CF_GRID_MAPPING_ROTATED_LAT_LON):
+            return None
+    return name, kind
+
+
+def _dimension_coordinates(engine, fc, cs_kind):
+    # Return a list of (CF name, coordinate name, uses coordinate system)
+    # for the dimension coordinates to build, or None if the rule base is
+    # needed.
+    tests = (('latitude', fc.is_latitude),
+             ('longitude', fc.is_longitude),
+             ('projection_x', fc.is_projection_x_coordinate),
+             ('projection_y', fc.is_projection_y_coordinate),
+             ('time', fc.is_time),
+             ('time_period', fc.is_time_period))
+    rotated_tests = {'latitude': (fc.is_rotated_latitude,
+                                  fc.CF_VALUE_STD_NAME_LAT,
+                                  fc.CF_VALUE_STD_NAME_GRID_LAT),
+                     'longitude': (fc.is_rotated_longitude,
+                                   fc.CF_VALUE_STD_NAME_LON,
+                                   fc.CF_VALUE_STD_NAME_GRID_LON)}
+    result = []
+    for cf_name in engine.cf_var.cf_group.coordinates:
+        kinds = [kind for kind, test in tests if test(engine, cf_name)]
+        if len(kinds) > 1:
+            return None
+        kind = kinds[0] if kinds else None
+        if kind in rotated_tests:
+            is_rotated, name, grid_name = rotated_tests[kind]
+            if cs_kind is None:
+                result.append((cf_name, name, False))
+            elif (cs_kind == fc.CF_GRID_MAPPING_LAT_LON and
+                    not is_rotated(engine, cf_name)):
+                result.append((cf_name, name, True))
+            elif (cs_kind == fc.CF_GRID_MAPPING_ROTATED_LAT_LON and
+                    is_rotated(engine, cf_name)):
+                result.append((cf_name, grid_name, True))
+            else:
+                return None
+        elif kind in ('projection_x', 'projection_y'):
+            return None
+        else:
+            result.append((cf_name, None, False))
+    return result
+
+
+def _auxiliary_coordinates(engine, fc):
+    # Return a list of (CF name, coordinate name) for the auxiliary
+    # coordinates to build, or None if the rule base is needed.
+    result = []
+    for cf_name in engine.cf_var.cf_group.auxiliary_coordinates:
+        is_time = fc.is_time(engine, cf_name)
+        is_time_period = fc.is_time_period(engine, cf_name)
+        is_latitude = fc.is_latitude(engine, cf_name)
+        is_longitude = fc.is_longitude(engine, cf_name)
+        if is_time + is_time_period + is_latitude + is_longitude > 1:
+            return None
+        name = None
+        if is_latitude:
+            if fc.is_rotated_latitude(engine, cf_name):
+                name = fc.CF_VALUE_STD_NAME_GRID_LAT
+            else:
+                name = fc.CF_VALUE_STD_NAME_LAT
+        elif is_longitude:
+            if fc.is_rotated_longitude(engine, cf_name):
+                name = fc.CF_VALUE_STD_NAME_GRID_LON
+            else:
+                name = fc.CF_VALUE_STD_NAME_LON
+        result.append((cf_name, name))
+    return result
+
+
+def _formula_terms(engine, cf):
+    # Return the formula root and the (variable name, term) pairs of the
+    # formula terms of the data variable, or None if the rule base is
+    # needed.
+    cf_group = engine.cf_var.cf_group
+    roots = set()
+    terms = []
+    for cf_var in six.itervalues(cf.cf_group.formula_terms):
+        for cf_root, cf_term in six.iteritems(cf_var.cf_terms_by_root):
+            if cf_root in cf_group:
+                roots.add(cf_root)
+                terms.append((cf_var.cf_name, cf_term))
+    root = None
+    if roots:
+        if len(roots) > 1:
+            return None
+        root, = roots
+        if not hasattr(cf_group[root], 'standard_name'):
+            return None
+    return root, terms
+
+
+def translate(engine, cf, cf_var):
+    """
+    Populate the cube of the given engine from its CF-netCDF data variable,
+    as the rule base would, if the data variable is a common case.
+
+    The engine must be prepared as for running the rule base.  Returns
+    whether the translation was done; if not, the cube is unchanged.
+
+    """
+    fc = _rules_module()
+    if fc is None:
+        return False
+    cf_group = cf_var.cf_group
+
+    # Decide whether the common case applies, before changing anything.
+    grid_mapping = _grid_mapping(engine, fc)
+    if grid_mapping is None:
+        return False
+    grid_mapping_name, cs_kind = grid_mapping
+    dim_coords = _dimension_coordinates(engine, fc, cs_kind)
+    if dim_coords is None:
+        return False
+    aux_coords = _auxiliary_coordinates(engine, fc)
+    if aux_coords is None:
+        return False
+    formula = _formula_terms(engine, cf)
+    if formula is None:
+        return False
+
+    import iris.fileformats.pp as pp
+
+    engine.provides['coordinates'] = []
+    rules = engine.rule_triggered
+
+    fc.build_cube_metadata(engine)
+    rules.add('fc_default')
+
+    coord_system = None
+    if cs_kind == fc.CF_GRID_MAPPING_LAT_LON:
+        coord_system = fc.build_coordinate_system(
+            cf_group.grid_mappings[grid_mapping_name])
+        rules.add('fc_provides_grid_mapping_latitude_longitude')
+    elif cs_kind == fc.CF_GRID_MAPPING_ROTATED_LAT_LON:
+        coord_system = fc.build_rotated_coordinate_system(
+            engine, cf_group.grid_mappings[grid_mapping_name])
+        rules.add('fc_provides_grid_mapping_rotated_latitude_longitude')
+    if coord_system is not None:
+        engine.provides['coordinate_system'] = coord_system
+
+    for cf_name in cf_group.labels:
+        fc.build_auxiliary_coordinate(engine, cf_group.labels[cf_name])
+        rules.add('fc_build_label_coordinate')
+
+    for cf_name, coord_name in aux_coords:
+        fc.build_auxiliary_coordinate(
+            engine, cf_group.auxiliary_coordinates[cf_name],
+            coord_name=coord_name)
+        rules.add('fc_build_auxiliary_coordinate')
+
+    for cf_name in cf_group.cell_measures:
+        fc.build_cell_measures(engine, cf_group.cell_measures[cf_name])
+        rules.add('fc_build_cell_measure')
+
+    for cf_name, coord_name, uses_coord_system in dim_coords:
+        fc.build_dimension_coordinate(
+            engine, cf_group.coordinates[cf_name], coord_name=coord_name,
+            coord_system=coord_system if uses_coord_system else None)
+        rules.add('fc_build_coordinate')
+
+    if (hasattr(cf_var, 'ukmo__um_stash_source') or
+            hasattr(cf_var, 'um_stash_source')):
+        attr_value = (getattr(cf_var, 'um_stash_source', None) or
+                      getattr(cf_var, 'ukmo__um_stash_source'))
+        engine.cube.attributes['STASH'] = pp.STASH.from_msi(attr_value)
+        rules.add('fc_attribute_ukmo__um_stash_source')
+
+    if hasattr(cf_var, 'ukmo__process_flags'):
+        attr_value = cf_var.ukmo__process_flags
+        engine.cube.attributes['ukmo__process_flags'] = tuple(
+            [x.replace('_', ' ') for x in attr_value.split(' ')])
+        rules.add('fc_attribute_ukmo__process_flags')
+
+    root, terms = formula
+    if root is not None:
+        formula_type = cf_group[root].standard_name
+        if formula_type in _FORMULA_TYPES:
+            engine.requires['formula_type'] = formula_type
+            rules.add('fc_formula_type_{}'.format(formula_type))
+        for var_name, term in terms:
+            engine.requires.setdefault('formula_terms', {})[term] = var_name
+            rules.add('fc_formula_terms')
+
+    return True
@@ -0,0 +1,120 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+A pool of threads, shared by the file formats, for decoding or encoding the
+data of many fields concurrently.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+from collections import deque
+import multiprocessing
+import multiprocessing.pool
+import os
+import threading
+
+
+class DecodePool(object):
+    """
+    A pool of threads which decode or encode data concurrently.
+
+    This is only of benefit for functions which release the GIL, such as
+    the WGDOS and RLE packing and unpacking of :mod:`mo_pack`.
+
+    The threads are started on first use, and are replaced in a forked
+    child process.
+
+    """
+    def __init__(self, workers=None):
+        #: The number of decoding threads, which defaults to the number of
+        #: CPUs of the host.  A value of 1 or less decodes serially, in the
+        #: calling thread.
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_key = None
+
+    def __repr__(self):
+        fmt = '<{self.__class__.__name__} workers={self.workers}>'
+        return fmt.format(self=self)
+
+    def _n_workers(self):
+        workers = self.workers
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        return workers
+
+    def _thread_pool(self, workers):
+        # Return the thread pool, creating it as required.
+        key = (os.getpid(), workers)
+        with self._lock:
+            if self._pool_key != key:
+                old_pool = self._pool
+                if old_pool is not None and self._pool_key[0] == key[0]:
+                    old_pool.close()
+                self._pool = multiprocessing.pool.ThreadPool(workers)
+                self._pool_key = key
+            return self._pool
+
+    def imap(self, function, items):
+        """
+        Generate the result of calling the function on each of the items, in
+        order.
+
+        At most two items per worker are decoded ahead of the caller, so a
+        large number of items is decoded with bounded memory.
+
+        Args:
+
+        * function (callable):
+            Called with a single item.
+
+        * items (iterable):
+            The items to decode.
+
+        """
+        workers = self._n_workers()
+        if workers <= 1:
+            for item in items:
+                yield function(item)
+            return
+
+        pool = self._thread_pool(workers)
+        pending = deque()
+        for item in items:
+            pending.append(pool.apply_async(function, (item,)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def close(self):
+        """Stop the decoding threads, until the pool is next used."""
+        with self._lock:
+            pool = self._pool
+            self._pool = None
+            self._pool_key = None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+#: The thread pool used when decoding or encoding the data of many fields
+#: together.
+DECODE_POOL = DecodePool()
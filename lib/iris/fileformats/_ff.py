@@ -460,7 +460,7 @@ class FF2PP(object):
     """
 
     def __init__(self, filename, read_data=False,
-                 word_depth=DEFAULT_FF_WORD_DEPTH):
+                 word_depth=DEFAULT_FF_WORD_DEPTH, _pp_filter=None):
         """
         Create a FieldsFile to Post Process instance that returns a generator
         of PPFields contained within the FieldsFile.
@@ -495,6 +495,7 @@ class FF2PP(object):
         self._word_depth = word_depth
         self._filename = filename
         self._read_data = read_data
+        self._pp_filter = _pp_filter
 
     def _payload(self, field):
         """Calculate the payload data depth (in bytes) and type."""
@@ -674,14 +675,53 @@ class FF2PP(object):
 
             yield field
 
-    def _extract_field(self):
+    def _lookup_headers(self, ff_file):
+        # Generate the integer and real header words of each FF LOOKUP
+        # table entry, skipping any fields rejected by the field filter.
+        from iris.fileformats.um._header_index import ff_lookup_table
+        keeps_header = getattr(self._pp_filter, 'keeps_header', None)
+        indexed = ff_lookup_table(self._filename, self._ff_header, ff_file,
+                                  self._word_depth)
+        if indexed is not None:
+            for header_longs, header_floats in zip(*indexed):
+                if keeps_header is None or keeps_header(header_longs):
+                    yield header_longs, header_floats
+            return
+
         # FF table pointer initialisation based on FF LOOKUP table
         # configuration.
-
         lookup_table = self._ff_header.lookup_table
         table_index, table_entry_depth, table_count = lookup_table
         table_offset = (table_index - 1) * self._word_depth       # in bytes
         table_entry_depth = table_entry_depth * self._word_depth  # in bytes
+        while table_count:
+            table_count -= 1
+            # Move file pointer to the start of the current FF LOOKUP
+            # table entry.
+            ff_file.seek(table_offset, os.SEEK_SET)
+
+            # Read the current PP header entry from the FF LOOKUP table.
+            header_longs = np.fromfile(
+                ff_file, dtype='>i{0}'.format(self._word_depth),
+                count=pp.NUM_LONG_HEADERS)
+            # Check whether the current FF LOOKUP table entry is valid.
+            if header_longs[0] == _FF_LOOKUP_TABLE_TERMINATE:
+                # There are no more FF LOOKUP table entries to read.
+                break
+
+            # Calculate next FF LOOKUP table entry.
+            table_offset += table_entry_depth
+
+            # Skip unwanted fields before reading the rest of the header.
+            if keeps_header is not None and not keeps_header(header_longs):
+                continue
+
+            header_floats = np.fromfile(
+                ff_file, dtype='>f{0}'.format(self._word_depth),
+                count=pp.NUM_FLOAT_HEADERS)
+            yield header_longs, header_floats
+
+    def _extract_field(self):
         # Open the FF for processing.
         with open(self._ff_header.ff_filename, 'rb') as ff_file:
             ff_file_seek = ff_file.seek
@@ -691,28 +731,9 @@ class FF2PP(object):
             grid = self._ff_header.grid()
 
             # Process each FF LOOKUP table entry.
-            while table_count:
-                table_count -= 1
-                # Move file pointer to the start of the current FF LOOKUP
-                # table entry.
-                ff_file_seek(table_offset, os.SEEK_SET)
-
-                # Read the current PP header entry from the FF LOOKUP table.
-                header_longs = np.fromfile(
-                    ff_file, dtype='>i{0}'.format(self._word_depth),
-                    count=pp.NUM_LONG_HEADERS)
-                # Check whether the current FF LOOKUP table entry is valid.
-                if header_longs[0] == _FF_LOOKUP_TABLE_TERMINATE:
-                    # There are no more FF LOOKUP table entries to read.
-                    break
-                header_floats = np.fromfile(
-                    ff_file, dtype='>f{0}'.format(self._word_depth),
-                    count=pp.NUM_FLOAT_HEADERS)
+            for header_longs, header_floats in self._lookup_headers(ff_file):
                 header = tuple(header_longs) + tuple(header_floats)
 
-                # Calculate next FF LOOKUP table entry.
-                table_offset += table_entry_depth
-
                 # Construct a PPField object and populate using the header_data
                 # read from the current FF LOOKUP table.
                 # (The PPField sub-class will depend on the header release
@@ -0,0 +1,266 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+A pool of open files, shared by the deferred data proxies of the file
+formats, so that realising many fields from the same file does not open and
+close the file for each one.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import os
+import threading
+
+
+#: The default maximum number of idle files which are kept open.
+DEFAULT_MAX_OPEN = 32
+
+
+def _open_binary(path):
+    return open(path, 'rb')
+
+
+def _file_signature(path):
+    # Identify the current state of a file, so that a file handle can be
+    # recognised as stale if the file has been replaced or modified.
+    try:
+        stat = os.stat(path)
+    except (IOError, OSError):
+        # For example, an OPeNDAP URL.
+        signature = None
+    else:
+        signature = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime)
+    return signature
+
+
+class FilePool(object):
+    """
+    A bounded, thread-safe, least-recently-used pool of open files.
+
+    A file handle is only ever used by one caller at a time : while it is in
+    use it is removed from the pool, and a concurrent request for the same
+    file opens another handle.
+
+    The pool holds at most :attr:`max_open` idle handles, closing the least
+    recently used handles as required.  A handle is also closed when its
+    file has been replaced or modified, and the pool is emptied (without
+    closing) in a forked child process.
+
+    The attributes :attr:`hits` and :attr:`opens` count the number of
+    requests satisfied by a pooled handle and the number of files opened,
+    respectively.
+
+    """
+    def __init__(self, max_open=DEFAULT_MAX_OPEN):
+        #: The maximum number of idle files which are kept open.
+        #: Zero disables pooling.
+        self.max_open = max_open
+        #: The number of requests which re-used an open file.
+        self.hits = 0
+        #: The number of files opened.
+        self.opens = 0
+        self._lock = threading.Lock()
+        # The idle handles of each (opener, path), with the least recently
+        # used first.
+        self._idle = OrderedDict()
+        self._n_idle = 0
+        # The (opener, path) and file signature of each handle in use,
+        # keyed by the identity of the handle.
+        self._in_use = {}
+        self._pid = os.getpid()
+
+    def __repr__(self):
+        fmt = '<{self.__class__.__name__} max_open={self.max_open}' \
+              ' hits={self.hits} opens={self.opens}>'
+        return fmt.format(self=self)
+
+    @contextmanager
+    def open(self, path, opener=_open_binary):
+        """
+        Provide an open file from the pool, returning it to the pool
+        afterwards.
+
+        Args:
+
+        * path (string):
+            The file to open.
+
+        Kwargs:
+
+        * opener (callable):
+            Opens the file, given its path, returning an object with a
+            `close` method.  Handles made by different openers are pooled
+            separately.  Defaults to opening the file for binary reading.
+
+        For example::
+
+            with FILE_POOL.open(filename) as fh:
+                fh.seek(offset)
+                data = fh.read(data_len)
+
+        """
+        handle = self.checkout(path, opener=opener)
+        completed = False
+        try:
+            yield handle
+            completed = True
+        finally:
+            # After an error, the handle may be left in an unknown state.
+            self.checkin(handle, close=not completed)
+
+    def checkout(self, path, opener=_open_binary):
+        """
+        Take an open file from the pool, or open it, for use until it is
+        handed back with :meth:`checkin`.
+
+        This is for a file which is used beyond the scope of a single
+        `with` statement; otherwise use :meth:`open`.
+
+        Args:
+
+        * path (string):
+            The file to open.
+
+        Kwargs:
+
+        * opener (callable):
+            As for :meth:`open`.
+
+        Returns:
+            The open file.
+
+        """
+        key = (opener, path)
+        signature = _file_signature(path)
+        handle = self._acquire(key, signature)
+        if handle is None:
+            handle = opener(path)
+        with self._lock:
+            self._in_use[id(handle)] = (key, signature)
+        return handle
+
+    def checkin(self, handle, close=False):
+        """
+        Return a file taken with :meth:`checkout` to the pool.
+
+        Args:
+
+        * handle:
+            The open file.
+
+        Kwargs:
+
+        * close (bool):
+            Close the file instead of returning it to the pool, for
+            instance when it may be left in an unknown state.
+
+        """
+        with self._lock:
+            key, signature = self._in_use.pop(id(handle))
+        if close:
+            handle.close()
+        else:
+            self._release(key, signature, handle)
+
+    def _acquire(self, key, signature):
+        # Remove and return a valid idle handle for the key, if any.
+        with self._lock:
+            if self._pid != os.getpid():
+                # The handles of a parent process must not be shared with a
+                # forked child, so just forget them.
+                self._idle.clear()
+                self._n_idle = 0
+                self._pid = os.getpid()
+            handles = self._idle.get(key, [])
+            stale = [handle for handle_signature, handle in handles
+                     if handle_signature != signature]
+            handles = [entry for entry in handles if entry[0] == signature]
+            self._n_idle -= len(stale)
+            handle = None
+            if handles:
+                handle = handles.pop()[1]
+                self._n_idle -= 1
+                self.hits += 1
+            else:
+                self.opens += 1
+            if handles:
+                self._idle[key] = handles
+            else:
+                self._idle.pop(key, None)
+        for stale_handle in stale:
+            stale_handle.close()
+        return handle
+
+    def _release(self, key, signature, handle):
+        # Return a handle to the pool, closing any surplus handles.
+        evicted = []
+        with self._lock:
+            if self._pid == os.getpid():
+                # Make this the most recently used key.
+                handles = self._idle.pop(key, [])
+                handles.append((signature, handle))
+                self._idle[key] = handles
+                self._n_idle += 1
+            else:
+                evicted.append(handle)
+            while self._n_idle > max(self.max_open, 0):
+                oldest_key = next(iter(self._idle))
+                handles = self._idle[oldest_key]
+                evicted.append(handles.pop(0)[1])
+                self._n_idle -= 1
+                if not handles:
+                    del self._idle[oldest_key]
+        for evicted_handle in evicted:
+            evicted_handle.close()
+
+    def discard(self, path):
+        """
+        Close any idle handles of the given file, for instance before the
+        file is overwritten.
+
+        """
+        with self._lock:
+            keys = [key for key in self._idle if key[1] == path]
+            handles = [handle for key in keys
+                       for _, handle in self._idle.pop(key)]
+            self._n_idle -= len(handles)
+        for handle in handles:
+            handle.close()
+
+    def clear(self):
+        """Close all the idle files in the pool."""
+        with self._lock:
+            handles = [handle for entries in self._idle.values()
+                       for _, handle in entries]
+            self._idle.clear()
+            self._n_idle = 0
+        for handle in handles:
+            handle.close()
+
+    def reset_counters(self):
+        """Reset the :attr:`hits` and :attr:`opens` counters to zero."""
+        with self._lock:
+            self.hits = 0
+            self.opens = 0
+
+
+#: The file pool used when reading deferred data.
+FILE_POOL = FilePool()
@@ -39,7 +39,9 @@ import netCDF4
 import numpy as np
 import numpy.ma as ma
 
-from iris._deprecation import warn_deprecated
+from iris._deprecation import IrisDeprecation, warn_deprecated
+from iris.fileformats._cf_cache import CF_CACHE
+from iris.fileformats._file_pool import FILE_POOL, _file_signature
 import iris.util
 
 
@@ -58,6 +60,10 @@ _CF_PARSE = re.compile(r'''
 # therefore automatically classed as "used" attributes.
 _CF_ATTRS_IGNORE = set(['_FillValue', 'add_offset', 'missing_value', 'scale_factor', ])
 
+#: The version of the CF structure kept by the cache of parsed files, which
+#: must change whenever the identification of CF-netCDF variables does.
+_CACHE_VERSION = 2
+
 #: Supported dimensionless vertical coordinate reference surface/phemomenon
 #: formula terms. Ref: [CF] Appendix D.
 reference_terms = dict(atmosphere_sigma_coordinate=['ps'],
@@ -922,6 +928,11 @@ class CFReader(object):
     This class allows the contents of a netCDF file to be interpreted according
     to the 'NetCDF Climate and Forecast (CF) Metadata Conventions'.
 
+    The CF structure identified in a file is kept in
+    :data:`iris.fileformats.CF_CACHE`, so reading the same, unmodified file
+    again does not repeat the identification, although its warnings are
+    issued again.
+
     """
     def __init__(self, filename, warn=False, monotonic=False):
         self._filename = os.path.expanduser(filename)
@@ -934,8 +945,22 @@ class CFReader(object):
         #: Collection of CF-netCDF variables associated with this netCDF file
         self.cf_group = CFGroup()
 
-        self._dataset = netCDF4.Dataset(self._filename, mode='r')
-
+        # Take the dataset from the pool of open files, to which it is
+        # returned when the reader is finished with, so that reading the
+        # deferred data of the file afterwards does not open it again.
+        dataset = FILE_POOL.checkout(self._filename, opener=netCDF4.Dataset)
+        self._dataset = dataset
+        try:
+            self._read(warn, monotonic)
+        except Exception:
+            # The dataset may be left in an unknown state, so close it
+            # rather than returning it to the pool.
+            self._dataset = None
+            FILE_POOL.checkin(dataset, close=True)
+            raise
+
+    def _read(self, warn, monotonic):
+        """Identify the CF-netCDF variables of the dataset."""
         # Issue load optimisation warning.
         if warn and self._dataset.file_format in ['NETCDF3_CLASSIC', 'NETCDF3_64BIT']:
             warnings.warn('Optimise CF-netCDF loading by converting data from NetCDF3 ' \
@@ -943,13 +968,39 @@ class CFReader(object):
 
         self._check_monotonic = monotonic
 
-        self._translate()
-        self._build_cf_groups()
+        key = self._cache_key()
+        structure = None if key is None else CF_CACHE.get(key)
+        if structure is None:
+            issued = self._identify()
+            if key is not None:
+                CF_CACHE.put(key, self._structure(issued))
+        else:
+            self._restore(structure)
         self._reset()
 
     def __repr__(self):
         return '%s(%r)' % (self.__class__.__name__, self._filename)
 
+    def _identify(self):
+        """
+        Identify the CF-netCDF variables and their relationships.
+
+        Returns the category and message of each warning issued in doing
+        so, other than deprecation warnings, which a reader issues afresh.
+
+        """
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self._translate()
+            self._build_cf_groups()
+        issued = []
+        for warning in caught:
+            message = str(warning.message)
+            warnings.warn(message, warning.category)
+            if not issubclass(warning.category, IrisDeprecation):
+                issued.append((warning.category, message))
+        return issued
+
     def _translate(self):
         """Classify the netCDF variables into CF-netCDF variables."""
 
@@ -1111,14 +1162,100 @@ class CFReader(object):
             _netcdf_promote_warning()
 
 
+    def _cache_key(self):
+        """
+        Identify the file and the options which determine its CF structure,
+        or return None if the structure cannot be cached.
+
+        """
+        key = None
+        if CF_CACHE.enabled:
+            signature = _file_signature(self._filename)
+            if signature is not None:
+                key = (_CACHE_VERSION, os.path.abspath(self._filename),
+                       signature, bool(self._check_monotonic),
+                       bool(iris.FUTURE.netcdf_promote))
+        return key
+
+    def _structure(self, issued):
+        """
+        Describe the identified CF-netCDF variables and their relationships
+        by name, together with the warnings issued in identifying them, for
+        the cache of parsed files.
+
+        """
+        variables = []
+        for cf_var in six.itervalues(self.cf_group):
+            measure = None
+            if isinstance(cf_var, CFMeasureVariable):
+                measure = cf_var.cf_measure
+            variables.append((cf_var.cf_name, type(cf_var).__name__, measure,
+                              dict(cf_var.cf_terms_by_root),
+                              list(cf_var.cf_group.keys())))
+        promoted = [(cf_name, list(cf_var.cf_group.keys()))
+                    for cf_name, cf_var in six.iteritems(self.cf_group.promoted)]
+        return dict(global_attributes=dict(self.cf_group.global_attributes),
+                    variables=variables, promoted=promoted,
+                    warnings=list(issued))
+
+    def _restore(self, structure):
+        """
+        Rebuild the CF-netCDF variables and their relationships from a
+        cached description, rather than by identifying them again, and
+        issue the warnings of their identification again.
+
+        """
+        for category, message in structure['warnings']:
+            warnings.warn(message, category)
+
+        variable_types = {cls.__name__: cls for cls in
+                          self._variable_types + (CFCoordinateVariable,
+                                                  CFDataVariable)}
+        nc_variables = self._dataset.variables
+
+        self.cf_group.global_attributes.update(
+            structure['global_attributes'])
+        for cf_name, type_name, measure, terms, _ in structure['variables']:
+            cls = variable_types[type_name]
+            if cls is CFMeasureVariable:
+                cf_var = cls(cf_name, nc_variables[cf_name], measure)
+            else:
+                cf_var = cls(cf_name, nc_variables[cf_name])
+            for cf_root, cf_term in six.iteritems(terms):
+                cf_var.add_formula_term(cf_root, cf_term)
+            self.cf_group[cf_name] = cf_var
+
+        def _restore_group(cf_variable, names):
+            cf_group = CFGroup()
+            for cf_name in names:
+                cf_group[cf_name] = self.cf_group[cf_name]
+            if isinstance(cf_variable, CFDataVariable):
+                cf_group.global_attributes.update(
+                    self.cf_group.global_attributes)
+            cf_variable.cf_group = cf_group
+
+        for cf_name, _, _, _, names in structure['variables']:
+            _restore_group(self.cf_group[cf_name], names)
+        for cf_name, names in structure['promoted']:
+            data_var = CFDataVariable(cf_name, nc_variables[cf_name])
+            self.cf_group.promoted[cf_name] = data_var
+            _restore_group(data_var, names)
+
+        if not iris.FUTURE.netcdf_promote:
+            _netcdf_promote_warning()
+
     def _reset(self):
         """Reset the attribute touch history of each variable."""
         for nc_var_name in six.iterkeys(self._dataset.variables):
             self.cf_group[nc_var_name].cf_attrs_reset()
 
     def __del__(self):
-        # Explicitly close dataset to prevent file remaining open.
-        self._dataset.close()
+        # Return the dataset to the pool of open files, which closes it when
+        # it is no longer needed.
+        dataset = getattr(self, '_dataset', None)
+        if dataset is not None:
+            self._dataset = None
+            FILE_POOL.checkin(dataset)
 
 
 def _getncattr(dataset, attr, default=None):
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2010 - 2016, Met Office
+# (C) British Crown Copyright 2010 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -47,6 +47,7 @@ from iris._deprecation import warn_deprecated
 from iris.analysis._interpolate_private import Linear1dExtrapolator
 import iris.coord_systems as coord_systems
 from iris.exceptions import TranslationError
+from iris.fileformats._file_pool import FILE_POOL
 # NOTE: careful here, to avoid circular imports (as iris imports grib)
 from iris.fileformats.grib import grib_phenom_translation as gptx
 from iris.fileformats.grib import _save_rules
@@ -159,7 +160,7 @@ class GribDataProxy(object):
         return len(self.shape)
 
     def __getitem__(self, keys):
-        with open(self.path, 'rb') as grib_fh:
+        with FILE_POOL.open(self.path) as grib_fh:
             grib_fh.seek(self.offset)
             grib_message = gribapi.grib_new_from_file(grib_fh)
 
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2014 - 2016, Met Office
+# (C) British Crown Copyright 2014 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -31,6 +31,7 @@ import gribapi
 import numpy as np
 
 from iris.exceptions import TranslationError
+from iris.fileformats._file_pool import FILE_POOL
 
 
 class _OpenFileRef(object):
@@ -279,7 +280,7 @@ class _RawGribMessage(object):
 
     @staticmethod
     def from_file_offset(filename, offset):
-        with open(filename, 'rb') as f:
+        with FILE_POOL.open(filename) as f:
             f.seek(offset)
             message_id = gribapi.grib_new_from_file(f)
             if message_id is None:
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2010 - 2016, Met Office
+# (C) British Crown Copyright 2010 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -43,6 +43,7 @@ import numpy as np
 import numpy.ma as ma
 from pyke import knowledge_engine
 
+import iris._constraints
 from iris._deprecation import warn_deprecated
 import iris.analysis
 from iris.aux_factory import HybridHeightFactory, HybridPressureFactory, \
@@ -53,6 +54,8 @@ import iris.coords
 import iris.cube
 import iris.exceptions
 import iris.fileformats.cf
+import iris.fileformats._cf_translate
+from iris.fileformats._file_pool import FILE_POOL
 import iris.fileformats._pyke_rules
 import iris.io
 import iris.util
@@ -61,6 +64,10 @@ import iris.util
 # Show Pyke inference engine statistics.
 DEBUG = False
 
+# Translate the common cases of CF-netCDF data variables directly, rather
+# than with the Pyke inference engine.
+_FAST_TRANSLATION = True
+
 # Pyke CF related file names.
 _PYKE_RULE_BASE = 'fc_rules_cf'
 _PYKE_FACT_BASE = 'facts_cf'
@@ -370,30 +377,46 @@ def _pyke_kb_engine():
     return engine
 
 
+def _chunk_shape(variable):
+    """
+    Return the shape of the HDF5 chunks of a netCDF variable, or None if its
+    data is stored contiguously.
+
+    """
+    chunking = variable.chunking()
+    if not isinstance(chunking, (list, tuple)):
+        # The chunking of a contiguous variable is 'contiguous'.
+        return None
+    return tuple(int(extent) for extent in chunking)
+
+
 class NetCDFDataProxy(object):
     """A reference to the data payload of a single NetCDF file variable."""
 
-    __slots__ = ('shape', 'dtype', 'path', 'variable_name', 'fill_value')
+    __slots__ = ('shape', 'dtype', 'path', 'variable_name', 'fill_value',
+                 'chunks')
 
-    def __init__(self, shape, dtype, path, variable_name, fill_value):
+    def __init__(self, shape, dtype, path, variable_name, fill_value,
+                 chunks=None):
         self.shape = shape
         self.dtype = dtype
         self.path = path
         self.variable_name = variable_name
         self.fill_value = fill_value
+        #: The shape of the chunks of the data on disk, or None if the
+        #: data is not chunked.  Lazy aggregations read the data in blocks
+        #: of whole chunks.
+        self.chunks = chunks
 
     @property
     def ndim(self):
         return len(self.shape)
 
     def __getitem__(self, keys):
-        dataset = netCDF4.Dataset(self.path)
-        try:
+        with FILE_POOL.open(self.path, opener=netCDF4.Dataset) as dataset:
             variable = dataset.variables[self.variable_name]
             # Get the NetCDF variable data and slice.
             data = variable[keys]
-        finally:
-            dataset.close()
         return data
 
     def __repr__(self):
@@ -503,7 +526,8 @@ def _load_cube(engine, cf, cf_var, filename):
     fill_value = getattr(cf_var.cf_data, '_FillValue',
                          netCDF4.default_fillvals[cf_var.dtype.str[1:]])
     proxy = NetCDFDataProxy(cf_var.shape, dummy_data.dtype,
-                            filename, cf_var.cf_name, fill_value)
+                            filename, cf_var.cf_name, fill_value,
+                            chunks=_chunk_shape(cf_var.cf_data))
     data = biggus.OrthoArrayAdapter(proxy)
     cube = iris.cube.Cube(data)
 
@@ -518,11 +542,13 @@ def _load_cube(engine, cf, cf_var, filename):
     engine.rule_triggered = set()
     engine.filename = filename
 
-    # Assert any case-specific facts.
-    _assert_case_specific_facts(engine, cf, cf_var.cf_group)
+    if not (_FAST_TRANSLATION and
+            iris.fileformats._cf_translate.translate(engine, cf, cf_var)):
+        # Assert any case-specific facts.
+        _assert_case_specific_facts(engine, cf, cf_var.cf_group)
 
-    # Run pyke inference engine with forward chaining rules.
-    engine.activate(_PYKE_RULE_BASE)
+        # Run pyke inference engine with forward chaining rules.
+        engine.activate(_PYKE_RULE_BASE)
 
     # Populate coordinate attributes with the untouched attributes from the
     # associated CF-netCDF variable.
@@ -658,7 +684,23 @@ def _load_aux_factory(engine, cube):
         cube.add_aux_factory(factory)
 
 
-def load_cubes(filenames, callback=None):
+def _may_match(constraints, cf_var):
+    """
+    Return whether the cube of the CF-netCDF data variable might match any
+    of the constraints, as judged from the names it could have.
+
+    """
+    # The cube takes its name from the standard name, if valid, else from
+    # the long name or the variable name.
+    names = [getattr(cf_var, attr_name, None)
+             for attr_name in ('standard_name', 'long_name')]
+    names = [name for name in names if name is not None]
+    names.append(cf_var.cf_name)
+    return any(constraint._may_match(names, {}, [])
+               for constraint in constraints)
+
+
+def load_cubes(filenames, callback=None, constraints=None):
     """
     Loads cubes from a list of NetCDF filenames/URLs.
 
@@ -672,6 +714,12 @@ def load_cubes(filenames, callback=None):
     * callback (callable function):
         Function which can be passed on to :func:`iris.io.run_callback`.
 
+    * constraints:
+        The load constraints.  When there is no callback, data variables
+        whose cubes cannot match any of the constraints by name are
+        skipped, without translating their metadata.  The constraints must
+        still be applied to the resulting cubes.
+
     Returns:
         Generator of loaded NetCDF :class:`iris.cubes.Cube`.
 
@@ -682,6 +730,13 @@ def load_cubes(filenames, callback=None):
     if isinstance(filenames, six.string_types):
         filenames = [filenames]
 
+    # A callback may rename the cubes, so the data variables can only be
+    # pruned without one.
+    if constraints is not None and callback is None:
+        constraints = iris._constraints.list_of_constraints(constraints)
+    else:
+        constraints = None
+
     for filename in filenames:
         # Ingest the netCDF file.
         cf = iris.fileformats.cf.CFReader(filename)
@@ -689,6 +744,9 @@ def load_cubes(filenames, callback=None):
         # Process each CF data variable.
         data_variables = (list(cf.cf_group.data_variables.values()) +
                           list(cf.cf_group.promoted.values()))
+        if constraints is not None:
+            data_variables = [cf_var for cf_var in data_variables
+                              if _may_match(constraints, cf_var)]
         for cf_var in data_variables:
             cube = _load_cube(engine, cf, cf_var, filename)
 
@@ -781,6 +839,8 @@ class Saver(object):
         self._existing_dim = {}
         #: A dictionary, mapping formula terms to owner cf variable name
         self._formula_terms_cache = {}
+        # Close any pooled handles of a file which is to be overwritten.
+        FILE_POOL.discard(filename)
         #: NetCDF dataset
         try:
             self._dataset = netCDF4.Dataset(filename, mode='w',
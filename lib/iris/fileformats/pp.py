@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2010 - 2016, Met Office
+# (C) British Crown Copyright 2010 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -27,6 +27,7 @@ import abc
 import collections
 from copy import deepcopy
 import itertools
+import mmap
 import operator
 import os
 import re
@@ -41,9 +42,12 @@ import netcdftime
 
 from iris._deprecation import warn_deprecated
 import iris.config
+from iris.fileformats._decode_pool import DECODE_POOL
+from iris.fileformats._file_pool import FILE_POOL
 import iris.fileformats.rules
 import iris.fileformats.pp_rules
 import iris.coord_systems
+import iris.util
 
 try:
     import mo_pack
@@ -827,6 +831,50 @@ class _LBProc(six.with_metaclass(_FlagMetaclass, BitwiseInt)):
                      if self._value & 2 ** i)
 
 
+# When reading the data of many fields together, neighbouring data payloads
+# in a file are read in a single operation if they are separated by no more
+# than this many bytes.
+_BATCH_READ_MAX_GAP = 16 * 1024
+
+# The maximum number of bytes read in a single operation, when reading the
+# data of many fields together.
+_BATCH_READ_MAX_SIZE = 32 * 1024 ** 2
+
+
+def _batched_data_bytes(proxies):
+    """
+    Generate the data bytes of each of the given PPDataProxy instances, as
+    (index, data_bytes) pairs in file order.
+
+    The data payloads of each file are read in order of position, and
+    payloads which are close together are read in a single operation.
+
+    """
+    order = sorted(range(len(proxies)),
+                   key=lambda i: (proxies[i].path, proxies[i].offset))
+    runs = []
+    for i in order:
+        proxy = proxies[i]
+        end = proxy.offset + proxy.data_len
+        if runs:
+            path, start, run_end, run = runs[-1]
+            if (proxy.path == path and
+                    proxy.offset - run_end <= _BATCH_READ_MAX_GAP and
+                    max(end, run_end) - start <= _BATCH_READ_MAX_SIZE):
+                run.append(i)
+                runs[-1] = (path, start, max(end, run_end), run)
+                continue
+        runs.append((proxy.path, proxy.offset, end, [i]))
+
+    for path, start, end, run in runs:
+        with FILE_POOL.open(path) as data_file:
+            data_file.seek(start, os.SEEK_SET)
+            run_bytes = data_file.read(end - start)
+        for i in run:
+            offset = proxies[i].offset - start
+            yield i, run_bytes[offset:offset + proxies[i].data_len]
+
+
 class PPDataProxy(object):
     """A reference to the data payload of a single PP field."""
 
@@ -870,17 +918,118 @@ class PPDataProxy(object):
     def ndim(self):
         return len(self.shape)
 
+    def _data(self, data_bytes):
+        # Decode the data payload.
+        return _data_bytes_to_shaped_array(data_bytes,
+                                           self.lbpack,
+                                           self.boundary_packing,
+                                           self.shape, self.src_dtype,
+                                           self.mdi, self.mask)
+
+    def _region(self, keys):
+        # Return the row and column indices selected by the keys, when they
+        # select part of an unpacked field, whose data can then be read
+        # directly from the file.  Otherwise, return None.
+        if (self.lbpack.n1 != 0 or self.lbpack.n2 != 0 or
+                self.boundary_packing is not None or self.ndim != 2):
+            return None
+        try:
+            keys = iris.util._build_full_slice_given_keys(keys, self.ndim)
+        except IndexError:
+            return None
+        indices = []
+        n_arrays = 0
+        for key, size in zip(keys, self.shape):
+            if isinstance(key, (bool, np.bool_)):
+                return None
+            if not isinstance(key, (slice, np.integer) + six.integer_types):
+                key = np.asarray(key)
+                if key.ndim != 1 or key.dtype.kind not in 'iu':
+                    return None
+                n_arrays += 1
+            indices.append(np.arange(size)[key])
+        if n_arrays > 1 or any(np.size(index) == 0 for index in indices):
+            return None
+        if all(np.size(index) == size
+               for index, size in zip(indices, self.shape)):
+            # This is the whole field.
+            return None
+        return tuple(indices)
+
+    def _read_region(self, rows, columns):
+        # Read the given rows and columns of an unpacked field, reading only
+        # the part of the data payload which spans them.
+        row_start, row_stop = np.min(rows), np.max(rows) + 1
+        col_start, col_stop = np.min(columns), np.max(columns) + 1
+        n_rows = row_stop - row_start
+        n_cols = col_stop - col_start
+        row_len = self.shape[1]
+        itemsize = self.src_dtype.itemsize
+        block = np.zeros((n_rows, row_len), dtype=self.src_dtype)
+        start = row_start * row_len + col_start
+        span = (row_stop - 1) * row_len + col_stop - start
+        with FILE_POOL.open(self.path) as pp_file:
+            if n_rows == 1 or span <= 2 * n_rows * n_cols:
+                # Read the region in one operation.
+                pp_file.seek(self.offset + start * itemsize, os.SEEK_SET)
+                data_bytes = pp_file.read(span * itemsize)
+                block.reshape(-1)[col_start:col_start + span] = \
+                    np.frombuffer(data_bytes, dtype=self.src_dtype)
+            else:
+                # Read just the requested columns of each requested row.
+                for row in np.unique(rows):
+                    pp_file.seek(self.offset +
+                                 (row * row_len + col_start) * itemsize,
+                                 os.SEEK_SET)
+                    data_bytes = pp_file.read(n_cols * itemsize)
+                    block[row - row_start, col_start:col_stop] = \
+                        np.frombuffer(data_bytes, dtype=self.src_dtype)
+        block = block[:, col_start:col_stop].astype(self.dtype)
+        if self.mdi in block:
+            block = ma.masked_values(block, self.mdi, copy=False)
+        rows = rows - row_start
+        columns = columns - col_start
+        if np.ndim(rows) == 1 and np.ndim(columns) == 1:
+            result = block[np.ix_(rows, columns)]
+        else:
+            result = block[rows, columns]
+        return result
+
     def __getitem__(self, keys):
-        with open(self.path, 'rb') as pp_file:
+        region = self._region(keys)
+        if region is not None:
+            return self._read_region(*region)
+        with FILE_POOL.open(self.path) as pp_file:
             pp_file.seek(self.offset, os.SEEK_SET)
             data_bytes = pp_file.read(self.data_len)
-            data = _data_bytes_to_shaped_array(data_bytes,
-                                               self.lbpack,
-                                               self.boundary_packing,
-                                               self.shape, self.src_dtype,
-                                               self.mdi, self.mask)
+        data = self._data(data_bytes)
         return data.__getitem__(keys)
 
+    @staticmethod
+    def _batch_read(proxies):
+        """
+        Generate the entire data of each of the given proxies, as
+        (index, data) pairs, reading the data of many fields together.
+
+        Packed (WGDOS or RLE) fields are unpacked concurrently, by the
+        threads of :data:`iris.fileformats.DECODE_POOL`.
+
+        This is used by :func:`iris._lazy_data.masked_array`.
+
+        """
+        def decode(item):
+            i, data_bytes = item
+            return i, proxies[i]._data(data_bytes)
+
+        items = _batched_data_bytes(proxies)
+        if any(proxy.lbpack.n1 in (1, 4) for proxy in proxies):
+            # Unpack the fields concurrently.
+            results = DECODE_POOL.imap(decode, items)
+        else:
+            results = map(decode, items)
+        for result in results:
+            yield result
+
     def __repr__(self):
         fmt = '<{self.__class__.__name__} shape={self.shape}' \
               ' src_dtype={self.dtype!r} path={self.path!r}' \
@@ -1380,6 +1529,22 @@ class PPField(six.with_metaclass(abc.ABCMeta, object)):
             'lblrec' and 'lbuser[0]'. Some fields are not currently
             populated, these are: 'lbegin', 'lbnrec', 'lbuser[1]'.
 
+        """
+        if not hasattr(file_handle, 'write'):
+            raise TypeError('The file_handle argument must be an instance of a'
+                            ' Python file object, but got %r. \n e.g. '
+                            'open(filename, "wb") to open a binary file with'
+                            ' write permission.' % type(file_handle))
+
+        for chunk in self._encoded():
+            file_handle.write(chunk)
+
+    def _encoded(self):
+        """
+        Return the saved form of the PPField, as a list of byte strings.
+
+        This is the content written by :meth:`save`.
+
         """
 
         # Before we can actually write to file, we need to calculate the header
@@ -1509,34 +1674,27 @@ class PPField(six.with_metaclass(abc.ABCMeta, object)):
 
         # NB: lbegin, lbnrec, lbuser[1] not set up
 
-        # Now that we have done the manouvering required, write to the file...
-        if not hasattr(file_handle, 'write'):
-            raise TypeError('The file_handle argument must be an instance of a'
-                            ' Python file object, but got %r. \n e.g. '
-                            'open(filename, "wb") to open a binary file with'
-                            ' write permission.' % type(file_handle))
-
-        pp_file = file_handle
+        chunks = []
 
         # header length
-        pp_file.write(struct.pack(">L", PP_HEADER_DEPTH))
+        chunks.append(struct.pack(">L", PP_HEADER_DEPTH))
 
         # 45 integers
-        lb.tofile(pp_file)
+        chunks.append(lb.tobytes())
         # 19 floats
-        b.tofile(pp_file)
+        chunks.append(b.tobytes())
 
         # Header length (again)
-        pp_file.write(struct.pack(">L", PP_HEADER_DEPTH))
+        chunks.append(struct.pack(">L", PP_HEADER_DEPTH))
 
         # Data length (including extra data length)
-        pp_file.write(struct.pack(">L", int(len_of_data_payload)))
+        chunks.append(struct.pack(">L", int(len_of_data_payload)))
 
         # the data itself
         if lbpack == 0:
-            data.tofile(pp_file)
+            chunks.append(data.tobytes())
         elif lbpack == 1:
-            pp_file.write(packed_data)
+            chunks.append(packed_data)
         else:
             msg = 'Writing packed pp data with lbpack of {} ' \
                   'is not supported.'.format(lbpack)
@@ -1544,16 +1702,18 @@ class PPField(six.with_metaclass(abc.ABCMeta, object)):
 
         # extra data elements
         for int_code, extra_data in extra_items:
-            pp_file.write(struct.pack(">L", int(int_code)))
+            chunks.append(struct.pack(">L", int(int_code)))
             if isinstance(extra_data, six.string_types):
-                pp_file.write(struct.pack(">%ss" % len(extra_data),
-                              extra_data.encode()))
+                chunks.append(struct.pack(">%ss" % len(extra_data),
+                                          extra_data.encode()))
             else:
                 extra_data = extra_data.astype(np.dtype('>f4'))
-                extra_data.tofile(pp_file)
+                chunks.append(extra_data.tobytes())
 
         # Data length (again)
-        pp_file.write(struct.pack(">L", int(len_of_data_payload)))
+        chunks.append(struct.pack(">L", int(len_of_data_payload)))
+
+        return chunks
 
     ##############################################################
     #
@@ -1787,7 +1947,7 @@ def make_pp_field(header):
 LoadedArrayBytes = collections.namedtuple('LoadedArrayBytes', 'bytes, dtype')
 
 
-def load(filename, read_data=False, little_ended=False):
+def load(filename, read_data=False, little_ended=False, _pp_filter=None):
     """
     Return an iterator of PPFields given a filename.
 
@@ -1813,7 +1973,8 @@ def load(filename, read_data=False, little_ended=False):
     """
     return _interpret_fields(_field_gen(filename,
                                         read_data_bytes=read_data,
-                                        little_ended=little_ended))
+                                        little_ended=little_ended,
+                                        pp_filter=_pp_filter))
 
 
 def _interpret_fields(fields):
@@ -1890,7 +2051,125 @@ def _create_field_data(field, data_shape, land_mask):
         field._data = biggus.NumpyArrayAdapter(proxy)
 
 
-def _field_gen(filename, read_data_bytes, little_ended=False):
+def _header_dtype(little_ended=False):
+    """
+    Return the structured dtype of a single PP field header, with the
+    "longs" and "floats" elements as separate fields.
+
+    """
+    dtype_endian_char = '<' if little_ended else '>'
+    return np.dtype([
+        ('longs', '%ci%d' % (dtype_endian_char, PP_WORD_DEPTH),
+         (NUM_LONG_HEADERS,)),
+        ('floats', '%cf%d' % (dtype_endian_char, PP_WORD_DEPTH),
+         (NUM_FLOAT_HEADERS,))])
+
+
+# The zero-based indices of the header "longs" needed to scan and filter a
+# PP file.
+_LBLREC_INDEX = 14
+_LBEXT_INDEX = 19
+_LBREL_INDEX = 21
+_LBUSER4_INDEX = 41
+_LBUSER7_INDEX = 44
+
+# The (LBUSER7, LBUSER4) header words of a land-mask field.
+_LAND_MASK_STASH_CODES = (1, 30)
+
+# The bytes which precede the data payload of each field : the header, its
+# two enclosing record length words, and the data record length word.
+_PRE_DATA_DEPTH = PP_HEADER_DEPTH + 3 * PP_WORD_DEPTH
+
+
+def _scan_headers(pp_file, little_ended=False):
+    """
+    Read the headers of all the fields within an open PP file.
+
+    The file is memory-mapped, and walked only to find the offset of each
+    field from the record length words.  All the headers are then gathered
+    in a single vectorised operation.
+
+    Returns:
+        A tuple of (headers, data_offsets, data_lens), where `headers` is a
+        structured array of :func:`_header_dtype`, `data_offsets` is an
+        array of the positions in the file of the data payloads and
+        `data_lens` is an array of the number of bytes of the data payloads
+        plus any extra data.
+
+    Fields following an invalid header are not returned, and a warning is
+    issued.
+
+    """
+    header_dtype = _header_dtype(little_ended)
+    length_word = struct.Struct('%cL' % ('<' if little_ended else '>'))
+
+    file_size = os.fstat(pp_file.fileno()).st_size
+    header_offsets = []
+    data_lens = []
+    if file_size >= PP_WORD_DEPTH + PP_HEADER_DEPTH:
+        pp_mmap = mmap.mmap(pp_file.fileno(), 0, access=mmap.ACCESS_READ)
+        file_bytes = windows = None
+        try:
+            # Walk the record structure of the file.
+            offset = 0
+            while offset + PP_WORD_DEPTH + PP_HEADER_DEPTH <= file_size:
+                header_offsets.append(offset + PP_WORD_DEPTH)
+                if offset + _PRE_DATA_DEPTH > file_size:
+                    # A truncated final field, which is invalid.
+                    data_lens.append(-1)
+                    break
+                data_len, = length_word.unpack_from(
+                    pp_mmap, offset + _PRE_DATA_DEPTH - PP_WORD_DEPTH)
+                data_lens.append(data_len)
+                offset += _PRE_DATA_DEPTH + data_len + PP_WORD_DEPTH
+            # Gather all the headers, with a single copy, by indexing a
+            # sliding window view of the file bytes.
+            file_bytes = np.frombuffer(pp_mmap, dtype=np.uint8)
+            windows = np.lib.stride_tricks.as_strided(
+                file_bytes,
+                shape=(file_size - PP_HEADER_DEPTH + 1, PP_HEADER_DEPTH),
+                strides=(1, 1))
+            headers = windows[header_offsets].view(header_dtype)[:, 0]
+        finally:
+            # The map cannot be closed while any view of it remains, even
+            # when an error has occurred.
+            file_bytes = windows = None
+            pp_mmap.close()
+    else:
+        headers = np.empty(0, dtype=header_dtype)
+    data_offsets = (np.array(header_offsets, dtype=np.int64) +
+                    _PRE_DATA_DEPTH - PP_WORD_DEPTH)
+    data_lens = np.array(data_lens, dtype=np.int64)
+
+    # Find the first invalid field, if any.
+    longs = headers['longs']
+    bad_lbrel = ~np.in1d(longs[:, _LBREL_INDEX], list(PP_CLASSES))
+    record_lens = longs[:, _LBLREC_INDEX].astype(np.int64) * PP_WORD_DEPTH
+    bad_lblrec = record_lens != data_lens
+    bad_fields = np.flatnonzero(bad_lbrel | bad_lblrec)
+    if bad_fields.size:
+        field_count = bad_fields[0]
+        if bad_lbrel[field_count]:
+            msg = 'Unable to interpret field {}. Unsupported header ' \
+                  'release number: {}. Skipping the remainder of ' \
+                  'the file.'.format(field_count,
+                                     longs[field_count, _LBREL_INDEX])
+        else:
+            msg = ('LBLREC has a different value to the integer recorded '
+                   'after the header in the file ({} and {}). '
+                   'Skipping the remainder of the file.')
+            msg = msg.format(record_lens[field_count],
+                             data_lens[field_count])
+        warnings.warn(msg)
+        headers = headers[:field_count]
+        data_offsets = data_offsets[:field_count]
+        data_lens = data_lens[:field_count]
+
+    return headers, data_offsets, data_lens
+
+
+def _field_gen(filename, read_data_bytes, little_ended=False,
+               pp_filter=None):
     """
     Returns a generator of "half-formed" PPField instances derived from
     the given filename.
@@ -1903,65 +2182,37 @@ def _field_gen(filename, read_data_bytes, little_ended=False):
     sufficient information within the field to determine the final
     two-dimensional shape of the data.
 
+    If a `pp_filter`, as made by :func:`_convert_constraints`, is given then
+    only fields whose headers pass the filter are produced.
+
     """
-    dtype_endian_char = '<' if little_ended else '>'
+    from iris.fileformats.um._header_index import pp_headers
     with open(filename, 'rb') as pp_file:
-        # Get a reference to the seek method on the file
-        # (this is accessed 3* #number of headers so can provide a small
-        # performance boost)
+        headers, data_offsets, data_lens = pp_headers(filename, pp_file,
+                                                      little_ended)
+        if pp_filter is not None:
+            keep = pp_filter.header_mask(headers['longs'])
+            headers = headers[keep]
+            data_offsets = data_offsets[keep]
+            data_lens = data_lens[keep]
         pp_file_seek = pp_file.seek
         pp_file_read = pp_file.read
 
-        field_count = 0
-        # Keep reading until we reach the end of file
-        while True:
-            # Move past the leading header length word
-            pp_file_seek(PP_WORD_DEPTH, os.SEEK_CUR)
-            # Get the LONG header entries
-            dtype = '%ci%d' % (dtype_endian_char, PP_WORD_DEPTH)
-            header_longs = np.fromfile(pp_file, dtype=dtype,
-                                       count=NUM_LONG_HEADERS)
-            # Nothing returned => EOF
-            if len(header_longs) == 0:
-                break
-            # Get the FLOAT header entries
-            dtype = '%cf%d' % (dtype_endian_char, PP_WORD_DEPTH)
-            header_floats = np.fromfile(pp_file, dtype=dtype,
-                                        count=NUM_FLOAT_HEADERS)
-            header = tuple(header_longs) + tuple(header_floats)
+        longs = headers['longs']
+        floats = headers['floats']
+        for i in range(headers.shape[0]):
+            header = tuple(longs[i]) + tuple(floats[i])
 
             # Make a PPField of the appropriate sub-class (depends on header
             # release number)
-            try:
-                pp_field = make_pp_field(header)
-            except ValueError as e:
-                msg = 'Unable to interpret field {}. {}. Skipping ' \
-                      'the remainder of the file.'.format(field_count,
-                                                          str(e))
-                warnings.warn(msg)
-                break
-
-            # Skip the trailing 4-byte word containing the header length
-            pp_file_seek(PP_WORD_DEPTH, os.SEEK_CUR)
-
-            # Read the word telling me how long the data + extra data is
-            # This value is # of bytes
-            len_of_data_plus_extra = struct.unpack_from(
-                '%cL' % dtype_endian_char,
-                pp_file_read(PP_WORD_DEPTH))[0]
-            if len_of_data_plus_extra != pp_field.lblrec * PP_WORD_DEPTH:
-                wmsg = ('LBLREC has a different value to the integer recorded '
-                        'after the header in the file ({} and {}). '
-                        'Skipping the remainder of the file.')
-                warnings.warn(wmsg.format(pp_field.lblrec * PP_WORD_DEPTH,
-                                          len_of_data_plus_extra))
-                break
+            pp_field = make_pp_field(header)
 
             # calculate the extra length in bytes
             extra_len = pp_field.lbext * PP_WORD_DEPTH
 
             # Derive size and datatype of payload
-            data_len = len_of_data_plus_extra - extra_len
+            data_offset = int(data_offsets[i])
+            data_len = int(data_lens[i]) - extra_len
             dtype = LBUSER_DTYPE_LOOKUP.get(pp_field.lbuser[0],
                                             LBUSER_DTYPE_LOOKUP['default'])
             if little_ended:
@@ -1977,23 +2228,19 @@ def _field_gen(filename, read_data_bytes, little_ended=False):
             if read_data_bytes:
                 # Read the actual bytes. This can then be converted to a numpy
                 # array at a higher level.
-                pp_field._data = LoadedArrayBytes(pp_file.read(data_len),
+                pp_file_seek(data_offset, os.SEEK_SET)
+                pp_field._data = LoadedArrayBytes(pp_file_read(data_len),
                                                   dtype)
             else:
                 # Provide enough context to read the data bytes later on.
-                pp_field._data = (filename, pp_file.tell(), data_len, dtype)
-                # Seek over the actual data payload.
-                pp_file_seek(data_len, os.SEEK_CUR)
+                pp_field._data = (filename, data_offset, data_len, dtype)
 
             # Do we have any extra data to deal with?
             if extra_len:
+                pp_file_seek(data_offset + data_len, os.SEEK_SET)
                 pp_field._read_extra_data(pp_file, pp_file_read, extra_len,
                                           little_ended=little_ended)
 
-            # Skip that last 4 byte record telling me the length of the field I
-            # have already read
-            pp_file_seek(PP_WORD_DEPTH, os.SEEK_CUR)
-            field_count += 1
             yield pp_field
 
 
@@ -2073,6 +2320,78 @@ def reset_save_rules():
 _STASH_ALLOW = [STASH(1, 0, 33), STASH(1, 0, 1)]
 
 
+class _StashFilter(object):
+    """
+    A PP field filter which selects fields by their STASH code, as made by
+    :func:`_convert_constraints`.
+
+    As well as filtering PPFields, the filter can be applied directly to the
+    integer header words of fields, so that unwanted fields can be skipped
+    before any PPField is constructed.  Each distinct STASH code is only
+    tested once.
+
+    """
+    def __init__(self, stash_funcs):
+        self._stash_funcs = stash_funcs
+        self._header_results = {}
+
+    def __call__(self, field):
+        """
+        return True if field is to be kept,
+        False if field does not match filter
+
+        """
+        return self._keeps_stash(field.stash)
+
+    def _keeps_stash(self, stash):
+        res = True
+        if stash not in _STASH_ALLOW:
+            res = False
+            for call_func in self._stash_funcs:
+                if call_func(str(stash)):
+                    res = True
+                    break
+        return res
+
+    def keeps_header(self, longs):
+        """
+        Return True if a field with the given integer header words is to be
+        kept.
+
+        Unlike filtering the PPFields themselves, land-mask fields are always
+        kept, as they are needed to interpret any land-packed fields.
+
+        """
+        model = longs[_LBUSER7_INDEX]
+        code = longs[_LBUSER4_INDEX]
+        key = (int(model), int(code))
+        result = self._header_results.get(key)
+        if result is None:
+            if key == _LAND_MASK_STASH_CODES:
+                result = True
+            else:
+                result = self._keeps_stash(STASH(model, code // 1000,
+                                                 code % 1000))
+            self._header_results[key] = result
+        return result
+
+    def header_mask(self, longs):
+        """
+        Return a boolean array selecting the fields to keep, from a 2-D array
+        of the integer header words of many fields.
+
+        """
+        # Combine the STASH words into a single key, to test each distinct
+        # STASH code only once.
+        keys = (longs[:, _LBUSER7_INDEX].astype(np.int64) << 32) + \
+            longs[:, _LBUSER4_INDEX].astype(np.uint32)
+        _, first_indices, inverse = np.unique(keys, return_index=True,
+                                              return_inverse=True)
+        keeps = np.array([self.keeps_header(longs[index])
+                          for index in first_indices], dtype=bool)
+        return keeps[inverse]
+
+
 def _convert_constraints(constraints):
     """
     Converts known constraints from Iris semantics to PP semantics
@@ -2114,26 +2433,8 @@ def _convert_constraints(constraints):
             # pp constraints
             unhandled_constraints = True
 
-    def pp_filter(field):
-        """
-        return True if field is to be kept,
-        False if field does not match filter
-
-        """
-        res = True
-        if field.stash not in _STASH_ALLOW:
-            if pp_constraints.get('stash'):
-
-                    res = False
-                    for call_func in pp_constraints['stash']:
-
-                        if call_func(str(field.stash)):
-                            res = True
-                            break
-        return res
-
     if pp_constraints and not unhandled_constraints:
-        result = pp_filter
+        result = _StashFilter(pp_constraints['stash'])
     else:
         result = None
     return result
@@ -2237,7 +2538,8 @@ def load_pairs_from_fields(pp_fields):
 
     """
     load_pairs_from_fields = iris.fileformats.rules.load_pairs_from_fields
-    return load_pairs_from_fields(pp_fields, iris.fileformats.pp_rules.convert)
+    converter = iris.fileformats.pp_rules._CachingConverter()
+    return load_pairs_from_fields(pp_fields, converter)
 
 
 def _load_cubes_variable_loader(filenames, callback, loading_function,
@@ -2250,7 +2552,7 @@ def _load_cubes_variable_loader(filenames, callback, loading_function,
     if um_fast_load.STRUCTURED_LOAD_CONTROLS.loads_use_structured:
         # For structured loads, pass down the pp_filter function as an extra
         # keyword to the low-level generator function.
-        loading_function_kwargs = loading_function_kwargs or {}
+        loading_function_kwargs = dict(loading_function_kwargs or {})
         loading_function_kwargs['pp_filter'] = pp_filter
         # Also do *not* use this filter in generic rules processing, as for
         # structured loading, the 'field' of rules processing is no longer a
@@ -2262,12 +2564,20 @@ def _load_cubes_variable_loader(filenames, callback, loading_function,
             loading_function_kwargs,
             um_fast_load._convert_collation)
     else:
+        loading_function_kwargs = dict(loading_function_kwargs or {})
+        if pp_filter is not None:
+            # Also pass the filter to the low-level generator function, so
+            # that unwanted fields are skipped by their headers alone.
+            loading_function_kwargs['_pp_filter'] = pp_filter
         loader = iris.fileformats.rules.Loader(
-            loading_function, loading_function_kwargs or {},
-            iris.fileformats.pp_rules.convert)
+            loading_function, loading_function_kwargs,
+            iris.fileformats.pp_rules._CachingConverter())
 
+    # The constraints are also passed on, so that fields whose cubes cannot
+    # match them are skipped before any cube is built.
     result = iris.fileformats.rules.load_cubes(filenames, callback, loader,
-                                               pp_filter)
+                                               pp_filter,
+                                               constraints=constraints)
 
     if um_fast_load.STRUCTURED_LOAD_CONTROLS.loads_use_structured:
         # We need an additional concatenate-like operation to combine cubes
@@ -2302,6 +2612,10 @@ def save(cube, target, append=False, field_coords=None):
                          If None, the final two  dimensions are chosen
                          for slicing.
 
+    The cube is saved one 2D field at a time, realising only the data of
+    each field in turn, so a cube with deferred data is never realised as a
+    whole.
+
     See also :func:`iris.io.save`.
 
     """
@@ -2473,6 +2787,24 @@ def as_fields(cube, field_coords=None, target=None):
         cube, field_coords=field_coords, target=target))
 
 
+def _realise_packed_fields(fields):
+    # Realise the data of each field to be WGDOS packed, in the calling
+    # thread, as reading deferred data is not always thread-safe.
+    for pp_field in fields:
+        if pp_field.lbpack == 1:
+            pp_field.data
+        yield pp_field
+
+
+def _encode_packed_field(pp_field):
+    # Encode a field to be WGDOS packed, within a thread of the DECODE_POOL.
+    # Other fields are left to be saved by the calling thread.
+    chunks = None
+    if pp_field.lbpack == 1:
+        chunks = pp_field._encoded()
+    return pp_field, chunks
+
+
 def save_fields(fields, target, append=False):
     """
     Save an iterable of PP fields to a PP file.
@@ -2494,6 +2826,12 @@ def save_fields(fields, target, append=False):
     * callback:
         A modifier/filter function.
 
+    The fields are saved one at a time, as they are generated, so saving a
+    generator of fields does not hold all of their data in memory.  The
+    WGDOS packing of packed fields is done concurrently, by the threads of
+    :data:`iris.fileformats.DECODE_POOL`, but the fields are always written
+    in order.
+
     See also :func:`iris.io.save`.
 
     """
@@ -2531,10 +2869,15 @@ def save_fields(fields, target, append=False):
         raise ValueError("Can only save pp to filename or writable")
 
     try:
-        # Save each field
-        for pp_field in fields:
-            # Write to file
-            pp_field.save(pp_file)
+        # Save each field, in order.  WGDOS packing is done concurrently.
+        encoded_fields = DECODE_POOL.imap(_encode_packed_field,
+                                          _realise_packed_fields(fields))
+        for pp_field, chunks in encoded_fields:
+            if chunks is None:
+                pp_field.save(pp_file)
+            else:
+                for chunk in chunks:
+                    pp_file.write(chunk)
     finally:
         if isinstance(target, six.string_types):
             pp_file.close()
@@ -1063,3 +1063,118 @@ def _all_other_rules(f):
 
     return (references, standard_name, long_name, units, attributes,
             cell_methods, dim_coords_and_dims, aux_coords_and_dims)
+
+
+###############################################################################
+#
+# Cached conversion.
+#
+
+def _copy_coords_and_dims(coords_and_dims):
+    return [(coord.copy(), dims) for coord, dims in coords_and_dims]
+
+
+def _datetime_key(dt):
+    return (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
+
+
+def _other_rules_key(f):
+    # The header words and extra data which determine the result of
+    # _all_other_rules.
+    key = [int(f.lbtim), int(f.lbcode), int(f.lbproc), f.lbsrce, f.lbfc,
+           f.lbuser[3], f.lbuser[6], f.lbhem, f.lbnpt, f.lbrow,
+           f.bdx, f.bdy, f.bzx, f.bzy, f.bmdi, f.bplat, f.bplon]
+    if f.lbtim.ib in (2, 3):
+        # The date words are only used for the month and season coordinates
+        # and the cross-sectional time coordinates, which all require
+        # LBTIM.IB of 2 or 3.
+        key.extend([f.lbyr, f.lbmon, f.lbdat, f.lbhr, f.lbmin,
+                    f.lbyrd, f.lbmond, f.lbdatd, f.lbhrd, f.lbmind, f.lbft])
+    for name in sorted(iris.fileformats.pp.EXTRA_DATA.values()):
+        value = getattr(f, name, None)
+        if isinstance(value, np.ndarray):
+            value = (value.dtype.str, value.shape, value.tobytes())
+        key.append(value)
+    return tuple(key)
+
+
+class _CachingConverter(object):
+    """
+    Converts PP fields into the corresponding items of Cube metadata, as
+    :func:`convert`, but caches the translation of each element of the
+    metadata by the header words which determine it.
+
+    The fields of a file mostly share their grid, levels and times, so most
+    elements are then translated just once per file.  Each field is given
+    copies of the cached coordinates.
+
+    """
+    #: The maximum number of cached translations.
+    MAX_ENTRIES = 4096
+
+    def __init__(self):
+        self._cache = {}
+        #: The number of translations found in the cache.
+        self.hits = 0
+        #: The number of translations which were not cached.
+        self.misses = 0
+
+    def _translate(self, key, translate, *args, **kwargs):
+        try:
+            result = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            result = translate(*args, **kwargs)
+            if len(self._cache) >= self.MAX_ENTRIES:
+                self._cache.clear()
+            self._cache[key] = result
+        else:
+            self.hits += 1
+        return result
+
+    def __call__(self, f):
+        factories = []
+        aux_coords_and_dims = []
+
+        time_key = ('time', int(f.lbcode), int(f.lbtim), f.calendar,
+                    _datetime_key(f.t1), _datetime_key(f.t2), f.lbft)
+        time_coords_and_dims = self._translate(
+            time_key, lambda: _convert_time_coords(
+                lbcode=f.lbcode, lbtim=f.lbtim,
+                epoch_hours_unit=f.time_unit('hours'),
+                t1=f.t1, t2=f.t2, lbft=f.lbft))
+        aux_coords_and_dims.extend(
+            _copy_coords_and_dims(time_coords_and_dims))
+
+        vertical_key = ('vertical', int(f.lbcode), f.lbvc, f.blev, f.lblev,
+                        tuple(f.stash), f.bhlev, f.bhrlev, f.brsvd[0],
+                        f.brsvd[1], f.brlev)
+        vertical_coords_and_dims, vertical_factories = self._translate(
+            vertical_key, _convert_vertical_coords,
+            lbcode=f.lbcode, lbvc=f.lbvc, blev=f.blev, lblev=f.lblev,
+            stash=f.stash, bhlev=f.bhlev, bhrlev=f.bhrlev,
+            brsvd1=f.brsvd[0], brsvd2=f.brsvd[1], brlev=f.brlev)
+        aux_coords_and_dims.extend(
+            _copy_coords_and_dims(vertical_coords_and_dims))
+        factories.extend(vertical_factories)
+
+        aux_coords_and_dims.extend(_copy_coords_and_dims(self._translate(
+            ('realization', f.lbrsvd[3]),
+            _convert_scalar_realization_coords, lbrsvd4=f.lbrsvd[3])))
+
+        aux_coords_and_dims.extend(_copy_coords_and_dims(self._translate(
+            ('pseudo_level', f.lbuser[4]),
+            _convert_scalar_pseudo_level_coords, lbuser5=f.lbuser[4])))
+
+        references, standard_name, long_name, units, attributes, \
+            cell_methods, dim_coords_and_dims, other_aux_coords_and_dims = \
+            self._translate(('other',) + _other_rules_key(f),
+                            _all_other_rules, f)
+        aux_coords_and_dims.extend(
+            _copy_coords_and_dims(other_aux_coords_and_dims))
+
+        return ConversionMetadata(factories, list(references),
+                                  standard_name, long_name, units,
+                                  dict(attributes), list(cell_methods),
+                                  _copy_coords_and_dims(dim_coords_and_dims),
+                                  aux_coords_and_dims)
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2010 - 2016, Met Office
+# (C) British Crown Copyright 2010 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -42,6 +42,7 @@ import numpy.ma as ma
 
 from iris._deprecation import warn_deprecated
 from iris.analysis._interpolate_private import linear as regrid_linear
+import iris._constraints
 import iris.config as config
 import iris.cube
 import iris.exceptions
@@ -899,7 +900,10 @@ ConversionMetadata = collections.namedtuple('ConversionMetadata',
 def _make_cube(field, converter):
     # Convert the field to a Cube.
     metadata = converter(field)
+    return _make_cube_from_metadata(field, metadata)
 
+
+def _make_cube_from_metadata(field, metadata):
     try:
         data = field._data
     except AttributeError:
@@ -949,8 +953,44 @@ def _resolve_factory_references(cube, factories, concrete_reference_targets,
             cube.add_aux_factory(aux_factory)
 
 
+def _as_dims(dims):
+    # Normalise the dimensions of a coordinate from ConversionMetadata,
+    # which may be None, a single dimension or a sequence of dimensions.
+    if dims is None:
+        dims = ()
+    elif isinstance(dims, (int, np.integer)):
+        dims = (dims,)
+    return tuple(dims)
+
+
+def _metadata_filter(constraints):
+    # Return a function which tests whether a cube built from the given
+    # ConversionMetadata might match any of the constraints, judged from
+    # their declarative parts.
+    constraints = iris._constraints.list_of_constraints(constraints)
+
+    def keeps_metadata(metadata):
+        if metadata.references:
+            # Always keep fields that other fields refer to.
+            return True
+        names = [name for name in (metadata.standard_name,
+                                   metadata.long_name) if name is not None]
+        if not names:
+            names = ['unknown']
+        coords_and_dims = [(coord, _as_dims(dims))
+                           for coord, dims in
+                           (list(metadata.dim_coords_and_dims or []) +
+                            list(metadata.aux_coords_and_dims or []))]
+        return any(constraint._may_match(names, metadata.attributes or {},
+                                         coords_and_dims)
+                   for constraint in constraints)
+
+    return keeps_metadata
+
+
 def _load_pairs_from_fields_and_filenames(fields_and_filenames, converter,
-                                          user_callback_wrapper=None):
+                                          user_callback_wrapper=None,
+                                          metadata_filter=None):
     # The underlying mechanism for the public 'load_pairs_from_fields' and
     # 'load_cubes'.
     # Slightly more complicated than 'load_pairs_from_fields', only because it
@@ -958,8 +998,13 @@ def _load_pairs_from_fields_and_filenames(fields_and_filenames, converter,
     concrete_reference_targets = {}
     results_needing_reference = []
     for field, filename in fields_and_filenames:
-        # Convert the field to a Cube, passing down the 'converter' function.
-        cube, factories, references = _make_cube(field, converter)
+        # Convert the field to a Cube, passing down the 'converter' function,
+        # unless its metadata shows that the cube would be discarded.
+        metadata = converter(field)
+        if metadata_filter is not None and not metadata_filter(metadata):
+            continue
+        cube, factories, references = _make_cube_from_metadata(field,
+                                                               metadata)
 
         # Post modify the new cube with a user-callback.
         # This is an ordinary Iris load callback, so it takes the filename.
@@ -1014,10 +1059,26 @@ def load_pairs_from_fields(fields, converter):
         converter)
 
 
-def load_cubes(filenames, user_callback, loader, filter_function=None):
+def load_cubes(filenames, user_callback, loader, filter_function=None,
+               constraints=None):
+    """
+    Load cubes from the fields of the given files, using the given
+    :class:`Loader`.
+
+    If `constraints` are given, and there is no callback which could
+    change the cubes, then fields whose cubes cannot match any of the
+    constraints are skipped before their cubes are built.  The constraints
+    must still be applied to the resulting cubes.
+
+    """
     if isinstance(filenames, six.string_types):
         filenames = [filenames]
 
+    metadata_filter = None
+    if (constraints is not None and user_callback is None and
+            not loader.legacy_custom_rules):
+        metadata_filter = _metadata_filter(constraints)
+
     def _generate_all_fields_and_filenames():
         for filename in filenames:
             for field in loader.field_generator(
@@ -1044,6 +1105,7 @@ def load_cubes(filenames, user_callback, loader, filter_function=None):
     for cube, field in _load_pairs_from_fields_and_filenames(
             all_fields_and_filenames,
             converter=loader.converter,
-            user_callback_wrapper=loadcubes_user_callback_wrapper):
+            user_callback_wrapper=loadcubes_user_callback_wrapper,
+            metadata_filter=metadata_filter):
         yield cube
 
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2014 - 2016, Met Office
+# (C) British Crown Copyright 2014 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -26,5 +26,6 @@ from six.moves import (filter, input, map, range, zip)  # noqa
 from ._ff_replacement import um_to_pp, load_cubes, load_cubes_32bit_ieee
 from ._fast_load import structured_um_loading
 from ._fast_load_structured_fields import FieldCollation
+from ._header_index import build_header_indexes
 __all__ = ['um_to_pp', 'load_cubes', 'load_cubes_32bit_ieee',
-           'structured_um_loading', 'FieldCollation']
+           'structured_um_loading', 'FieldCollation', 'build_header_indexes']
@@ -0,0 +1,46 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Build header indexes for PP files and FieldsFiles from the command line::
+
+    python -m iris.fileformats.um <path> [<path> ...]
+
+See :func:`iris.fileformats.um.build_header_indexes`.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+import argparse
+
+from iris.fileformats.um import build_header_indexes
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m iris.fileformats.um',
+        description='Build Iris header indexes for PP files and FieldsFiles.')
+    parser.add_argument('paths', nargs='+', metavar='path',
+                        help='a file, or a directory to search recursively')
+    args = parser.parse_args(args)
+    for filename in build_header_indexes(args.paths):
+        print(filename)
+
+
+if __name__ == '__main__':
+    main()
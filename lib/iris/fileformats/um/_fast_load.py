@@ -98,6 +98,9 @@ def _basic_load_function(filename, pp_filter=None, **kwargs):
         return loader
 
     loader = _select_raw_fields_loader(filename)
+    if pp_filter is not None:
+        # Also skip unwanted fields by their headers, where possible.
+        kwargs['_pp_filter'] = pp_filter
     fields = iter(field
                   for field in loader(filename, **kwargs)
                   if pp_filter is None or pp_filter(field))
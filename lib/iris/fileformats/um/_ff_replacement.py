@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2014 - 2016, Met Office
+# (C) British Crown Copyright 2014 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -30,7 +30,7 @@ from iris.fileformats._ff import FF2PP
 from iris.fileformats.pp import _load_cubes_variable_loader
 
 
-def um_to_pp(filename, read_data=False, word_depth=None):
+def um_to_pp(filename, read_data=False, word_depth=None, _pp_filter=None):
     """
     Extract the individual PPFields from within a UM file.
 
@@ -58,10 +58,10 @@ def um_to_pp(filename, read_data=False, word_depth=None):
 
     """
     if word_depth is None:
-        ff2pp = FF2PP(filename, read_data=read_data)
+        ff2pp = FF2PP(filename, read_data=read_data, _pp_filter=_pp_filter)
     else:
         ff2pp = FF2PP(filename, read_data=read_data,
-                      word_depth=word_depth)
+                      word_depth=word_depth, _pp_filter=_pp_filter)
 
     # Note: unlike the original wrapped case, we will return an actual
     # iterator, rather than an object that can provide an iterator.
@@ -0,0 +1,268 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Support for persistent "header index" files, which record the decoded field
+headers of PP files and FieldsFiles, so that they need not be re-scanned each
+time the file is loaded.
+
+An index is a NumPy ".npz" file stored alongside the file it describes.
+Indexes are only ever created on request, by
+:func:`iris.fileformats.um.build_header_indexes` or from the command line::
+
+    python -m iris.fileformats.um <path> [<path> ...]
+
+Once an index exists, the PP and FieldsFile loaders use it in place of
+scanning the file.  An index which no longer matches its file, i.e. whose
+recorded name, size or modification time differ, is rebuilt when next used.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+import six
+
+import os
+import tempfile
+import warnings
+
+import numpy as np
+
+# Be minimal about what we import from iris, to avoid circular imports.
+# Below, other parts of iris.fileformats are accessed via deferred imports.
+
+
+# The file name suffix of an index file.
+_INDEX_SUFFIX = '.iris-index.npz'
+
+# The version of the index file contents.
+_INDEX_VERSION = 1
+
+# Identify the kind of file indexed.
+_PP = 'pp'
+_FF = 'ff'
+
+
+def _index_path(filename):
+    return filename + _INDEX_SUFFIX
+
+
+def _file_key(filename):
+    # The file properties which an index must match to be valid.
+    stat = os.stat(filename)
+    return os.path.basename(filename), stat.st_size, stat.st_mtime
+
+
+def _read_index(filename, kind, option):
+    # Return a dictionary of the arrays stored in the index of a file, or
+    # None if the index is not valid for the file in its current state.
+    try:
+        with np.load(_index_path(filename)) as index:
+            arrays = {name: index[name] for name in index.files}
+        name, size, mtime = _file_key(filename)
+        valid = (int(arrays['version']) == _INDEX_VERSION and
+                 str(arrays['kind']) == kind and
+                 int(arrays['option']) == int(option) and
+                 str(arrays['name']) == name and
+                 int(arrays['size']) == size and
+                 float(arrays['mtime']) == mtime)
+    except Exception:
+        # An unreadable index is treated in the same way as a stale one.
+        valid = False
+    return arrays if valid else None
+
+
+def _write_index(filename, kind, option, key, arrays):
+    # Save the index of a file, replacing any existing one.
+    # The index is written to a temporary file first, so that other
+    # processes never see a partially written index.
+    name, size, mtime = key
+    index_path = _index_path(filename)
+    handle, temp_path = tempfile.mkstemp(
+        prefix='.', suffix=_INDEX_SUFFIX,
+        dir=os.path.dirname(os.path.abspath(index_path)))
+    try:
+        with os.fdopen(handle, 'wb') as index_file:
+            np.savez(index_file, version=_INDEX_VERSION, kind=kind,
+                     option=int(option), name=name, size=size, mtime=mtime,
+                     **arrays)
+        os.rename(temp_path, index_path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def _pp_arrays(pp_file, little_ended):
+    # Scan the headers of a PP file, recording any warnings so that they can
+    # be repeated whenever the index is used.
+    from iris.fileformats.pp import _scan_headers
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        headers, data_offsets, data_lens = _scan_headers(pp_file,
+                                                         little_ended)
+    messages = np.array([str(warning.message) for warning in caught],
+                        dtype=str)
+    return dict(headers=headers, data_offsets=data_offsets,
+                data_lens=data_lens, warnings=messages)
+
+
+def _ff_arrays(ff_header, ff_file, word_depth):
+    # Read the entire LOOKUP table of a FieldsFile, up to the first unused
+    # entry.
+    from iris.fileformats._ff import _FF_LOOKUP_TABLE_TERMINATE
+    from iris.fileformats.pp import NUM_FLOAT_HEADERS, NUM_LONG_HEADERS
+    table_index, table_entry_depth, table_count = ff_header.lookup_table
+    ff_file.seek((table_index - 1) * word_depth, os.SEEK_SET)
+    words = np.fromfile(ff_file, dtype='>i{}'.format(word_depth),
+                        count=table_count * table_entry_depth)
+    n_entries = words.size // table_entry_depth
+    words = words[:n_entries * table_entry_depth].reshape(n_entries,
+                                                          table_entry_depth)
+    terminators = np.where(words[:, 0] == _FF_LOOKUP_TABLE_TERMINATE)[0]
+    if terminators.size:
+        words = words[:terminators[0]]
+    longs = words[:, :NUM_LONG_HEADERS]
+    floats = words[:, NUM_LONG_HEADERS:NUM_LONG_HEADERS + NUM_FLOAT_HEADERS]
+    floats = floats.view('>f{}'.format(word_depth))
+    return dict(longs=np.ascontiguousarray(longs),
+                floats=np.ascontiguousarray(floats))
+
+
+def _indexed_arrays(filename, kind, option, make_arrays):
+    # Return the arrays from the index of a file, or None if the file has no
+    # index.  A stale index is rebuilt.
+    if not os.path.exists(_index_path(filename)):
+        return None
+    arrays = _read_index(filename, kind, option)
+    if arrays is None:
+        key = _file_key(filename)
+        arrays = make_arrays()
+        try:
+            _write_index(filename, kind, option, key, arrays)
+        except (IOError, OSError):
+            # The index is only an optimisation, so carry on without it.
+            pass
+    return arrays
+
+
+def pp_headers(filename, pp_file, little_ended=False):
+    """
+    Return the headers, data offsets and data lengths of the fields in an
+    open PP file, as :func:`iris.fileformats.pp._scan_headers`, using the
+    index of the file if it has one.
+
+    """
+    arrays = _indexed_arrays(filename, _PP, little_ended,
+                             lambda: _pp_arrays(pp_file, little_ended))
+    if arrays is None:
+        from iris.fileformats.pp import _scan_headers
+        result = _scan_headers(pp_file, little_ended)
+    else:
+        for message in arrays['warnings']:
+            warnings.warn(message)
+        result = (arrays['headers'], arrays['data_offsets'],
+                  arrays['data_lens'])
+    return result
+
+
+def ff_lookup_table(filename, ff_header, ff_file, word_depth):
+    """
+    Return the integer and real header words of the LOOKUP table entries of
+    an open FieldsFile from the index of the file, or None if the file has
+    no index.
+
+    """
+    arrays = _indexed_arrays(
+        filename, _FF, word_depth,
+        lambda: _ff_arrays(ff_header, ff_file, word_depth))
+    if arrays is not None:
+        arrays = (arrays['longs'], arrays['floats'])
+    return arrays
+
+
+def _index_file(filename):
+    # Build the index of a single file, if it is a PP file or FieldsFile.
+    # Return whether the file was indexed.
+    from iris.fileformats import FORMAT_AGENT
+    import iris.fileformats.pp as pp
+    import iris.fileformats.um as um
+    from iris.fileformats._ff import FFHeader
+    spec_options = {pp.load_cubes: (_PP, False),
+                    pp.load_cubes_little_endian: (_PP, True),
+                    um.load_cubes: (_FF, 8),
+                    um.load_cubes_32bit_ieee: (_FF, 4)}
+    with open(filename, 'rb') as fh:
+        try:
+            spec = FORMAT_AGENT.get_spec(os.path.basename(filename), fh)
+        except (ValueError, EOFError):
+            # Not a recognised file format.
+            spec = None
+        kind, option = spec_options.get(getattr(spec, 'handler', None),
+                                        (None, None))
+        if kind is not None:
+            key = _file_key(filename)
+            if kind == _PP:
+                arrays = _pp_arrays(fh, option)
+            else:
+                ff_header = FFHeader(filename, word_depth=option)
+                arrays = _ff_arrays(ff_header, fh, option)
+            _write_index(filename, kind, option, key, arrays)
+    return kind is not None
+
+
+def build_header_indexes(paths):
+    """
+    Build header indexes for PP files and FieldsFiles.
+
+    Each index is saved alongside its file, and is subsequently used in
+    place of scanning the file whenever it is loaded.  An index is rebuilt
+    automatically if its file changes.
+
+    Args:
+
+    * paths (string or iterable of string):
+        The files to index.  Directories are searched recursively, and any
+        files within them which are not PP files or FieldsFiles are
+        ignored.
+
+    Returns:
+        A list of the files which were indexed.
+
+    For example::
+
+        >>> from iris.fileformats.um import build_header_indexes
+        >>> indexed = build_header_indexes('/data/archive')
+
+    The same can also be done from the command line::
+
+        python -m iris.fileformats.um /data/archive
+
+    """
+    if isinstance(paths, six.string_types):
+        paths = [paths]
+    indexed = []
+    for path in paths:
+        if os.path.isdir(path):
+            filenames = (os.path.join(dirpath, name)
+                         for dirpath, _, names in sorted(os.walk(path))
+                         for name in sorted(names))
+        else:
+            filenames = [path]
+        for filename in filenames:
+            if (not filename.endswith(_INDEX_SUFFIX) and
+                    _index_file(filename)):
+                indexed.append(filename)
+    return indexed
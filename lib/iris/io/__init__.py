@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2010 - 2016, Met Office
+# (C) British Crown Copyright 2010 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -23,8 +23,11 @@ from __future__ import (absolute_import, division, print_function)
 from six.moves import (filter, input, map, range, zip)  # noqa
 import six
 
+from contextlib import contextmanager
 import glob
+import multiprocessing
 import os.path
+import threading
 import types
 import re
 import collections
@@ -169,12 +172,156 @@ def expand_filespecs(file_specs):
     return sum(value_lists, [])
 
 
+class _ParallelLoadControls(threading.local):
+    # A thread-safe object to control parallel loading operations.
+    # The object properties are the control settings.
+    #
+    # Inheriting from 'threading.local' provides a *separate* set of the
+    # object properties for each thread.
+    def __init__(self):
+        # The number of worker processes used by load operations, where None
+        # means that files are loaded serially in the calling process.
+        self.workers = None
+
+    @contextmanager
+    def context(self, workers=None):
+        # Snapshot current state, for restoration afterwards.
+        old_workers = self.workers
+        try:
+            # Set control for duration, as requested.
+            if workers is not None:
+                self.workers = workers
+            # Yield to caller operation.
+            yield
+        finally:
+            # Restore entry state of control.
+            self.workers = old_workers
+
+
+# A singleton parallel-load-control object.
+# Used in :func:`iris.io.load_files`.
+_PARALLEL_LOAD_CONTROLS = _ParallelLoadControls()
+
+
+@contextmanager
+def parallel_loading(workers=None):
+    """
+    Load the files of each Iris load operation concurrently, using a pool of
+    worker processes.
+
+    This method is a context manager which, within its scope, affects all of
+    the standard Iris load functions (:func:`~iris.load`,
+    :func:`~iris.load_cube`, :func:`~iris.load_cubes` and
+    :func:`~iris.load_raw`) when loading from local files.
+
+    For example::
+
+        from iris.io import parallel_loading
+        with parallel_loading(workers=8):
+            cubes = iris.load(filenames)
+
+    Each input file is scanned and converted into lazy cubes by a separate
+    call to its format handler, within a worker process.  The resulting
+    cubes are returned to the caller in the same order in which the files
+    are loaded serially, and the merge of :func:`~iris.load` is then
+    performed centrally, so the loaded results are the same as those of a
+    normal load.
+
+    Kwargs:
+
+    * workers:
+        The number of worker processes in the pool.  Defaults to the number
+        of CPUs of the host.
+
+    .. note::
+
+        Any load callback and constraints are passed to the worker
+        processes, so must be picklable : for example, a callback must be a
+        module-level function rather than a lambda.
+
+    .. note::
+
+        As each file is loaded independently, references between the
+        contents of different files are not resolved.  For example, a
+        hybrid height PP field is not given an altitude coordinate if the
+        orography is held in a separate file.
+
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers < 1:
+        raise ValueError('The number of workers must be at least 1, '
+                         'got {}.'.format(workers))
+    with _PARALLEL_LOAD_CONTROLS.context(workers=workers):
+        yield
+
+
+def _load_file(task):
+    # Load the cubes of a single file, within a parallel load worker.
+    #
+    # The iris run-time controls are thread-specific, and so are not
+    # reliably inherited by a worker process : the values which were active
+    # in the calling thread are re-established here.
+    import iris
+    from iris.fileformats.um._fast_load import STRUCTURED_LOAD_CONTROLS
+    (handler, constraint_aware, filename, callback, constraints,
+     future_state, structured_flags) = task
+    with iris.FUTURE.context(), \
+            STRUCTURED_LOAD_CONTROLS.context(*structured_flags):
+        # Bypass the attribute checks, which would warn on restoring the
+        # value of any deprecated option.
+        iris.FUTURE.__dict__.update(future_state)
+        if constraint_aware:
+            cubes = handler([filename], callback, constraints)
+        else:
+            cubes = handler([filename], callback)
+        return list(cubes)
+
+
+def _load_files_parallel(handler_map, callback, constraints):
+    # Load each file with a separate handler call within a pool of worker
+    # processes, yielding the cubes in the same order as a serial load.
+    import iris
+    import iris.fileformats.um._fast_load as um_fast_load
+    controls = um_fast_load.STRUCTURED_LOAD_CONTROLS
+    future_state = iris.FUTURE.__dict__.copy()
+    structured_flags = (controls.loads_use_structured,
+                        controls.structured_load_is_raw)
+    specs = sorted(handler_map)
+    tasks = [(spec.handler, spec.constraint_aware_handler, fname,
+              callback, constraints, future_state, structured_flags)
+             for spec in specs
+             for fname in handler_map[spec]]
+
+    pool = multiprocessing.Pool(_PARALLEL_LOAD_CONTROLS.workers)
+    try:
+        results = pool.imap(_load_file, tasks)
+        for spec in specs:
+            cubes = (cube
+                     for _ in handler_map[spec]
+                     for cube in next(results))
+            if (controls.loads_use_structured and
+                    spec.name.startswith((um_fast_load._FF_SPEC_NAME,
+                                          um_fast_load._PP_SPEC_NAME))):
+                # Structured loads also combine the cubes over all the
+                # files of a format, which a single file load cannot do.
+                cubes = um_fast_load._combine_structured_cubes(list(cubes))
+            for cube in cubes:
+                yield cube
+    finally:
+        pool.terminate()
+        pool.join()
+
+
 def load_files(filenames, callback, constraints=None):
     """
     Takes a list of filenames which may also be globs, and optionally a
     constraint set and a callback function, and returns a
     generator of Cubes from the given files.
 
+    The files are loaded concurrently within the scope of the
+    :func:`parallel_loading` context manager.
+
     .. note::
 
         Typically, this function should not be called directly; instead, the
@@ -190,6 +337,11 @@ def load_files(filenames, callback, constraints=None):
             handling_format_spec = iris.fileformats.FORMAT_AGENT.get_spec(os.path.basename(fn), fh)
             handler_map[handling_format_spec].append(fn)
 
+    if _PARALLEL_LOAD_CONTROLS.workers is not None:
+        for cube in _load_files_parallel(handler_map, callback, constraints):
+            yield cube
+        return
+
     # Call each iris format handler with the approriate filenames
     for handling_format_spec in sorted(handler_map):
         fnames = handler_map[handling_format_spec]
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2014 - 2016, Met Office
+# (C) British Crown Copyright 2014 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -38,6 +38,7 @@ import iris
 from iris.coords import CellMethod
 from iris.cube import Cube, CubeList
 from iris.fileformats.netcdf import CF_CONVENTIONS_VERSION
+from iris.fileformats.netcdf import NetCDFDataProxy
 from iris.fileformats.netcdf import Saver
 from iris.fileformats.netcdf import UnknownCellMethodWarning
 from iris.tests import mock
@@ -432,5 +433,56 @@ class TestPackedData(tests.IrisTest):
         self._multi_test('multi_packed_multi_dtype.cdl', multi_dtype=True)
 
 
+class TestChunkedCollapse(tests.IrisTest):
+    # A collapse over time of a variable which is chunked for time series
+    # access reads each chunk just once, whole.
+    def setUp(self):
+        self.data = np.arange(24 * 6 * 8, dtype='f4').reshape(24, 6, 8)
+        self.chunks = (24, 3, 4)
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'chunked.nc')
+        dataset = nc.Dataset(self.path, 'w')
+        for name, size, units in [('time', 24, 'hours since 1970-01-01'),
+                                  ('latitude', 6, 'degrees'),
+                                  ('longitude', 8, 'degrees')]:
+            dataset.createDimension(name, size)
+            coord = dataset.createVariable(name, 'f8', (name,))
+            coord.standard_name = name
+            coord.units = units
+            coord[:] = np.arange(size)
+        variable = dataset.createVariable(
+            'air_temperature', 'f4', ('time', 'latitude', 'longitude'),
+            chunksizes=self.chunks)
+        variable.standard_name = 'air_temperature'
+        variable.units = 'K'
+        variable[:] = self.data
+        dataset.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_mean(self):
+        cube = iris.load_cube(self.path)
+        self.assertEqual(cube.lazy_data().concrete.chunks, self.chunks)
+        reads = []
+        getitem = NetCDFDataProxy.__getitem__
+
+        def recording_getitem(proxy, keys):
+            reads.append(keys)
+            return getitem(proxy, keys)
+
+        # Limit each read to a single chunk.
+        block_patch = mock.patch('iris._lazy_data._MAX_BLOCK_BYTES',
+                                 24 * 3 * 4 * 4)
+        read_patch = mock.patch.object(NetCDFDataProxy, '__getitem__',
+                                       recording_getitem)
+        with block_patch, read_patch:
+            result = cube.collapsed('time', iris.analysis.MEAN).data
+        self.assertArrayAlmostEqual(result, self.data.mean(axis=0))
+        self.assertEqual(len(reads), 4)
+        for keys in reads:
+            self.assertEqual(keys[0], slice(0, 24))
+
+
 if __name__ == "__main__":
     tests.main()
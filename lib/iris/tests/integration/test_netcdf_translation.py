@@ -0,0 +1,79 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Conformance tests for the direct translation of CF-netCDF data variables,
+against the Pyke rule base.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import os
+import warnings
+
+import iris.fileformats._cf_translate
+import iris.fileformats.netcdf
+from iris.tests import mock
+
+
+@tests.skip_data
+class TestConformance(tests.IrisTest):
+    def setUp(self):
+        self.translated = 0
+
+    def _translate(self, engine, cf, cf_var):
+        result = self.real_translate(engine, cf, cf_var)
+        self.translated += result
+        return result
+
+    def _load(self, path, fast):
+        self.real_translate = iris.fileformats._cf_translate.translate
+        fast_patch = mock.patch('iris.fileformats.netcdf._FAST_TRANSLATION',
+                                fast)
+        translate_patch = mock.patch(
+            'iris.fileformats._cf_translate.translate',
+            side_effect=self._translate)
+        with fast_patch, translate_patch, warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            try:
+                cubes = list(iris.fileformats.netcdf.load_cubes(path))
+            except Exception as error:
+                return type(error)
+        return [cube.xml(checksum=False) for cube in cubes]
+
+    def test_netcdf_test_data(self):
+        root = tests.get_data_path('NetCDF')
+        paths = sorted(os.path.join(dir_path, filename)
+                       for dir_path, _, filenames in os.walk(root)
+                       for filename in filenames
+                       if filename.endswith('.nc'))
+        for path in paths:
+            expected = self._load(path, False)
+            result = self._load(path, True)
+            self.assertEqual(result, expected,
+                             'Translations differ for {!r}'.format(path))
+        # Check that the direct translation was used.
+        self.assertGreater(self.translated, 0)
+
+
+if __name__ == '__main__':
+    tests.main()
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2010 - 2015, Met Office
+# (C) British Crown Copyright 2010 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -486,6 +486,9 @@ class TestAggregateBy(tests.IrisTest):
     def test_returned_weights(self):
         self.assertRaises(ValueError, self.cube_single.aggregated_by,
                           'height', iris.analysis.MEAN, returned=True)
+
+    def test_weights_bad_shape(self):
+        # The weights neither match the cube, nor the grouped dimension.
         self.assertRaises(ValueError, self.cube_single.aggregated_by,
                           'height', iris.analysis.MEAN,
                           weights=[1, 2, 3, 4, 5])
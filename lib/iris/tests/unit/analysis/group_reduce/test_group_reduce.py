@@ -0,0 +1,216 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Unit tests for the :func:`iris.analysis._group_reduce.group_reduce`
+function.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import biggus
+import numpy as np
+import numpy.ma as ma
+
+import iris.analysis
+from iris.analysis._group_reduce import group_reduce
+from iris.tests import mock
+
+
+class Test(tests.IrisTest):
+    def setUp(self):
+        data = np.arange(60, dtype=np.float32).reshape(3, 10, 2)
+        data[1, 3, 0] = 1000.
+        mask = np.zeros(data.shape, dtype=bool)
+        mask[0, 0, 1] = mask[0, 1, 1] = mask[2, 4:7, 0] = True
+        self.data = ma.MaskedArray(data, mask=mask)
+        self.axis = 1
+        # The groups are neither contiguous nor in order.
+        self.groups = [(0, 1, 9), slice(2, 4), (5, 6, 4), (7, 8)]
+
+    def _expected(self, aggregator, **kwargs):
+        results = []
+        for group in self.groups:
+            if isinstance(group, tuple):
+                group = list(group)
+            data = self.data[:, group]
+            results.append(aggregator.aggregate(data, axis=self.axis,
+                                                **kwargs))
+        return ma.MaskedArray(np.stack([ma.getdata(result)
+                                        for result in results], self.axis),
+                              mask=np.stack([ma.getmaskarray(result)
+                                             for result in results],
+                                            self.axis))
+
+    def _check(self, aggregator, data=None, **kwargs):
+        if data is None:
+            data = self.data
+        array = biggus.NumpyArrayAdapter(data)
+        result = group_reduce(array, self.axis, self.groups, aggregator,
+                              **kwargs)
+        self.assertIsInstance(result, biggus.Array)
+        expected = self._expected(aggregator, **kwargs)
+        self.assertEqual(result.shape, expected.shape)
+        self.assertEqual(result.dtype, expected.dtype)
+        self.assertMaskedArrayAlmostEqual(result.masked_array(), expected)
+        return result
+
+    def test_mean(self):
+        self._check(iris.analysis.MEAN)
+
+    def test_sum(self):
+        self._check(iris.analysis.SUM)
+
+    def test_count(self):
+        self._check(iris.analysis.COUNT, function=lambda data: data > 20)
+
+    def test_min(self):
+        self._check(iris.analysis.MIN)
+
+    def test_max(self):
+        self._check(iris.analysis.MAX)
+
+    def test_weighted_mean(self):
+        weights = np.linspace(0.5, 2, self.data.size).reshape(self.data.shape)
+        self._check(iris.analysis.MEAN, weights=weights)
+
+    def test_weighted_sum(self):
+        weights = np.linspace(0.5, 2, self.data.size).reshape(self.data.shape)
+        self._check(iris.analysis.SUM, weights=weights)
+
+    def test_weighted_integer_data(self):
+        weights = np.linspace(0.5, 2, self.data.size).reshape(self.data.shape)
+        self._check(iris.analysis.MEAN, data=np.arange(60).reshape(3, 10, 2),
+                    weights=weights)
+
+    def test_weighted_small_blocks(self):
+        weights = np.linspace(0.5, 2, self.data.size).reshape(self.data.shape)
+        with mock.patch('iris._lazy_data._MAX_BLOCK_BYTES', 16):
+            self._check(iris.analysis.MEAN, weights=weights, mdtol=0.5)
+
+    def test_zero_weights(self):
+        # A group whose valid data has no weight has no mean.
+        weights = np.ones(self.data.shape)
+        weights[:, 7:9] = 0
+        array = biggus.NumpyArrayAdapter(self.data)
+        result = group_reduce(array, self.axis, self.groups,
+                              iris.analysis.MEAN, weights=weights)
+        self.assertTrue(result.masked_array().mask[:, 3].all())
+        self.assertFalse(result.masked_array().mask[:, 1].any())
+
+    def test_weighted_count(self):
+        array = biggus.NumpyArrayAdapter(self.data)
+        self.assertIsNone(group_reduce(array, self.axis, self.groups,
+                                       iris.analysis.COUNT,
+                                       function=lambda data: data > 20,
+                                       weights=np.ones(self.data.shape)))
+
+    def test_mdtol(self):
+        # Only one of the three elements of the first group is valid.
+        result = self._check(iris.analysis.MEAN, mdtol=0.5)
+        self.assertTrue(result.masked_array().mask[0, 0, 1])
+
+    def test_all_masked_group(self):
+        self.data.mask[:, 7:9] = True
+        result = self._check(iris.analysis.MAX)
+        self.assertTrue(result.masked_array().mask[:, 3].all())
+
+    def test_integer_data(self):
+        self._check(iris.analysis.SUM, data=np.arange(60).reshape(3, 10, 2))
+
+    def test_small_blocks(self):
+        # Blocks of fewer elements than a group still give the same
+        # result.
+        with mock.patch('iris._lazy_data._MAX_BLOCK_BYTES', 16):
+            self._check(iris.analysis.MEAN, mdtol=0.5)
+
+    def test_indexing(self):
+        array = biggus.NumpyArrayAdapter(self.data)
+        result = group_reduce(array, self.axis, self.groups,
+                              iris.analysis.MEAN)
+        expected = self._expected(iris.analysis.MEAN)
+        keys = (slice(1, None), (3, 0), 1)
+        self.assertMaskedArrayAlmostEqual(result[keys].masked_array(),
+                                          expected[1:, [3, 0], 1])
+        self.assertMaskedArrayAlmostEqual(result[0, 2].masked_array(),
+                                          expected[0, 2])
+
+    def test_lazy(self):
+        proxy = mock.MagicMock(shape=self.data.shape, dtype=self.data.dtype,
+                               ndim=self.data.ndim)
+        array = biggus.OrthoArrayAdapter(proxy)
+        result = group_reduce(array, self.axis, self.groups,
+                              iris.analysis.MEAN)
+        self.assertEqual(result.shape, (3, 4, 2))
+        self.assertEqual(proxy.__getitem__.call_count, 0)
+
+    def _reads(self, keys):
+        # Return the elements along the grouped dimension of each read of
+        # the source, and the result, when indexing the group reduction.
+        proxy = mock.MagicMock(shape=self.data.shape, dtype=self.data.dtype,
+                               ndim=self.data.ndim)
+        proxy.__getitem__.side_effect = lambda keys: self.data[keys]
+        array = biggus.OrthoArrayAdapter(proxy)
+        result = group_reduce(array, self.axis, self.groups,
+                              iris.analysis.SUM)[keys].masked_array()
+        reads = [np.arange(10)[read_keys[self.axis]].tolist()
+                 for (read_keys,), _ in proxy.__getitem__.call_args_list]
+        return reads, result
+
+    def test_reads_only_requested_group(self):
+        reads, result = self._reads((slice(None), 2))
+        self.assertEqual(reads, [[4, 5, 6]])
+        expected = self._expected(iris.analysis.SUM)
+        self.assertMaskedArrayAlmostEqual(result, expected[:, 2])
+
+    def test_reads_only_requested_groups(self):
+        reads, result = self._reads((slice(None), (3, 0)))
+        self.assertEqual(reads, [[0, 1, 7, 8, 9]])
+        expected = self._expected(iris.analysis.SUM)
+        self.assertMaskedArrayAlmostEqual(result, expected[:, [3, 0]])
+
+    def test_chunked_scalar_keys(self):
+        proxy = mock.MagicMock(shape=self.data.shape, dtype=self.data.dtype,
+                               ndim=self.data.ndim, chunks=(1, 5, 2))
+        proxy.__getitem__.side_effect = lambda keys: self.data[keys]
+        array = biggus.OrthoArrayAdapter(proxy)
+        result = group_reduce(array, self.axis, self.groups,
+                              iris.analysis.SUM)
+        expected = self._expected(iris.analysis.SUM)
+        self.assertMaskedArrayAlmostEqual(result[:, 1].masked_array(),
+                                          expected[:, 1])
+        self.assertMaskedArrayAlmostEqual(result[1, 2].masked_array(),
+                                          expected[1, 2])
+
+    def test_unsupported_aggregator(self):
+        array = biggus.NumpyArrayAdapter(self.data)
+        self.assertIsNone(group_reduce(array, self.axis, self.groups,
+                                       iris.analysis.MEDIAN))
+
+    def test_unsupported_kwargs(self):
+        array = biggus.NumpyArrayAdapter(self.data)
+        self.assertIsNone(group_reduce(array, self.axis, self.groups,
+                                       iris.analysis.MEAN, returned=True))
+
+
+if __name__ == '__main__':
+    tests.main()
@@ -0,0 +1,184 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Unit tests for the :func:`iris.analysis._rolling_reduce.rolling_reduce`
+function.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import biggus
+import numpy as np
+import numpy.ma as ma
+
+import iris.analysis
+from iris.analysis._rolling_reduce import rolling_reduce
+from iris.tests import mock
+from iris.util import rolling_window
+
+
+_AGGREGATORS = [(iris.analysis.COUNT, {'function': lambda data: data > 4}),
+                (iris.analysis.MAX, {}),
+                (iris.analysis.MEAN, {}),
+                (iris.analysis.MIN, {}),
+                (iris.analysis.SUM, {})]
+
+
+class Test(tests.IrisTest):
+    def _check(self, data, window, axis=0, aggregators=_AGGREGATORS,
+               **kwargs):
+        # Compare the rolling reduction of the data with each aggregator to
+        # the aggregation of a strided view of its windows.
+        windows = rolling_window(data, window=window, axis=axis)
+        array = biggus.NumpyArrayAdapter(data)
+        for aggregator, aggregator_kwargs in aggregators:
+            aggregator_kwargs = dict(aggregator_kwargs, **kwargs)
+            result = rolling_reduce(array, axis, window, aggregator,
+                                    **aggregator_kwargs)
+            expected = aggregator.aggregate(windows, axis=axis + 1,
+                                            **aggregator_kwargs)
+            expected = ma.MaskedArray(expected,
+                                      mask=ma.getmaskarray(expected))
+            self.assertEqual(result.dtype, expected.dtype)
+            self.assertMaskedArrayAlmostEqual(result.masked_array(),
+                                              expected)
+
+    def test_float32(self):
+        data = np.array([3, 1, 4, 1, 5, 9, 2, 6, 5, 3], dtype=np.float32)
+        self._check(data, 3)
+
+    def test_integer(self):
+        self._check(np.array([3, 1, 4, 1, 5, 9, 2, 6, 5, 3]), 4)
+
+    def test_masked(self):
+        data = ma.masked_array([3., 1, 4, 1, 5, 9, 2, 6, 5, 3],
+                               mask=[1, 1, 0, 0, 0, 1, 1, 1, 0, 0])
+        self._check(data, 3)
+
+    def test_masked_mdtol(self):
+        data = ma.masked_array([3., 1, 4, 1, 5, 9, 2, 6, 5, 3],
+                               mask=[1, 0, 0, 0, 0, 1, 1, 0, 0, 0])
+        self._check(data, 3, mdtol=0.5)
+
+    def test_window_of_whole_length(self):
+        data = np.array([3., 1, 4, 1, 5, 9, 2, 6, 5, 3])
+        self._check(data, 10)
+
+    def test_segment_boundaries(self):
+        # The extrema are found from segments of one window length.  Move a
+        # peak and a trough through every position relative to the segment
+        # boundaries, for windows which do and do not divide the length.
+        for window in (2, 3, 4, 5):
+            for position in range(11):
+                data = np.zeros(11)
+                data[position] = 1
+                data[(position + 5) % 11] = -1
+                self._check(data, window,
+                            aggregators=[(iris.analysis.MAX, {}),
+                                         (iris.analysis.MIN, {})])
+
+    def test_other_axis(self):
+        data = np.arange(24.).reshape(2, 6, 2)
+        data[1, 2, 0] = 100.
+        self._check(data, 4, axis=1)
+
+    def test_non_finite(self):
+        # A NaN or an infinity only affects the windows which contain it.
+        data = np.arange(12.)
+        data[4] = np.nan
+        data[8] = np.inf
+        array = biggus.NumpyArrayAdapter(data)
+        sums = rolling_window(data, 3).sum(axis=1)
+        for aggregator, expected in ((iris.analysis.SUM, sums),
+                                     (iris.analysis.MEAN, sums / 3)):
+            result = rolling_reduce(array, 0, 3, aggregator).ndarray()
+            self.assertArrayEqual(np.isnan(result), [0, 0, 1, 1, 1, 0, 0, 0,
+                                                     0, 0])
+            self.assertArrayEqual(np.isposinf(result), [0, 0, 0, 0, 0, 0, 1,
+                                                        1, 1, 0])
+            self.assertArrayAlmostEqual(result, expected)
+
+    def test_opposite_infinities(self):
+        data = np.array([1., np.inf, 2., -np.inf, 3., 4.])
+        result = rolling_reduce(biggus.NumpyArrayAdapter(data), 0, 3,
+                                iris.analysis.SUM).ndarray()
+        self.assertArrayEqual(result, [np.inf, np.nan, -np.inf, -np.inf])
+
+    def test_masked_non_finite(self):
+        # A masked NaN is ignored.
+        data = ma.masked_array([1., np.nan, 2., 3., 4.],
+                               mask=[0, 1, 0, 0, 0])
+        self._check(data, 2, aggregators=[(iris.analysis.SUM, {}),
+                                          (iris.analysis.MEAN, {})])
+
+    def test_overlapping_blocks(self):
+        # With blocks of a single window along the axis, every window
+        # still sees all its elements.
+        data = ma.masked_array(np.arange(40.).reshape(2, 20) % 7,
+                               mask=np.arange(40).reshape(2, 20) % 9 == 0)
+        with mock.patch('iris._lazy_data._MAX_BLOCK_BYTES', 8):
+            self._check(data, 5, axis=1, mdtol=0.5)
+
+    def test_indexing(self):
+        data = np.arange(30.).reshape(3, 10) ** 2
+        array = biggus.NumpyArrayAdapter(data)
+        result = rolling_reduce(array, 1, 3, iris.analysis.SUM)
+        expected = rolling_window(data, 3, axis=1).sum(axis=-1)
+        self.assertArrayAlmostEqual(result[1:, (6, 2)].ndarray(),
+                                    expected[1:, [6, 2]])
+        self.assertArrayAlmostEqual(result[0, 5].ndarray(), expected[0, 5])
+
+    def test_reads_only_requested_windows(self):
+        data = np.arange(30.).reshape(3, 10)
+        proxy = mock.MagicMock(shape=data.shape, dtype=data.dtype,
+                               ndim=data.ndim)
+        proxy.__getitem__.side_effect = lambda keys: data[keys]
+        array = biggus.OrthoArrayAdapter(proxy)
+        result = rolling_reduce(array, 1, 3, iris.analysis.MEAN)
+        self.assertEqual(result.shape, (3, 8))
+        self.assertEqual(proxy.__getitem__.call_count, 0)
+        result[:, 5:7].ndarray()
+        (keys,), _ = proxy.__getitem__.call_args
+        self.assertArrayEqual(np.arange(10)[keys[1]], [5, 6, 7, 8])
+
+    def test_chunked_scalar_keys(self):
+        data = np.arange(30.).reshape(3, 10)
+        proxy = mock.MagicMock(shape=data.shape, dtype=data.dtype,
+                               ndim=data.ndim, chunks=(2, 5))
+        proxy.__getitem__.side_effect = lambda keys: data[keys]
+        array = biggus.OrthoArrayAdapter(proxy)
+        result = rolling_reduce(array, 1, 3, iris.analysis.SUM)
+        expected = rolling_window(data, 3, axis=1).sum(axis=-1)
+        self.assertArrayAlmostEqual(result[:, 4].ndarray(), expected[:, 4])
+        self.assertArrayAlmostEqual(result[1, 6].ndarray(), expected[1, 6])
+
+    def test_unsupported(self):
+        array = biggus.NumpyArrayAdapter(np.arange(10.))
+        self.assertIsNone(rolling_reduce(array, 0, 3, iris.analysis.MEDIAN))
+        self.assertIsNone(rolling_reduce(array, 0, 3, iris.analysis.MEAN,
+                                         weights=np.ones(3)))
+        self.assertIsNone(rolling_reduce(array, 0, 11, iris.analysis.MEAN))
+
+
+if __name__ == '__main__':
+    tests.main()
@@ -28,9 +28,10 @@ import cf_units
 import numpy as np
 
 import iris.coords
-from iris._concatenate import concatenate
+from iris._concatenate import _CubeSignature, concatenate
 import iris.cube
 from iris.exceptions import ConcatenateError
+from iris.tests import mock
 
 
 class TestEpoch(tests.IrisTest):
@@ -282,6 +283,73 @@ class TestOrder(tests.IrisTest):
         self.assertEqual(result1, result2)
 
 
+class TestSignatureKey(tests.IrisTest):
+    def _make_cube(self, points, attributes):
+        cube = iris.cube.Cube(np.arange(len(points)),
+                              standard_name='air_temperature', units='K',
+                              attributes=attributes)
+        cube.add_dim_coord(iris.coords.DimCoord(points, 'latitude'), 0)
+        return cube
+
+    def test_match_within_key(self):
+        cubes = [self._make_cube([0, 1], {'a': 1}),
+                 self._make_cube([0, 1], {'b': 1}),
+                 self._make_cube([2, 3], {'a': 1}),
+                 self._make_cube([2, 3], {'b': 1})]
+        match = _CubeSignature.match
+        with mock.patch.object(_CubeSignature, 'match', autospec=True,
+                               side_effect=match) as patched:
+            result = concatenate(cubes)
+        self.assertEqual(len(result), 2)
+        self.assertEqual([cube.attributes for cube in result],
+                         [{'a': 1}, {'b': 1}])
+        # Each cube is only compared with the proto-cube of its own key.
+        self.assertEqual(patched.call_count, 2)
+
+    def test_mismatch_reported(self):
+        cubes = [self._make_cube([0, 1], {'a': 1}),
+                 self._make_cube([2, 3], {'b': 1})]
+        with self.assertRaisesRegexp(ConcatenateError, 'metadata differs'):
+            concatenate(cubes, error_on_mismatch=True)
+
+
+class TestSequence(tests.IrisTest):
+    def _make_cube(self, points, bounds=None):
+        cube = iris.cube.Cube(np.arange(len(points)),
+                              standard_name='air_temperature', units='K')
+        lat = iris.coords.DimCoord(points, 'latitude', bounds=bounds)
+        cube.add_dim_coord(lat, 0)
+        return cube
+
+    def test_unordered(self):
+        cubes = [self._make_cube(points)
+                 for points in ([0, 1], [6, 7], [4, 5], [2, 3])]
+        result = concatenate(cubes)
+        self.assertEqual(len(result), 1)
+        self.assertArrayEqual(result[0].coord('latitude').points,
+                              np.arange(8))
+
+    def test_unordered_decreasing(self):
+        cubes = [self._make_cube(points)
+                 for points in ([7, 6], [1, 0], [5, 4], [3, 2])]
+        result = concatenate(cubes)
+        self.assertEqual(len(result), 1)
+        self.assertArrayEqual(result[0].coord('latitude').points,
+                              np.arange(8)[::-1])
+
+    def test_overlap_with_neighbour(self):
+        cubes = [self._make_cube(points)
+                 for points in ([0, 1], [6, 7], [1, 2])]
+        result = concatenate(cubes)
+        self.assertEqual(len(result), 2)
+
+    def test_bounds_overlap(self):
+        cubes = [self._make_cube([0, 1], [[-0.5, 0.5], [0.5, 1.5]]),
+                 self._make_cube([2, 3], [[0.4, 2.5], [2.5, 3.5]])]
+        result = concatenate(cubes)
+        self.assertEqual(len(result), 2)
+
+
 class TestConcatenateBiggus(tests.IrisTest):
     def build_lazy_cube(self, points, bounds=None, nx=4):
         data = np.arange(len(points) * nx).reshape(len(points), nx)
@@ -0,0 +1,97 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for the `iris._constraints.OneOf` class."""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import numpy as np
+
+import iris
+from iris.coords import DimCoord
+from iris.cube import Cube
+from iris.fileformats.pp import STASH
+
+
+class Test_extract(tests.IrisTest):
+    def setUp(self):
+        self.cube = Cube(np.arange(5), long_name='foo',
+                         attributes={'STASH': STASH(1, 0, 4)})
+        self.cube.add_dim_coord(DimCoord(np.arange(5), long_name='bar'), 0)
+
+    def test_name(self):
+        constraint = iris.Constraint(name=iris.OneOf('baz', 'foo'))
+        self.assertIs(constraint.extract(self.cube), self.cube)
+        constraint = iris.Constraint(name=iris.OneOf('baz'))
+        self.assertIsNone(constraint.extract(self.cube))
+
+    def test_coord(self):
+        constraint = iris.Constraint(bar=iris.OneOf(1, 3, 7))
+        self.assertArrayEqual(constraint.extract(self.cube).data, [1, 3])
+
+    def test_stash(self):
+        constraint = iris.AttributeConstraint(
+            STASH=iris.OneOf('m01s00i004', 'm01s00i010'))
+        self.assertIs(constraint.extract(self.cube), self.cube)
+        constraint = iris.AttributeConstraint(
+            STASH=iris.OneOf('m01s00i010'))
+        self.assertIsNone(constraint.extract(self.cube))
+
+
+class Test__may_match(tests.IrisTest):
+    def setUp(self):
+        self.coords_and_dims = [(DimCoord(np.arange(5), long_name='bar'),
+                                 (0,))]
+        self.attributes = {'STASH': STASH(1, 0, 4)}
+
+    def _may_match(self, constraint, names=('foo',)):
+        return constraint._may_match(names, self.attributes,
+                                     self.coords_and_dims)
+
+    def test_name(self):
+        self.assertTrue(self._may_match(iris.Constraint('foo')))
+        self.assertFalse(self._may_match(iris.Constraint('baz')))
+        self.assertTrue(self._may_match(
+            iris.Constraint(name=iris.OneOf('foo', 'baz'))))
+
+    def test_attributes(self):
+        self.assertTrue(self._may_match(iris.AttributeConstraint(
+            STASH=iris.OneOf('m01s00i004', 'm01s00i010'))))
+        self.assertFalse(self._may_match(iris.AttributeConstraint(
+            STASH='m01s00i010')))
+        # A missing attribute may be added when the cube is built.
+        self.assertTrue(self._may_match(iris.AttributeConstraint(
+            source='model')))
+
+    def test_combination(self):
+        self.assertTrue(self._may_match(
+            iris.Constraint('foo') & iris.Constraint(bar=iris.Range(2, 4))))
+        self.assertFalse(self._may_match(
+            iris.Constraint('foo') & iris.Constraint(bar=iris.Range(6, 8))))
+
+    def test_cube_func(self):
+        # Arbitrary cube functions cannot be judged without a cube.
+        self.assertTrue(self._may_match(
+            iris.Constraint(cube_func=lambda cube: False)))
+
+
+if __name__ == '__main__':
+    tests.main()
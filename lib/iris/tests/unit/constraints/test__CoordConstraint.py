@@ -0,0 +1,220 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for the `iris._constraints._CoordConstraint` class."""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import cf_units
+import numpy as np
+
+import iris
+from iris._constraints import _CoordConstraint, OneOf, Range
+from iris.coords import AuxCoord
+from iris.cube import Cube
+from iris.time import PartialDateTime
+from iris.tests import mock
+
+
+class Test__array_match(tests.IrisTest):
+    def setUp(self):
+        points = np.arange(10, dtype=float)
+        self.coord = AuxCoord(points, long_name='foo')
+        self.bounded = AuxCoord(points, long_name='foo',
+                                bounds=np.stack([points - 0.5,
+                                                 points + 0.5], axis=-1))
+
+    def _check(self, thing, coord=None):
+        # The array match must agree with matching each cell.
+        if coord is None:
+            coord = self.coord
+        constraint = _CoordConstraint('foo', thing)
+        result = constraint._array_match(coord)
+        self.assertIsNotNone(result)
+        if isinstance(thing, list):
+            def func(cell):
+                return cell in thing
+        elif callable(thing):
+            func = thing
+        else:
+            def func(cell):
+                return cell == thing
+        expected = [func(cell) for cell in coord.cells()]
+        self.assertArrayEqual(result, expected)
+        return result
+
+    def test_scalar(self):
+        self.assertEqual(self._check(3).sum(), 1)
+
+    def test_scalar_bounded(self):
+        self.assertEqual(self._check(3.5, self.bounded).sum(), 2)
+
+    def test_list(self):
+        self.assertEqual(self._check([1, 4, 4.5, 20]).sum(), 2)
+
+    def test_list_bounded(self):
+        self.assertEqual(self._check([1, 4.5], self.bounded).sum(), 3)
+
+    def test_one_of(self):
+        self.assertEqual(self._check(OneOf(1, 4, 4.5, 20)).sum(), 2)
+
+    def test_range(self):
+        self.assertEqual(self._check(Range(2, 5)).sum(), 3)
+
+    def test_range_inclusive(self):
+        self.assertEqual(self._check(Range(2, 5, min_inclusive=False,
+                                           max_inclusive=True)).sum(), 3)
+
+    def test_range_open(self):
+        self.assertEqual(self._check(Range(maximum=5)).sum(), 5)
+        self.assertEqual(self._check(Range(minimum=5)).sum(), 5)
+
+    def test_range_bounded(self):
+        for min_inclusive in (True, False):
+            for max_inclusive in (True, False):
+                self._check(Range(2, 5, min_inclusive, max_inclusive),
+                            self.bounded)
+
+    def test_float32(self):
+        # 0.1 is not exactly representable, so it only equals the single
+        # precision point when compared in single precision.
+        coord = AuxCoord(np.array([0.1, 0.2], dtype=np.float32),
+                         long_name='foo')
+        self.assertEqual(self._check(0.1, coord).sum(), 0)
+        self.assertEqual(self._check(Range(0.1, 0.2), coord).sum(), 1)
+        self.assertEqual(self._check(np.float32(0.1), coord).sum(), 1)
+
+    def test_callable(self):
+        constraint = _CoordConstraint('foo', lambda cell: cell > 3)
+        self.assertIsNone(constraint._array_match(self.coord))
+
+    def test_string(self):
+        coord = AuxCoord(['a', 'b'], long_name='foo')
+        constraint = _CoordConstraint('foo', 'a')
+        self.assertIsNone(constraint._array_match(coord))
+
+
+class Test__array_match__datetime(tests.IrisTest):
+    def setUp(self):
+        # Six hourly points over a year, in a Gregorian calendar.
+        self.coord = AuxCoord(np.arange(0, 366 * 24, 6, dtype=float),
+                              standard_name='time',
+                              units='hours since 2000-01-01 00:00:00')
+
+    def _check(self, thing, coord=None):
+        if coord is None:
+            coord = self.coord
+        constraint = _CoordConstraint('time', thing)
+        with iris.FUTURE.context(cell_datetime_objects=True):
+            result = constraint._array_match(coord)
+            if isinstance(thing, list):
+                def func(cell):
+                    return cell.point in thing
+            elif callable(thing):
+                func = thing
+            else:
+                def func(cell):
+                    return cell == thing
+            expected = [func(cell) for cell in coord.cells()]
+        self.assertIsNotNone(result)
+        self.assertArrayEqual(result, expected)
+        return result
+
+    def test_equal(self):
+        self.assertEqual(self._check(PartialDateTime(month=2, day=29,
+                                                     hour=6)).sum(), 1)
+
+    def test_list(self):
+        self.assertEqual(self._check([PartialDateTime(day=1, hour=0),
+                                      PartialDateTime(day=15, hour=0)]).sum(),
+                         24)
+
+    def test_range(self):
+        self._check(Range(PartialDateTime(month=6),
+                          PartialDateTime(month=9)))
+
+    def test_range_inclusive(self):
+        self._check(Range(PartialDateTime(month=6, day=15, hour=12),
+                          PartialDateTime(month=9, day=2),
+                          min_inclusive=False, max_inclusive=True))
+
+    def test_360_day(self):
+        coord = AuxCoord(np.arange(0, 360 * 24, 6, dtype=float),
+                         standard_name='time',
+                         units=cf_units.Unit('hours since 2000-01-01',
+                                             calendar='360_day'))
+        constraint = _CoordConstraint(
+            'time', PartialDateTime(month=2, day=30, hour=6))
+        with iris.FUTURE.context(cell_datetime_objects=True):
+            result = constraint._array_match(coord)
+        # The 30th of February is the 60th day of the year.
+        expected = np.zeros(coord.shape, dtype=bool)
+        expected[(59 * 24 + 6) // 6] = True
+        self.assertArrayEqual(result, expected)
+
+    def test_bounded(self):
+        coord = self.coord.copy()
+        coord.guess_bounds()
+        constraint = _CoordConstraint('time', PartialDateTime(month=2))
+        with iris.FUTURE.context(cell_datetime_objects=True):
+            self.assertIsNone(constraint._array_match(coord))
+
+
+class Test__may_match(tests.IrisTest):
+    def setUp(self):
+        self.vector = AuxCoord(np.arange(10), long_name='foo')
+        self.scalar = AuxCoord(3, long_name='foo')
+
+    def test_vector(self):
+        self.assertTrue(_CoordConstraint('foo', 3)._may_match(
+            [(self.vector, (0,))]))
+        self.assertFalse(_CoordConstraint('foo', 20)._may_match(
+            [(self.vector, (0,))]))
+
+    def test_scalar(self):
+        self.assertTrue(_CoordConstraint('foo', Range(2, 5))._may_match(
+            [(self.scalar, ())]))
+        self.assertFalse(_CoordConstraint('foo', Range(4, 5))._may_match(
+            [(self.scalar, ())]))
+
+    def test_missing_coord(self):
+        # The coordinate could be derived from an aux factory.
+        self.assertTrue(_CoordConstraint('bar', 20)._may_match(
+            [(self.scalar, ())]))
+
+    def test_callable(self):
+        constraint = _CoordConstraint('foo', lambda cell: False)
+        self.assertTrue(constraint._may_match([(self.scalar, ())]))
+
+
+class Test_extract(tests.IrisTest):
+    def test_cells_not_used(self):
+        cube = Cube(np.arange(10))
+        cube.add_aux_coord(AuxCoord(np.arange(10), long_name='foo'), 0)
+        constraint = iris.Constraint(foo=Range(3, 6))
+        with mock.patch('iris.coords.Coord.cells') as cells:
+            result = constraint.extract(cube)
+        self.assertEqual(cells.call_count, 0)
+        self.assertArrayEqual(result.data, [3, 4, 5])
+
+
+if __name__ == '__main__':
+    tests.main()
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2013 - 2016, Met Office
+# (C) British Crown Copyright 2013 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -366,6 +366,61 @@ class Test_aggregated_by(tests.IrisTest):
         self.assertEqual(result.coord('bar'),
                          AuxCoord(['a|a', 'a'], long_name='bar'))
 
+    def test_lazy(self):
+        data = np.arange(11.)
+        self.cube.lazy_data(biggus.NumpyArrayAdapter(data))
+        result = self.cube.aggregated_by('val', MEAN)
+        self.assertTrue(result.has_lazy_data())
+        self.assertArrayAlmostEqual(result.data,
+                                    [np.mean(data[[0, 1, 2, 6, 7, 9]]),
+                                     np.mean(data[[3, 4, 10]]),
+                                     np.mean(data[[5, 8]])])
+
+    def test_weights(self):
+        weights = np.arange(1., 12.)
+        result = self.cube.aggregated_by('val', MEAN, weights=weights)
+        data = self.cube.data
+        groups = [[0, 1, 2, 6, 7, 9], [3, 4, 10], [5, 8]]
+        self.assertArrayAlmostEqual(
+            result.data, [np.average(data[group], weights=weights[group])
+                          for group in groups])
+
+    def test_zero_weights_unmasked(self):
+        # A group whose weights sum to zero is masked, not filled.
+        weights = np.ones(11)
+        weights[[5, 8]] = 0
+        result = self.cube.aggregated_by('val', MEAN, weights=weights)
+        self.assertIsInstance(result.data, ma.MaskedArray)
+        self.assertArrayEqual(result.data.mask, [False, False, True])
+        self.assertArrayAlmostEqual(result.data[:2], [25. / 6, 17. / 3])
+
+    def test_weights_not_vectorised(self):
+        # A weighted aggregator without a group reduction is applied to
+        # each group with its weights.
+        weights = np.arange(1., 12.)
+        aggregator = iris.analysis.RMS
+        result = self.cube.aggregated_by('val', aggregator, weights=weights)
+        data = self.cube.data
+        groups = [[0, 1, 2, 6, 7, 9], [3, 4, 10], [5, 8]]
+        self.assertArrayAlmostEqual(
+            result.data, [aggregator.aggregate(data[group], axis=0,
+                                               weights=weights[group])
+                          for group in groups])
+
+    def test_weights_bad_shape(self):
+        with self.assertRaises(ValueError):
+            self.cube.aggregated_by('val', MEAN, weights=np.ones(3))
+
+    def test_returned(self):
+        with self.assertRaises(ValueError):
+            self.cube.aggregated_by('val', MEAN, returned=True)
+
+    def test_real_unmasked(self):
+        result = self.cube.aggregated_by('val', iris.analysis.MAX)
+        self.assertFalse(result.has_lazy_data())
+        self.assertNotIsInstance(result.data, ma.MaskedArray)
+        self.assertArrayEqual(result.data, [9, 10, 8])
+
 
 class Test_rolling_window(tests.IrisTest):
     def setUp(self):
@@ -408,6 +463,25 @@ class Test_rolling_window(tests.IrisTest):
                                       dtype=np.float64)
         self.assertMaskedArrayEqual(expected_result, res_cube.data)
 
+    def test_lazy(self):
+        data = np.arange(6.)
+        self.cube.lazy_data(biggus.NumpyArrayAdapter(data))
+        res_cube = self.cube.rolling_window('val', iris.analysis.MAX, 3)
+        self.assertTrue(res_cube.has_lazy_data())
+        self.assertArrayEqual(res_cube.data, [2., 3., 4., 5.])
+
+    def test_real_unmasked(self):
+        res_cube = self.cube.rolling_window('val', iris.analysis.SUM, 3)
+        self.assertFalse(res_cube.has_lazy_data())
+        self.assertNotIsInstance(res_cube.data, ma.MaskedArray)
+        self.assertArrayEqual(res_cube.data, [3, 6, 9, 12])
+
+    def test_weights(self):
+        weights = np.array([1., 2., 1.])
+        res_cube = self.cube.rolling_window('val', iris.analysis.MEAN, 3,
+                                            weights=weights)
+        self.assertArrayAlmostEqual(res_cube.data, [1., 2., 3., 4.])
+
 
 @tests.skip_data
 class Test_slices_over(tests.IrisTest):
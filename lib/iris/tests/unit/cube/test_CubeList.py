@@ -27,11 +27,13 @@ import iris.tests.stock
 from cf_units import Unit
 import numpy as np
 
+import iris._merge
 from iris.cube import Cube, CubeList
 from iris.coords import AuxCoord, DimCoord
 import iris.coord_systems
 import iris.exceptions
 from iris.fileformats.pp import STASH
+from iris.tests import mock
 
 
 class Test_concatenate_cube(tests.IrisTest):
@@ -148,6 +150,28 @@ class Test_merge_cube(tests.IrisTest):
             CubeList([self.cube1, self.cube1]).merge_cube()
 
 
+class Test_merge__signature_key(tests.IrisTest):
+    def _make_cube(self, height, attributes):
+        cube = Cube([1, 2, 3], 'air_temperature', units='K',
+                    attributes=attributes)
+        cube.add_aux_coord(AuxCoord([height], 'height', units='m'))
+        return cube
+
+    def test_match_within_key(self):
+        cubes = CubeList([self._make_cube(0, {'a': 1}),
+                          self._make_cube(0, {'b': 1}),
+                          self._make_cube(1, {'a': 1}),
+                          self._make_cube(1, {'b': 1})])
+        match = iris._merge._CubeSignature.match
+        with mock.patch.object(iris._merge._CubeSignature, 'match',
+                               autospec=True, side_effect=match) as patched:
+            result = cubes.merge()
+        self.assertEqual(len(result), 2)
+        self.assertEqual([cube.shape for cube in result], [(2, 3), (2, 3)])
+        # Each cube is only compared with the ProtoCube of its own key.
+        self.assertEqual(patched.call_count, 2)
+
+
 class Test_merge__time_triple(tests.IrisTest):
     @staticmethod
     def _make_cube(fp, rt, t, realization=None):
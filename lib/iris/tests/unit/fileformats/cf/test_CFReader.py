@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2014 - 2015, Met Office
+# (C) British Crown Copyright 2014 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -26,9 +26,13 @@ from six.moves import (filter, input, map, range, zip)  # noqa
 # importing anything else.
 import iris.tests as tests
 
+import warnings
+
 import numpy as np
 
 import iris
+from iris.fileformats._cf_cache import CFStructureCache
+from iris.fileformats._file_pool import FilePool
 from iris.fileformats.cf import CFReader
 from iris.tests import mock
 
@@ -317,5 +321,119 @@ class Test_build_cf_groups__formula_terms(tests.IrisTest):
             self.assertEqual(warn.call_count, 2)
 
 
+class Test__cache(tests.IrisTest):
+    def setUp(self):
+        self.lat = netcdf_variable('lat', 'lat', np.float)
+        self.lat_bnds = netcdf_variable('lat_bnds', 'lat bnds', np.float)
+        self.lat.bounds = 'lat_bnds'
+        self.temp = netcdf_variable('temp', 'lat', np.float,
+                                    cell_measures='area: cell_area')
+        self.cell_area = netcdf_variable('cell_area', 'lat', np.float)
+        variables = dict(lat=self.lat, lat_bnds=self.lat_bnds,
+                         temp=self.temp, cell_area=self.cell_area)
+        self.dataset = mock.Mock(file_format='NetCDF4', variables=variables,
+                                 ncattrs=mock.Mock(return_value=['title']),
+                                 getncattr=mock.Mock(return_value='Test'))
+        self.cache = CFStructureCache()
+        patches = [mock.patch('netCDF4.Dataset', return_value=self.dataset),
+                   mock.patch('iris.fileformats.cf.CF_CACHE', self.cache)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _check(self, cf_group):
+        self.assertEqual(set(cf_group.data_variables), set(['temp']))
+        temp = cf_group['temp']
+        self.assertIs(temp.cf_data, self.temp)
+        self.assertEqual(set(temp.cf_group), set(['lat', 'cell_area']))
+        self.assertEqual(temp.cf_group.global_attributes, {'title': 'Test'})
+        self.assertEqual(temp.cf_group['cell_area'].cf_measure, 'area')
+        self.assertIs(temp.cf_group['lat'], cf_group['lat'])
+        self.assertEqual(set(cf_group['lat'].cf_group.bounds),
+                         set(['lat_bnds']))
+
+    def test_reread(self):
+        with self.temp_filename('.nc') as path:
+            with open(path, 'wb'):
+                pass
+            first = CFReader(path).cf_group
+            with mock.patch('iris.fileformats.cf.CFReader._translate') as tr:
+                second = CFReader(path).cf_group
+        self.assertEqual(tr.call_count, 0)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self._check(first)
+        self._check(second)
+        self.assertIsNot(second['temp'], first['temp'])
+
+    def test_reread_warnings(self):
+        # The warnings of the identification are issued by every reader.
+        self.temp.coordinates = 'missing'
+        with self.temp_filename('.nc') as path:
+            with open(path, 'wb'):
+                pass
+            readers = []
+            for _ in range(2):
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter('always')
+                    readers.append(CFReader(path))
+                messages = [str(warning.message) for warning in caught]
+                self.assertIn("Missing CF-netCDF auxiliary coordinate "
+                              "variable 'missing', referenced by netCDF "
+                              "variable 'temp'", messages)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_modified(self):
+        with self.temp_filename('.nc') as path:
+            with open(path, 'wb'):
+                pass
+            CFReader(path)
+            with open(path, 'wb') as fh:
+                fh.write(b'modified')
+            CFReader(path)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def test_options(self):
+        with self.temp_filename('.nc') as path:
+            with open(path, 'wb'):
+                pass
+            CFReader(path)
+            CFReader(path, monotonic=True)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def test_missing_file(self):
+        CFReader('dummy')
+        CFReader('dummy')
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 0))
+
+
+class Test__dataset(tests.IrisTest):
+    def setUp(self):
+        ncvar = netcdf_variable('ncvar', 'height', np.float)
+        self.dataset = mock.Mock(file_format='NetCDF4',
+                                 variables={'ncvar': ncvar},
+                                 ncattrs=mock.Mock(return_value=[]))
+        self.pool = FilePool()
+        patches = [mock.patch('netCDF4.Dataset', return_value=self.dataset),
+                   mock.patch('iris.fileformats.cf.FILE_POOL', self.pool)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_returned_to_pool(self):
+        reader = CFReader('dummy')
+        self.assertEqual(self.pool._n_idle, 0)
+        del reader
+        self.assertEqual(self.pool._n_idle, 1)
+        self.assertEqual(self.dataset.close.call_count, 0)
+
+    def test_closed_on_error(self):
+        with mock.patch('iris.fileformats.cf.CFReader._identify',
+                        side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                CFReader('dummy')
+        self.assertEqual(self.pool._n_idle, 0)
+        self.dataset.close.assert_called_once_with()
+
+
 if __name__ == '__main__':
     tests.main()
@@ -0,0 +1,112 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Unit tests for the :class:`iris.fileformats._cf_cache.CFStructureCache`
+class.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import os
+import shutil
+import tempfile
+
+from iris.fileformats._cf_cache import CFStructureCache
+
+
+class Test(tests.IrisTest):
+    def setUp(self):
+        self.cache = CFStructureCache(max_entries=2)
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.get(('a',)))
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+
+    def test_hit(self):
+        entry = dict(variables=[])
+        self.cache.put(('a',), entry)
+        self.assertIs(self.cache.get(('a',)), entry)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 0))
+
+    def test_least_recently_used_evicted(self):
+        for name in 'abc':
+            self.cache.put((name,), name)
+        self.assertIsNone(self.cache.get(('a',)))
+        self.cache.get(('b',))
+        self.cache.put(('d',), 'd')
+        self.assertEqual(self.cache.get(('b',)), 'b')
+        self.assertIsNone(self.cache.get(('c',)))
+
+    def test_disabled(self):
+        cache = CFStructureCache(max_entries=0)
+        self.assertFalse(cache.enabled)
+        cache.put(('a',), 'a')
+        self.assertIsNone(cache.get(('a',)))
+
+    def test_clear(self):
+        self.cache.put(('a',), 'a')
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(('a',)))
+
+
+class Test__disk(tests.IrisTest):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def test_shared(self):
+        entry = dict(variables=[('x', 'CFDataVariable', None, {}, [])])
+        writer = CFStructureCache(max_entries=0, cache_dir=self.cache_dir)
+        self.assertTrue(writer.enabled)
+        writer.put(('a', 1.5), entry)
+        reader = CFStructureCache(cache_dir=self.cache_dir)
+        self.assertEqual(reader.get(('a', 1.5)), entry)
+        self.assertIsNone(reader.get(('a', 2.5)))
+        self.assertEqual((reader.hits, reader.misses), (1, 1))
+
+    def test_remembered_in_memory(self):
+        writer = CFStructureCache(cache_dir=self.cache_dir)
+        writer.put(('a',), 'a')
+        reader = CFStructureCache(cache_dir=self.cache_dir)
+        reader.get(('a',))
+        for name in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, name))
+        self.assertEqual(reader.get(('a',)), 'a')
+
+    def test_corrupt(self):
+        cache = CFStructureCache(max_entries=0, cache_dir=self.cache_dir)
+        cache.put(('a',), 'a')
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), 'wb') as fh:
+                fh.write(b'junk')
+        self.assertIsNone(cache.get(('a',)))
+
+    def test_unwritable(self):
+        cache = CFStructureCache(
+            cache_dir=os.path.join(self.cache_dir, 'missing'))
+        cache.put(('a',), 'a')
+        self.assertEqual(cache.get(('a',)), 'a')
+
+
+if __name__ == '__main__':
+    tests.main()
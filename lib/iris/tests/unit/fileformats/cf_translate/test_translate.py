@@ -0,0 +1,288 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for :func:`iris.fileformats._cf_translate.translate`."""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import netCDF4
+import numpy as np
+
+from iris.fileformats._cf_translate import translate
+from iris.fileformats.netcdf import load_cubes
+from iris.tests import mock
+
+
+class Test(tests.IrisTest):
+    # The decisions of the translation, with a stand-in for the rule base.
+    def setUp(self):
+        # A stand-in for the compiled rule base, which classifies the
+        # coordinates by their names.
+        fc = mock.Mock(
+            CF_ATTR_GRID_MAPPING_NAME='grid_mapping_name',
+            CF_GRID_MAPPING_LAT_LON='latitude_longitude',
+            CF_GRID_MAPPING_ROTATED_LAT_LON='rotated_latitude_longitude',
+            CF_VALUE_STD_NAME_LAT='latitude',
+            CF_VALUE_STD_NAME_LON='longitude',
+            CF_VALUE_STD_NAME_GRID_LAT='grid_latitude',
+            CF_VALUE_STD_NAME_GRID_LON='grid_longitude')
+        for kind in ('latitude', 'longitude', 'time', 'time_period',
+                     'projection_x_coordinate', 'projection_y_coordinate'):
+            setattr(fc, 'is_' + kind,
+                    lambda engine, name, kind=kind: name == kind)
+        fc.is_rotated_latitude.return_value = False
+        fc.is_rotated_longitude.return_value = False
+        self.fc = fc
+        patch = mock.patch('iris.fileformats._cf_translate._rules_module',
+                           return_value=fc)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+        self.variables = {}
+        cf_group = mock.MagicMock(grid_mappings={}, coordinates={},
+                                  auxiliary_coordinates={}, labels={},
+                                  cell_measures={})
+        cf_group.__getitem__.side_effect = self.variables.__getitem__
+        cf_group.__contains__.side_effect = self.variables.__contains__
+        self.cf_group = cf_group
+        self.cf_var = mock.Mock(spec=['cf_group'], cf_group=cf_group)
+        self.cf = mock.Mock()
+        self.cf.cf_group.formula_terms = {}
+        self.engine = mock.Mock(cf_var=self.cf_var, provides={}, requires={},
+                                rule_triggered=set())
+
+    def _add(self, container, name, **attributes):
+        variable = mock.Mock(spec=list(attributes), **attributes)
+        container[name] = variable
+        self.variables[name] = variable
+        return variable
+
+    def _add_coords(self, *names):
+        for name in names:
+            self._add(self.cf_group.coordinates, name)
+
+    def test_latitude_longitude(self):
+        grid_var = self._add(self.cf_group.grid_mappings, 'crs',
+                             grid_mapping_name='latitude_longitude')
+        self._add_coords('latitude', 'longitude', 'time', 'height')
+        self.assertTrue(translate(self.engine, self.cf, self.cf_var))
+        self.fc.build_cube_metadata.assert_called_once_with(self.engine)
+        self.fc.build_coordinate_system.assert_called_once_with(grid_var)
+        cs = self.fc.build_coordinate_system.return_value
+        self.assertIs(self.engine.provides['coordinate_system'], cs)
+        calls = self.fc.build_dimension_coordinate.call_args_list
+        by_var = dict((args[1], kwargs) for args, kwargs in calls)
+        coordinates = self.cf_group.coordinates
+        self.assertEqual(by_var[coordinates['latitude']],
+                         dict(coord_name='latitude', coord_system=cs))
+        self.assertEqual(by_var[coordinates['longitude']],
+                         dict(coord_name='longitude', coord_system=cs))
+        self.assertEqual(by_var[coordinates['time']],
+                         dict(coord_name=None, coord_system=None))
+        self.assertEqual(by_var[coordinates['height']],
+                         dict(coord_name=None, coord_system=None))
+
+    def test_no_grid_mapping(self):
+        self._add_coords('latitude')
+        self.assertTrue(translate(self.engine, self.cf, self.cf_var))
+        self.fc.build_dimension_coordinate.assert_called_once_with(
+            self.engine, self.cf_group.coordinates['latitude'],
+            coord_name='latitude', coord_system=None)
+
+    def test_auxiliary_coordinates(self):
+        self._add(self.cf_group.auxiliary_coordinates, 'longitude')
+        self.fc.is_rotated_longitude.return_value = True
+        self.assertTrue(translate(self.engine, self.cf, self.cf_var))
+        self.fc.build_auxiliary_coordinate.assert_called_once_with(
+            self.engine, self.cf_group.auxiliary_coordinates['longitude'],
+            coord_name='grid_longitude')
+
+    def test_formula(self):
+        self._add_coords('level')
+        self._add(self.variables, 'level',
+                  standard_name='atmosphere_hybrid_height_coordinate')
+        term_var = mock.Mock(cf_name='a', cf_terms_by_root={'level': 'a'})
+        self.cf.cf_group.formula_terms = {'a': term_var}
+        self.assertTrue(translate(self.engine, self.cf, self.cf_var))
+        self.assertEqual(self.engine.requires,
+                         {'formula_type':
+                          'atmosphere_hybrid_height_coordinate',
+                          'formula_terms': {'a': 'a'}})
+
+    def _check_unhandled(self):
+        self.assertFalse(translate(self.engine, self.cf, self.cf_var))
+        self.assertEqual(self.fc.build_cube_metadata.call_count, 0)
+        self.assertEqual(self.engine.provides, {})
+
+    def test_unhandled_grid_mapping(self):
+        self._add(self.cf_group.grid_mappings, 'crs',
+                  grid_mapping_name='transverse_mercator')
+        self._check_unhandled()
+
+    def test_unhandled_projection_coordinate(self):
+        self._add_coords('projection_x_coordinate')
+        self._check_unhandled()
+
+    def test_unhandled_rotated_mismatch(self):
+        self._add(self.cf_group.grid_mappings, 'crs',
+                  grid_mapping_name='rotated_latitude_longitude')
+        self._add_coords('latitude')
+        self._check_unhandled()
+
+    def test_no_rules_module(self):
+        with mock.patch('iris.fileformats._cf_translate._rules_module',
+                        return_value=None):
+            self._check_unhandled()
+
+
+class Test__rule_base(tests.IrisTest):
+    # Each case is loaded both by the translation and by the rule base, with
+    # the real rule base helpers, and must give the same cubes.  This keeps
+    # the translation in step with "fc_rules_cf.krb".
+    def _check(self, populate):
+        translated = []
+
+        def record(engine, cf, cf_var):
+            result = translate(engine, cf, cf_var)
+            translated.append(result)
+            return result
+
+        with self.temp_filename('.nc') as path:
+            dataset = netCDF4.Dataset(path, mode='w')
+            try:
+                populate(dataset)
+            finally:
+                dataset.close()
+            with mock.patch('iris.fileformats._cf_translate.translate',
+                            side_effect=record):
+                fast = list(load_cubes(path))
+            with mock.patch('iris.fileformats.netcdf._FAST_TRANSLATION',
+                            False):
+                slow = list(load_cubes(path))
+            self.assertTrue(translated)
+            self.assertTrue(all(translated))
+            self.assertEqual(len(fast), len(slow))
+            key = lambda cube: cube.var_name
+            for fast_cube, slow_cube in zip(sorted(fast, key=key),
+                                            sorted(slow, key=key)):
+                self.assertEqual(fast_cube, slow_cube)
+                self.assertEqual(fast_cube.coord_system(),
+                                 slow_cube.coord_system())
+
+    def _variable(self, dataset, name, dimensions, values, dtype='f8',
+                  **attributes):
+        variable = dataset.createVariable(name, dtype, dimensions)
+        for attribute, value in attributes.items():
+            variable.setncattr(attribute, value)
+        if values is not None:
+            variable[:] = values
+        return variable
+
+    def _grid(self, dataset, y_name='latitude', x_name='longitude',
+              y_units='degrees_north', x_units='degrees_east'):
+        # Add latitude and longitude, or other, dimension coordinates, and
+        # a data variable on them.
+        dataset.createDimension('y', 3)
+        dataset.createDimension('x', 4)
+        self._variable(dataset, 'y', ('y',), [-10, 0, 10],
+                       standard_name=y_name, units=y_units)
+        self._variable(dataset, 'x', ('x',), [0, 90, 180, 270],
+                       standard_name=x_name, units=x_units)
+        return self._variable(dataset, 'air_temperature', ('y', 'x'),
+                              np.arange(12).reshape(3, 4), dtype='f4',
+                              standard_name='air_temperature', units='K')
+
+    def test_latitude_longitude(self):
+        def populate(dataset):
+            data = self._grid(dataset)
+            self._variable(dataset, 'crs', (), None, dtype='i4',
+                           grid_mapping_name='latitude_longitude',
+                           semi_major_axis=6371229.)
+            data.grid_mapping = 'crs'
+        self._check(populate)
+
+    def test_rotated_pole(self):
+        def populate(dataset):
+            data = self._grid(dataset, 'grid_latitude', 'grid_longitude',
+                              'degrees', 'degrees')
+            self._variable(dataset, 'rotated_pole', (), None, dtype='i4',
+                           grid_mapping_name='rotated_latitude_longitude',
+                           grid_north_pole_latitude=37.5,
+                           grid_north_pole_longitude=177.5)
+            data.grid_mapping = 'rotated_pole'
+        self._check(populate)
+
+    def test_no_coordinate_system(self):
+        def populate(dataset):
+            data = self._grid(dataset)
+            data.um_stash_source = 'm01s00i004'
+            data.ukmo__process_flags = 'Time_mean'
+        self._check(populate)
+
+    def test_auxiliary_latitude_longitude(self):
+        def populate(dataset):
+            dataset.createDimension('y', 2)
+            dataset.createDimension('x', 3)
+            values = np.arange(6).reshape(2, 3)
+            self._variable(dataset, 'lat', ('y', 'x'), values,
+                           standard_name='latitude', units='degrees_north')
+            self._variable(dataset, 'lon', ('y', 'x'), values * 10,
+                           standard_name='longitude', units='degrees_east')
+            self._variable(dataset, 'air_temperature', ('y', 'x'), values,
+                           dtype='f4', standard_name='air_temperature',
+                           units='K', coordinates='lat lon')
+        self._check(populate)
+
+    def test_labels(self):
+        def populate(dataset):
+            dataset.createDimension('station', 2)
+            dataset.createDimension('strlen', 5)
+            names = netCDF4.stringtochar(np.array(['alpha', 'beta'],
+                                                  dtype='S5'))
+            self._variable(dataset, 'station_name', ('station', 'strlen'),
+                           names, dtype='S1', long_name='station name')
+            self._variable(dataset, 'air_temperature', ('station',),
+                           [280, 290], dtype='f4',
+                           standard_name='air_temperature', units='K',
+                           coordinates='station_name')
+        self._check(populate)
+
+    def test_formula_terms(self):
+        def populate(dataset):
+            dataset.createDimension('level', 2)
+            dataset.createDimension('y', 3)
+            self._variable(dataset, 'level', ('level',), [1, 2],
+                           standard_name='atmosphere_hybrid_height_'
+                                         'coordinate',
+                           units='m', positive='up',
+                           formula_terms='a: a b: b orog: orog')
+            self._variable(dataset, 'a', ('level',), [10, 20], units='m')
+            self._variable(dataset, 'b', ('level',), [0.9, 0.8], units='1')
+            self._variable(dataset, 'orog', ('y',), [5, 10, 15],
+                           standard_name='surface_altitude', units='m')
+            self._variable(dataset, 'air_temperature', ('level', 'y'),
+                           np.arange(6).reshape(2, 3), dtype='f4',
+                           standard_name='air_temperature', units='K')
+        self._check(populate)
+
+
+if __name__ == '__main__':
+    tests.main()
@@ -0,0 +1,90 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Unit tests for the :class:`iris.fileformats._decode_pool.DecodePool` class.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import threading
+
+from iris.fileformats._decode_pool import DecodePool
+
+
+class Test_imap(tests.IrisTest):
+    def _decode(self, item):
+        self.threads.add(threading.current_thread())
+        return item * 2
+
+    def setUp(self):
+        self.threads = set()
+
+    def test_ordered(self):
+        pool = DecodePool(workers=3)
+        self.addCleanup(pool.close)
+        result = list(pool.imap(self._decode, range(20)))
+        self.assertEqual(result, [i * 2 for i in range(20)])
+        self.assertNotIn(threading.current_thread(), self.threads)
+
+    def test_serial(self):
+        pool = DecodePool(workers=1)
+        result = list(pool.imap(self._decode, range(5)))
+        self.assertEqual(result, [0, 2, 4, 6, 8])
+        self.assertEqual(self.threads, set([threading.current_thread()]))
+        self.assertIsNone(pool._pool)
+
+    def test_bounded_read_ahead(self):
+        consumed = []
+
+        def items():
+            for i in range(10):
+                consumed.append(i)
+                yield i
+
+        pool = DecodePool(workers=2)
+        self.addCleanup(pool.close)
+        results = pool.imap(self._decode, items())
+        self.assertEqual(next(results), 0)
+        self.assertEqual(len(consumed), 4)
+
+    def test_error(self):
+        def decode(item):
+            raise ValueError('bad item')
+
+        pool = DecodePool(workers=2)
+        self.addCleanup(pool.close)
+        with self.assertRaisesRegexp(ValueError, 'bad item'):
+            list(pool.imap(decode, range(3)))
+
+    def test_workers_change(self):
+        pool = DecodePool(workers=2)
+        self.addCleanup(pool.close)
+        list(pool.imap(self._decode, range(3)))
+        thread_pool = pool._pool
+        pool.workers = 3
+        list(pool.imap(self._decode, range(3)))
+        self.assertIsNot(pool._pool, thread_pool)
+
+
+if __name__ == '__main__':
+    tests.main()
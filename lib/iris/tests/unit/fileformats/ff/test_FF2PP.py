@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2013 - 2016, Met Office
+# (C) British Crown Copyright 2013 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -207,6 +207,38 @@ class Test__extract_field__LBC_format(tests.IrisTest):
                         'Northwards bdy warning not correctly raised.')
 
 
+class Test__extract_field__pp_filter(tests.IrisTest):
+    def test_skipped_headers(self):
+        # Check that fields rejected by their headers are never made.
+        pp_filter = mock.Mock(keeps_header=mock.Mock(
+            side_effect=[False, True, False]))
+        with mock.patch('iris.fileformats._ff.FFHeader'):
+            ff2pp = ff.FF2PP('mock', _pp_filter=pp_filter)
+        ff2pp._ff_header.lookup_table = [0, 0, 3]
+        ff2pp._ff_header.dataset_type = 3
+        grid = mock.Mock()
+        grid.vectors = mock.Mock(return_value=(np.arange(2), np.arange(2)))
+        ff2pp._ff_header.grid = mock.Mock(return_value=grid)
+        field = mock.Mock(lbuser=[None, None, None, 4, None, None, 1],
+                          bzx=0, bzy=0, lbegin=0)
+
+        if six.PY3:
+            open_func = 'builtins.open'
+        else:
+            open_func = '__builtin__.open'
+        with mock.patch('numpy.fromfile', return_value=[0]), \
+                mock.patch(open_func), \
+                mock.patch('iris.fileformats.pp.make_pp_field',
+                           return_value=field) as make_pp_field, \
+                mock.patch('iris.fileformats._ff.FF2PP._payload',
+                           return_value=(0, 0)):
+            result = list(ff2pp._extract_field())
+
+        self.assertEqual(result, [field])
+        self.assertEqual(pp_filter.keeps_header.call_count, 3)
+        self.assertEqual(make_pp_field.call_count, 1)
+
+
 class Test__payload(tests.IrisTest):
     def setUp(self):
         # Create a mock LBC type PPField.
@@ -0,0 +1,179 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for the :class:`iris.fileformats._file_pool.FilePool` class."""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import os
+import shutil
+import tempfile
+import threading
+
+from iris.fileformats._file_pool import FilePool
+from iris.tests import mock
+
+
+class Test(tests.IrisTest):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir, '{}.dat'.format(i))
+            with open(path, 'wb') as fh:
+                fh.write('file{}'.format(i).encode())
+            self.paths.append(path)
+        self.pool = FilePool(max_open=2)
+        self.addCleanup(self.pool.clear)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self, path):
+        with self.pool.open(path) as fh:
+            fh.seek(0)
+            return fh, fh.read()
+
+    def test_read(self):
+        _, data = self._read(self.paths[1])
+        self.assertEqual(data, b'file1')
+
+    def test_reuse(self):
+        fh1, _ = self._read(self.paths[0])
+        fh2, _ = self._read(self.paths[0])
+        self.assertIs(fh1, fh2)
+        self.assertFalse(fh1.closed)
+        self.assertEqual((self.pool.hits, self.pool.opens), (1, 1))
+
+    def test_concurrent_use(self):
+        with self.pool.open(self.paths[0]) as fh1:
+            with self.pool.open(self.paths[0]) as fh2:
+                self.assertIsNot(fh1, fh2)
+        self.assertEqual((self.pool.hits, self.pool.opens), (0, 2))
+        self.assertEqual(self.pool._n_idle, 2)
+
+    def test_least_recently_used_closed(self):
+        handles = [self._read(path)[0] for path in self.paths]
+        self.assertEqual([fh.closed for fh in handles], [True, False, False])
+        self._read(self.paths[1])
+        self._read(self.paths[0])
+        self.assertEqual([fh.closed for fh in handles], [True, False, True])
+        self.assertEqual((self.pool.hits, self.pool.opens), (1, 4))
+
+    def test_disabled(self):
+        self.pool.max_open = 0
+        fh, _ = self._read(self.paths[0])
+        self.assertTrue(fh.closed)
+        self._read(self.paths[0])
+        self.assertEqual((self.pool.hits, self.pool.opens), (0, 2))
+
+    def test_modified_file(self):
+        fh1, _ = self._read(self.paths[0])
+        with open(self.paths[0], 'ab') as fh:
+            fh.write(b'more')
+        fh2, data = self._read(self.paths[0])
+        self.assertIsNot(fh1, fh2)
+        self.assertTrue(fh1.closed)
+        self.assertEqual(data, b'file0more')
+
+    def test_error_closes(self):
+        with self.assertRaises(ValueError):
+            with self.pool.open(self.paths[0]) as fh:
+                raise ValueError()
+        self.assertTrue(fh.closed)
+        self.assertEqual(self.pool._n_idle, 0)
+
+    def test_checkout(self):
+        fh1 = self.pool.checkout(self.paths[0])
+        self.assertEqual(self._read(self.paths[0])[1], b'file0')
+        self.pool.checkin(fh1)
+        fh2 = self.pool.checkout(self.paths[0])
+        self.assertIs(fh2, fh1)
+        self.pool.checkin(fh2)
+        self.assertFalse(fh1.closed)
+        self.assertEqual((self.pool.hits, self.pool.opens), (1, 2))
+
+    def test_checkin_close(self):
+        fh = self.pool.checkout(self.paths[0])
+        self.pool.checkin(fh, close=True)
+        self.assertTrue(fh.closed)
+        self.assertEqual(self.pool._n_idle, 0)
+
+    def test_opener(self):
+        opener = mock.Mock()
+        with self.pool.open(self.paths[0], opener=opener) as handle:
+            pass
+        opener.assert_called_once_with(self.paths[0])
+        self.assertIs(handle, opener.return_value)
+        with self.pool.open(self.paths[0], opener=opener) as handle:
+            pass
+        self.assertEqual(opener.call_count, 1)
+
+    def test_forked(self):
+        fh1, _ = self._read(self.paths[0])
+        with mock.patch('os.getpid', return_value=-1):
+            fh2, _ = self._read(self.paths[0])
+        self.assertIsNot(fh1, fh2)
+        # The parent's handle is forgotten, but not closed.
+        self.assertFalse(fh1.closed)
+        fh1.close()
+
+    def test_discard(self):
+        fh1, _ = self._read(self.paths[0])
+        fh2, _ = self._read(self.paths[1])
+        self.pool.discard(self.paths[0])
+        self.assertTrue(fh1.closed)
+        self.assertFalse(fh2.closed)
+        self.assertEqual(self.pool._n_idle, 1)
+
+    def test_clear(self):
+        handles = [self._read(path)[0] for path in self.paths[:2]]
+        self.pool.clear()
+        self.assertTrue(all(fh.closed for fh in handles))
+
+    def test_reset_counters(self):
+        self._read(self.paths[0])
+        self._read(self.paths[0])
+        self.pool.reset_counters()
+        self.assertEqual((self.pool.hits, self.pool.opens), (0, 0))
+
+    def test_threads(self):
+        results = []
+
+        def read_all():
+            for _ in range(50):
+                for i, path in enumerate(self.paths):
+                    result = self._read(path)[1]
+                    results.append(result == 'file{}'.format(i).encode())
+
+        threads = [threading.Thread(target=read_all) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 600)
+        self.assertTrue(all(results))
+        self.assertEqual(self.pool.hits + self.pool.opens, 600)
+        self.assertLessEqual(self.pool._n_idle, 2)
+
+
+if __name__ == "__main__":
+    tests.main()
@@ -0,0 +1,81 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for the `iris.fileformats.netcdf.NetCDFDataProxy` class."""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import netCDF4
+import numpy as np
+
+from iris.fileformats._file_pool import FilePool
+from iris.fileformats.cf import CFReader
+from iris.fileformats.netcdf import NetCDFDataProxy
+from iris.tests import mock
+
+
+class Test__getitem__(tests.IrisTest):
+    def setUp(self):
+        self.data = np.arange(12, dtype='f4').reshape(3, 4)
+        self.pool = FilePool()
+        self.addCleanup(self.pool.clear)
+        for name in ('iris.fileformats.cf.FILE_POOL',
+                     'iris.fileformats.netcdf.FILE_POOL'):
+            patch = mock.patch(name, self.pool)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _write(self, path):
+        dataset = netCDF4.Dataset(path, mode='w')
+        dataset.createDimension('time', 3)
+        dataset.createDimension('x', 4)
+        variable = dataset.createVariable('air_temperature', 'f4',
+                                          ('time', 'x'))
+        variable[:] = self.data
+        dataset.close()
+
+    def _proxy(self, path):
+        return NetCDFDataProxy(self.data.shape, self.data.dtype, path,
+                               'air_temperature', None)
+
+    def test_slices(self):
+        with self.temp_filename('.nc') as path:
+            self._write(path)
+            proxy = self._proxy(path)
+            results = [proxy[i] for i in range(3)]
+            self.pool.clear()
+        for i, result in enumerate(results):
+            self.assertArrayEqual(result, self.data[i])
+        self.assertEqual((self.pool.hits, self.pool.opens), (2, 1))
+
+    def test_reuse_reader_dataset(self):
+        with self.temp_filename('.nc') as path:
+            self._write(path)
+            reader = CFReader(path)
+            del reader
+            result = self._proxy(path)[1:, 2]
+            self.pool.clear()
+        self.assertArrayEqual(result, self.data[1:, 2])
+        self.assertEqual((self.pool.hits, self.pool.opens), (1, 1))
+
+
+if __name__ == '__main__':
+    tests.main()
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2014 - 2016, Met Office
+# (C) British Crown Copyright 2014 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -38,6 +38,11 @@ class TestFillValue(tests.IrisTest):
         patch = mock.patch(name)
         patch.start()
         self.addCleanup(patch.stop)
+        # Exercise the rule base, rather than the direct translation.
+        patch = mock.patch('iris.fileformats.netcdf._FAST_TRANSLATION',
+                           False)
+        patch.start()
+        self.addCleanup(patch.stop)
 
         self.engine = mock.Mock()
         self.cf = None
@@ -118,6 +123,10 @@ class TestCoordAttributes(tests.IrisTest):
         patch = mock.patch(this, side_effect=self._patcher)
         patch.start()
         self.addCleanup(patch.stop)
+        patch = mock.patch('iris.fileformats.netcdf._FAST_TRANSLATION',
+                           False)
+        patch.start()
+        self.addCleanup(patch.stop)
         self.engine = mock.Mock()
         self.filename = 'DUMMY'
         self.flag_masks = mock.sentinel.flag_masks
@@ -190,6 +199,10 @@ class TestCubeAttributes(tests.IrisTest):
         patch = mock.patch(this)
         patch.start()
         self.addCleanup(patch.stop)
+        patch = mock.patch('iris.fileformats.netcdf._FAST_TRANSLATION',
+                           False)
+        patch.start()
+        self.addCleanup(patch.stop)
         self.engine = mock.Mock()
         self.cf = None
         self.filename = 'DUMMY'
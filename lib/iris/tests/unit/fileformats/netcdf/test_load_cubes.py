@@ -0,0 +1,90 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for the `iris.fileformats.netcdf.load_cubes` function."""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import iris
+from iris.fileformats.netcdf import load_cubes
+from iris.tests import mock
+
+
+class Test_constraints(tests.IrisTest):
+    def setUp(self):
+        # Two data variables, one with a standard name and one without.
+        self.air_temp = mock.Mock(spec=['cf_name', 'standard_name'],
+                                  cf_name='ta',
+                                  standard_name='air_temperature')
+        self.precip = mock.Mock(spec=['cf_name', 'long_name'],
+                                cf_name='pr', long_name='precipitation')
+        cf = mock.Mock()
+        cf.cf_group.data_variables = {'ta': self.air_temp,
+                                      'pr': self.precip}
+        cf.cf_group.promoted = {}
+        patches = [
+            mock.patch('iris.fileformats.netcdf._pyke_kb_engine'),
+            mock.patch('iris.fileformats.cf.CFReader', return_value=cf),
+            mock.patch('iris.fileformats.netcdf._load_aux_factory'),
+            mock.patch('iris.fileformats.netcdf._load_cube',
+                       side_effect=lambda engine, cf, cf_var, filename:
+                       cf_var.cf_name)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _load(self, constraints, callback=None):
+        return sorted(load_cubes('DUMMY', callback, constraints))
+
+    def test_no_constraints(self):
+        self.assertEqual(self._load(None), ['pr', 'ta'])
+
+    def test_standard_name(self):
+        self.assertEqual(self._load('air_temperature'), ['ta'])
+
+    def test_long_name(self):
+        self.assertEqual(self._load(iris.Constraint('precipitation')),
+                         ['pr'])
+
+    def test_var_name(self):
+        self.assertEqual(self._load(['ta', 'unknown']), ['ta'])
+
+    def test_name_set(self):
+        constraint = iris.Constraint(
+            name=iris.OneOf('air_temperature', 'precipitation'))
+        self.assertEqual(self._load(constraint), ['pr', 'ta'])
+
+    def test_opaque(self):
+        constraint = iris.Constraint(cube_func=lambda cube: False)
+        self.assertEqual(self._load(constraint), ['pr', 'ta'])
+
+    def test_callback(self):
+        # The callback may rename the cubes, so nothing is pruned.
+        def callback(cube, field, filename):
+            pass
+        with mock.patch('iris.io.run_callback',
+                        side_effect=lambda callback, cube, *args: cube):
+            result = self._load('air_temperature', callback)
+        self.assertEqual(result, ['pr', 'ta'])
+
+
+if __name__ == '__main__':
+    tests.main()
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2014 - 2015, Met Office
+# (C) British Crown Copyright 2014 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -23,6 +23,15 @@ from six.moves import (filter, input, map, range, zip)  # noqa
 # importing anything else.
 import iris.tests as tests
 
+from contextlib import contextmanager
+import os
+
+import numpy as np
+import numpy.ma as ma
+
+import iris.util
+from iris.fileformats._decode_pool import DecodePool
+from iris.fileformats._file_pool import FilePool
 from iris.fileformats.pp import PPDataProxy, SplittableInt
 from iris.tests import mock
 
@@ -48,5 +57,199 @@ class Test_lbpack(tests.IrisTest):
         self.assertEqual(proxy.lbpack.n4, lbpack // 1000 % 10)
 
 
+class Test__getitem__(tests.IrisTest):
+    def test_pooled_reads(self):
+        def decode(data_bytes, *args):
+            return np.frombuffer(data_bytes, dtype='u1')
+
+        pool = FilePool()
+        decode_patch = mock.patch(
+            'iris.fileformats.pp._data_bytes_to_shaped_array',
+            side_effect=decode)
+        with self.temp_filename('.pp') as path:
+            with open(path, 'wb') as fh:
+                fh.write(b'\x00\x01\x02\x03')
+            proxies = [PPDataProxy((2,), None, path, offset, 2,
+                                   1, None, None, None)
+                       for offset in (0, 2)]
+            with mock.patch('iris.fileformats.pp.FILE_POOL', pool), \
+                    decode_patch:
+                results = [proxy[...] for proxy in proxies]
+            pool.clear()
+        self.assertArrayEqual(results[0], [0, 1])
+        self.assertArrayEqual(results[1], [2, 3])
+        self.assertEqual((pool.hits, pool.opens), (1, 1))
+
+
+class Test__getitem__region(tests.IrisTest):
+    def setUp(self):
+        self.data = np.arange(20, dtype='>f4').reshape(4, 5)
+        self.data[2, 3] = -999.
+        self.offset = 8
+        self.reads = []
+        path = iris.util.create_temp_filename('.pp')
+        with open(path, 'wb') as fh:
+            fh.write(b'\x00' * self.offset)
+            fh.write(self.data.tobytes())
+        self.path = path
+        self.addCleanup(os.remove, path)
+
+    def _open(self, path):
+        # Provide a file handle which records the size of each read.
+        handle = open(path, 'rb')
+        self.addCleanup(handle.close)
+        reads = self.reads
+        read = handle.read
+
+        class RecordingFile(object):
+            def seek(self, *args):
+                return handle.seek(*args)
+
+            def read(self, size):
+                reads.append(size)
+                return read(size)
+
+        @contextmanager
+        def opened():
+            yield RecordingFile()
+
+        return opened()
+
+    def _check(self, keys, lbpack=0):
+        proxy = PPDataProxy(self.data.shape, self.data.dtype, self.path,
+                            self.offset, self.data.nbytes, lbpack, None,
+                            -999., None)
+        with mock.patch('iris.fileformats.pp.FILE_POOL.open',
+                        side_effect=self._open):
+            result = proxy[keys]
+        expected = ma.masked_values(self.data, -999.)[keys]
+        self.assertMaskedArrayEqual(ma.asarray(result), ma.asarray(expected))
+        return sum(self.reads)
+
+    def test_rows(self):
+        self.assertEqual(self._check((slice(1, 3), slice(None))), 40)
+
+    def test_sub_area(self):
+        # Two rows of three columns, read in one operation.
+        self.assertEqual(self._check((slice(1, 3), slice(1, 4))), 32)
+
+    def test_column(self):
+        # A single column is read row by row.
+        self.assertEqual(self._check((slice(None), 2)), 16)
+        self.assertEqual(len(self.reads), 4)
+
+    def test_point(self):
+        self.assertEqual(self._check((0, 1)), 4)
+
+    def test_masked_point(self):
+        self.assertEqual(self._check((2, 3)), 4)
+
+    def test_stepped_and_negative(self):
+        # Only the two requested rows are read.
+        self.assertEqual(self._check((slice(None, None, -2), -1)), 8)
+
+    def test_index_array(self):
+        self._check((np.array([3, 0]), slice(1, 3)))
+
+    def test_whole_field(self):
+        self.assertEqual(self._check(Ellipsis), self.data.nbytes)
+
+    def test_packed(self):
+        decode_patch = mock.patch(
+            'iris.fileformats.pp._data_bytes_to_shaped_array',
+            return_value=ma.masked_values(self.data, -999.))
+        with decode_patch:
+            self.assertEqual(self._check((0, 1), lbpack=1),
+                             self.data.nbytes)
+
+
+class Test__batch_read(tests.IrisTest):
+    def _results(self, proxies, pool):
+        def decode(data_bytes, *args):
+            return np.frombuffer(data_bytes, dtype='u1')
+
+        decode_patch = mock.patch(
+            'iris.fileformats.pp._data_bytes_to_shaped_array',
+            side_effect=decode)
+        with mock.patch('iris.fileformats.pp.FILE_POOL', pool), \
+                decode_patch:
+            return list(PPDataProxy._batch_read(proxies))
+
+    def test_coalesced(self):
+        pool = FilePool()
+        with self.temp_filename('.pp') as path:
+            with open(path, 'wb') as fh:
+                fh.write(b'\x00\x01\x02\x03\x04\x05\x06\x07')
+            # Out of file order, with a small gap between payloads.
+            proxies = [PPDataProxy((2,), None, path, offset, 2,
+                                   1, None, None, None)
+                       for offset in (5, 0, 2)]
+            results = self._results(proxies, pool)
+            pool.clear()
+        self.assertEqual((pool.hits, pool.opens), (0, 1))
+        self.assertEqual([i for i, _ in results], [1, 2, 0])
+        data = dict(results)
+        self.assertArrayEqual(data[0], [5, 6])
+        self.assertArrayEqual(data[1], [0, 1])
+        self.assertArrayEqual(data[2], [2, 3])
+
+    def test_separate_files(self):
+        pool = FilePool()
+        with self.temp_filename('.pp') as path_a, \
+                self.temp_filename('.pp') as path_b:
+            for path, content in ((path_a, b'\x00\x01'),
+                                  (path_b, b'\x02\x03')):
+                with open(path, 'wb') as fh:
+                    fh.write(content)
+            proxies = [PPDataProxy((2,), None, path, 0, 2,
+                                   1, None, None, None)
+                       for path in sorted([path_b, path_a])]
+            results = dict(self._results(proxies, pool))
+            pool.clear()
+        self.assertEqual(len(results), 2)
+        self.assertEqual(pool.opens, 2)
+
+    def test_large_gap(self):
+        pool = FilePool()
+        with self.temp_filename('.pp') as path:
+            with open(path, 'wb') as fh:
+                fh.write(b'\x00\x01\x02\x03')
+            proxies = [PPDataProxy((2,), None, path, offset, 2,
+                                   1, None, None, None)
+                       for offset in (0, 2)]
+            with mock.patch('iris.fileformats.pp._BATCH_READ_MAX_GAP', -1):
+                results = dict(self._results(proxies, pool))
+            pool.clear()
+        self.assertArrayEqual(results[0], [0, 1])
+        self.assertArrayEqual(results[1], [2, 3])
+        self.assertEqual((pool.hits, pool.opens), (1, 1))
+
+    def _decode_pool_calls(self, lbpack):
+        pool = FilePool()
+        with self.temp_filename('.pp') as path:
+            with open(path, 'wb') as fh:
+                fh.write(b'\x00\x01\x02\x03')
+            proxies = [PPDataProxy((2,), None, path, offset, 2,
+                                   lbpack, None, None, None)
+                       for offset in (0, 2)]
+            decode_pool = DecodePool(workers=2)
+            self.addCleanup(decode_pool.close)
+            imap_patch = mock.patch.object(decode_pool, 'imap',
+                                           wraps=decode_pool.imap)
+            with mock.patch('iris.fileformats.pp.DECODE_POOL',
+                            decode_pool), imap_patch as imap:
+                results = dict(self._results(proxies, pool))
+            pool.clear()
+        self.assertArrayEqual(results[0], [0, 1])
+        self.assertArrayEqual(results[1], [2, 3])
+        return imap.call_count
+
+    def test_packed_decoded_in_pool(self):
+        self.assertEqual(self._decode_pool_calls(1), 1)
+
+    def test_unpacked_decoded_serially(self):
+        self.assertEqual(self._decode_pool_calls(0), 0)
+
+
 if __name__ == '__main__':
     tests.main()
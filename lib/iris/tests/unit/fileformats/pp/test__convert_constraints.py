@@ -23,6 +23,8 @@ from six.moves import (filter, input, map, range, zip)  # noqa
 # importing anything else.
 import iris.tests as tests
 
+import numpy as np
+
 import iris
 from iris.fileformats.pp import _convert_constraints
 from iris.fileformats.pp import STASH
@@ -99,5 +101,47 @@ class Test_convert_constraints(tests.IrisTest):
         self.assertIsNone(pp_filter)
 
 
+class Test_header_filtering(tests.IrisTest):
+    def setUp(self):
+        constraints = [iris.AttributeConstraint(STASH='m01s03i236'),
+                       iris.AttributeConstraint(STASH='m02s00i004')]
+        self.pp_filter = _convert_constraints(constraints)
+
+    def _longs(self, model, code):
+        longs = np.zeros(45, dtype='>i4')
+        longs[44] = model
+        longs[41] = code
+        return longs
+
+    def test_keeps_header(self):
+        self.assertTrue(self.pp_filter.keeps_header(self._longs(1, 3236)))
+        self.assertTrue(self.pp_filter.keeps_header(self._longs(2, 4)))
+        self.assertFalse(self.pp_filter.keeps_header(self._longs(1, 4)))
+
+    def test_keeps_header_allowed(self):
+        self.assertTrue(self.pp_filter.keeps_header(self._longs(1, 33)))
+        self.assertTrue(self.pp_filter.keeps_header(self._longs(1, 1)))
+
+    def test_keeps_header_land_mask(self):
+        self.assertTrue(self.pp_filter.keeps_header(self._longs(1, 30)))
+
+    def test_header_mask(self):
+        codes = [(1, 3236), (1, 4), (2, 4), (1, 30), (1, 3236), (1, 7)]
+        longs = np.array([self._longs(model, code)
+                          for model, code in codes])
+        self.assertArrayEqual(self.pp_filter.header_mask(longs),
+                              [True, False, True, True, True, False])
+
+    def test_header_mask_calls_once_per_stash(self):
+        stash_func = mock.Mock(return_value=False)
+        pp_filter = _convert_constraints(
+            iris.AttributeConstraint(STASH=stash_func))
+        longs = np.array([self._longs(1, 4), self._longs(1, 7),
+                          self._longs(1, 4)])
+        pp_filter.header_mask(longs)
+        self.assertEqual(sorted(stash_func.call_args_list),
+                         [mock.call('m01s00i004'), mock.call('m01s00i007')])
+
+
 if __name__ == "__main__":
     tests.main()
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2013 - 2016, Met Office
+# (C) British Crown Copyright 2013 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -24,89 +24,109 @@ import six
 # importing anything else.
 import iris.tests as tests
 
-import contextlib
-import io
+import struct
 import warnings
 
 import numpy as np
 
+import iris
 import iris.fileformats.pp as pp
 from iris.tests import mock
 
 
+def _field_bytes(lbrel=3, lblrec=None, lbext=0, lbuser1=1, lbuser4=0,
+                 lbuser7=1, data=b'\0' * 8, extra=b'', little_ended=False):
+    # Encode a single PP field record, with the given header values.
+    endian = '<' if little_ended else '>'
+    payload = data + extra
+    if lblrec is None:
+        lblrec = len(payload) // pp.PP_WORD_DEPTH
+    longs = np.zeros(pp.NUM_LONG_HEADERS, dtype='{}i4'.format(endian))
+    longs[14] = lblrec
+    longs[19] = lbext
+    longs[21] = lbrel
+    longs[38] = lbuser1
+    longs[41] = lbuser4
+    longs[44] = lbuser7
+    floats = np.zeros(pp.NUM_FLOAT_HEADERS, dtype='{}f4'.format(endian))
+    floats[17] = -1e30
+    header = longs.tobytes() + floats.tobytes()
+    word = '{}L'.format(endian)
+    return (struct.pack(word, len(header)) + header +
+            struct.pack(word, len(header)) +
+            struct.pack(word, len(payload)) + payload +
+            struct.pack(word, len(payload)))
+
+
 class Test(tests.IrisTest):
-    @contextlib.contextmanager
-    def mock_for_field_gen(self, fields):
-        side_effect_fields = list(fields)[:]
-
-        def make_pp_field_override(*args):
-            # Iterates over the fields passed to this context manager,
-            # until there are no more, upon which the np.fromfile
-            # returns an empty list and the while loop in load() is
-            # broken.
-            result = side_effect_fields.pop(0)
-            if not side_effect_fields:
-                np.fromfile.return_value = []
-            return result
-
-        if six.PY3:
-            open_func = 'builtins.open'
-        else:
-            open_func = '__builtin__.open'
-        with mock.patch('numpy.fromfile', return_value=[0]), \
-                mock.patch(open_func), \
-                mock.patch('struct.unpack_from', return_value=[4]), \
-                mock.patch('iris.fileformats.pp.make_pp_field',
-                           side_effect=make_pp_field_override):
-            yield
-
-    def gen_fields(self, fields):
-        with self.mock_for_field_gen(fields):
-            return list(pp._field_gen('mocked', 'mocked'))
+    def gen_fields(self, file_bytes, read_data_bytes=False,
+                   little_ended=False, pp_filter=None):
+        with self.temp_filename('.pp') as temp_path:
+            with open(temp_path, 'wb') as fh:
+                fh.write(file_bytes)
+            return list(pp._field_gen(temp_path, read_data_bytes,
+                                      little_ended=little_ended,
+                                      pp_filter=pp_filter)), temp_path
 
     def test_lblrec_invalid(self):
-        pp_field = mock.Mock(lblrec=2,
-                             lbext=0)
+        file_bytes = _field_bytes() + _field_bytes(lblrec=1)
         with warnings.catch_warnings(record=True) as warn:
             warnings.simplefilter('always')
-            self.gen_fields([pp_field])
+            fields, _ = self.gen_fields(file_bytes)
+        self.assertEqual(len(fields), 1)
         self.assertEqual(len(warn), 1)
         wmsg = ('LBLREC has a different value to the .* the header in the '
-                'file \(8 and 4\)\. Skipping .*')
+                'file \(4 and 8\)\. Skipping .*')
         six.assertRegex(self, str(warn[0].message), wmsg)
 
-    def test_read_headers_call(self):
-        # Checks that the two calls to np.fromfile are called in the
-        # expected way.
-        pp_field = mock.Mock(lblrec=1,
-                             lbext=0,
-                             lbuser=[0])
-        with self.mock_for_field_gen([pp_field]):
-            open_fh = mock.MagicMock(spec=io.RawIOBase)
-            open.return_value = open_fh
-            next(pp._field_gen('mocked', read_data_bytes=False))
-            with open_fh as open_fh_ctx:
-                calls = [mock.call(open_fh_ctx, count=45, dtype='>i4'),
-                         mock.call(open_fh_ctx, count=19, dtype='>f4')]
-            np.fromfile.assert_has_calls(calls)
-        with open_fh as open_fh_ctx:
-            expected_deferred_bytes = ('mocked', open_fh_ctx.tell(),
-                                       4, np.dtype('>f4'))
-        self.assertEqual(pp_field._data, expected_deferred_bytes)
+    def test_deferred_bytes(self):
+        # Checks that a reference to the data payload is provided if
+        # read_data_bytes is False.
+        file_bytes = _field_bytes() + _field_bytes(data=b'\1' * 12)
+        fields, temp_path = self.gen_fields(file_bytes)
+        self.assertEqual(len(fields), 2)
+        self.assertEqual(fields[0]._data,
+                         (temp_path, 268, 8, np.dtype('>f4')))
+        self.assertEqual(fields[1]._data,
+                         (temp_path, 268 * 2 + 8 + 4, 12, np.dtype('>f4')))
 
     def test_read_data_call(self):
-        # Checks that data is read if read_data is True.
-        pp_field = mock.Mock(lblrec=1,
-                             lbext=0,
-                             lbuser=[0])
-        with self.mock_for_field_gen([pp_field]):
-            open_fh = mock.MagicMock(spec=io.RawIOBase)
-            open.return_value = open_fh
-            next(pp._field_gen('mocked', read_data_bytes=True))
-        with open_fh as open_fh_ctx:
-            expected_loaded_bytes = pp.LoadedArrayBytes(open_fh_ctx.read(),
-                                                        np.dtype('>f4'))
-        self.assertEqual(pp_field._data, expected_loaded_bytes)
+        # Checks that data is read if read_data_bytes is True.
+        file_bytes = _field_bytes(lbuser1=2, data=b'\1\2\3\4')
+        fields, _ = self.gen_fields(file_bytes, read_data_bytes=True)
+        expected_loaded_bytes = pp.LoadedArrayBytes(b'\1\2\3\4',
+                                                    np.dtype('>i4'))
+        self.assertEqual(fields[0]._data, expected_loaded_bytes)
+
+    def test_little_ended(self):
+        file_bytes = _field_bytes(little_ended=True)
+        fields, _ = self.gen_fields(file_bytes, read_data_bytes=True,
+                                    little_ended=True)
+        self.assertEqual(fields[0].lbrel, 3)
+        self.assertEqual(fields[0]._data.dtype, np.dtype('<f4'))
+
+    def test_extra_data(self):
+        # Checks that a field title in the extra data is read, and excluded
+        # from the data payload.
+        title = b'a title'.ljust(8, b'\0')
+        extra = struct.pack('>L', 2010) + title
+        file_bytes = _field_bytes(lbext=3, extra=extra) + _field_bytes()
+        fields, temp_path = self.gen_fields(file_bytes)
+        self.assertEqual(len(fields), 2)
+        self.assertEqual(fields[0].field_title, 'a title')
+        self.assertEqual(fields[0]._data[1:3], (268, 8))
+
+    def test_error_after_mapping(self):
+        # The original error is raised, rather than an error from closing
+        # the memory map while a view of it remains.
+        with mock.patch('numpy.lib.stride_tricks.as_strided',
+                        side_effect=ValueError('Sliding window')):
+            with self.assertRaisesRegexp(ValueError, 'Sliding window'):
+                self.gen_fields(_field_bytes())
+
+    def test_empty_file(self):
+        fields, _ = self.gen_fields(b'')
+        self.assertEqual(fields, [])
 
     def test_invalid_header_release(self):
         # Check that an unknown LBREL value just results in a warning
@@ -120,6 +140,33 @@ class Test(tests.IrisTest):
             self.assertEqual(warn.call_count, 1)
             self.assertIn('header release number', warn.call_args[0][0])
 
+    def test_invalid_header_release_after_valid(self):
+        file_bytes = _field_bytes() + _field_bytes(lbrel=0) + _field_bytes()
+        with mock.patch('warnings.warn') as warn:
+            fields, _ = self.gen_fields(file_bytes)
+        self.assertEqual(len(fields), 1)
+        self.assertEqual(warn.call_count, 1)
+        self.assertIn('Unable to interpret field 1', warn.call_args[0][0])
+
+    def test_pp_filter(self):
+        file_bytes = (_field_bytes(lbuser4=3236) +
+                      _field_bytes(lbuser4=4, data=b'\1' * 8) +
+                      _field_bytes(lbuser4=3236, data=b'\2' * 8))
+        pp_filter = pp._convert_constraints(
+            iris.AttributeConstraint(STASH='m01s03i236'))
+        fields, _ = self.gen_fields(file_bytes, read_data_bytes=True,
+                                    pp_filter=pp_filter)
+        self.assertEqual([field.lbuser[3] for field in fields], [3236, 3236])
+        self.assertEqual([field._data.bytes for field in fields],
+                         [b'\0' * 8, b'\2' * 8])
+
+    def test_pp_filter_keeps_land_mask(self):
+        file_bytes = _field_bytes(lbuser4=30) + _field_bytes(lbuser4=4)
+        pp_filter = pp._convert_constraints(
+            iris.AttributeConstraint(STASH='m01s03i236'))
+        fields, _ = self.gen_fields(file_bytes, pp_filter=pp_filter)
+        self.assertEqual([field.lbuser[3] for field in fields], [30])
+
 
 if __name__ == "__main__":
     tests.main()
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2013 - 2016, Met Office
+# (C) British Crown Copyright 2013 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -42,7 +42,7 @@ class Test_load(tests.IrisTest):
 
         interpret.assert_called_once_with(extract_result)
         field_gen.assert_called_once_with('mock', read_data_bytes=True,
-                                          little_ended=False)
+                                          little_ended=False, pp_filter=None)
 
 
 if __name__ == "__main__":
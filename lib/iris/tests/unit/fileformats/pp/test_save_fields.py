@@ -26,6 +26,7 @@ import iris.tests as tests
 
 import numpy as np
 
+from iris.fileformats._decode_pool import DecodePool
 import iris.fileformats.pp as pp
 from iris.tests import mock
 
@@ -66,5 +67,43 @@ class TestSaveFields(tests.IrisTest):
         self.assertTrue(mock.call().write('saved') in m.mock_calls)
 
 
+class TestSaveFieldsPacked(tests.IrisTest):
+    def _field(self, lbpack, content):
+        pp_field = mock.MagicMock(spec=pp.PPField3)
+        pp_field.lbpack = lbpack
+        pp_field._encoded.return_value = [content[:1], content[1:]]
+        pp_field.save = lambda fh: fh.write(content)
+        return pp_field
+
+    def test_order(self):
+        fields = [self._field(1, b'p1'), self._field(0, b'u1'),
+                  self._field(1, b'p2'), self._field(1, b'p3')]
+        target = six.BytesIO()
+        decode_pool = DecodePool(workers=2)
+        self.addCleanup(decode_pool.close)
+        with mock.patch('iris.fileformats.pp.DECODE_POOL', decode_pool):
+            pp.save_fields(iter(fields), target)
+        self.assertEqual(target.getvalue(), b'p1u1p2p3')
+        self.assertEqual([field._encoded.call_count for field in fields],
+                         [1, 0, 1, 1])
+
+    def test_streamed(self):
+        # Each field is written before the whole input is consumed.
+        target = six.BytesIO()
+        written = []
+
+        def fields():
+            for i in range(6):
+                written.append(len(target.getvalue()))
+                yield self._field(0, b'u')
+
+        decode_pool = DecodePool(workers=2)
+        self.addCleanup(decode_pool.close)
+        with mock.patch('iris.fileformats.pp.DECODE_POOL', decode_pool):
+            pp.save_fields(fields(), target)
+        self.assertEqual(target.getvalue(), b'u' * 6)
+        self.assertNotEqual(written[-1], 0)
+
+
 if __name__ == "__main__":
     tests.main()
@@ -0,0 +1,87 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Unit tests for the `iris.fileformats.pp_rules._CachingConverter` class.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+from iris.fileformats.pp import NUM_LONG_HEADERS, PPField3
+from iris.fileformats.pp_rules import _CachingConverter, convert
+
+
+def _field(**header_words):
+    # Make a PPField3 of a regular global grid, at a pressure level.
+    words = dict(lbyr=2017, lbmon=1, lbdat=1, lbyrd=2017, lbmond=1,
+                 lbdatd=1, lbhrd=6, lbtim=11, lbft=6, lbcode=1, lbhem=0,
+                 lbrow=3, lbnpt=4, lbrel=3, lbvc=8, lblev=8888, bplat=90.,
+                 blev=850., bzy=-120., bdy=60., bzx=-90., bdx=90.,
+                 bmdi=-1e30, bmks=1.)
+    words.update(header_words)
+    header = [0] * NUM_LONG_HEADERS + [0.] * (64 - NUM_LONG_HEADERS)
+    for name, positions in PPField3.HEADER_DEFN:
+        if name in words:
+            header[positions[0]] = words[name]
+    # STASH m01s16i203 (air_temperature on pressure levels).
+    header[PPField3.HEADER_DICT['lbuser'][3]] = 16203
+    header[PPField3.HEADER_DICT['lbuser'][6]] = 1
+    return PPField3(tuple(header))
+
+
+class Test(tests.IrisTest):
+    def setUp(self):
+        self.fields = [_field(lbhrd=hour, lbft=hour, blev=level)
+                       for hour in (6, 12) for level in (850., 500.)]
+        self.converter = _CachingConverter()
+
+    def test_same_as_convert(self):
+        for field in self.fields:
+            self.assertEqual(self.converter(field), convert(field))
+
+    def test_cached(self):
+        for field in self.fields:
+            self.converter(field)
+        # Each of the five translations is made for the first field.  Only
+        # the time and vertical coordinates are made for two more fields.
+        self.assertEqual(self.converter.misses, 5 + 2)
+        self.assertEqual(self.converter.hits, 4 * 5 - 7)
+
+    def test_coords_copied(self):
+        result_a = self.converter(self.fields[0])
+        result_b = self.converter(self.fields[0])
+        self.assertEqual(result_a, result_b)
+        for (coord_a, _), (coord_b, _) in zip(result_a.dim_coords_and_dims,
+                                              result_b.dim_coords_and_dims):
+            self.assertIsNot(coord_a, coord_b)
+        result_a.attributes['new'] = 'value'
+        self.assertNotIn('new', result_b.attributes)
+
+    def test_max_entries(self):
+        self.converter.MAX_ENTRIES = 3
+        for field in self.fields:
+            self.assertEqual(self.converter(field), convert(field))
+        self.assertLessEqual(len(self.converter._cache), 3)
+
+
+if __name__ == '__main__':
+    tests.main()
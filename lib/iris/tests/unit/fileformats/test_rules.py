@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2010 - 2016, Met Office
+# (C) British Crown Copyright 2010 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -28,13 +28,18 @@ import iris.tests as tests
 
 import types
 
+import numpy as np
+
+import iris
 from iris.aux_factory import HybridHeightFactory
 from iris.cube import Cube
 from iris.fileformats.rules import (ConcreteReferenceTarget,
                                     ConversionMetadata, Factory, Loader,
                                     Reference, ReferenceTarget, load_cubes,
-                                    scalar_cell_method)
-from iris.coords import CellMethod
+                                    scalar_cell_method,
+                                    _make_cube_from_metadata)
+from iris.coords import CellMethod, DimCoord
+from iris.tests import mock
 import iris.tests.stock as stock
 
 
@@ -218,6 +223,50 @@ class TestLoadCubes(tests.IrisTest):
         self.assertEqual(len(cubes[1].aux_factories), 1)
         self.assertEqual(len(cubes[1].coords('surface_altitude')), 1)
 
+    def _constrained_load(self, constraints, callback=None):
+        fields = []
+        for height in (10, 20):
+            field = Mock()
+            field.data = np.zeros(3)
+            field.height = height
+            fields.append(field)
+
+        def field_generator(filename):
+            return fields
+
+        def converter(field):
+            coords_and_dims = [(DimCoord(field.height, long_name='height'),
+                                None)]
+            return ConversionMetadata([], [], None, 'foo', None, {}, [], [],
+                                      coords_and_dims)
+        fake_loader = Loader(field_generator, {}, converter, None)
+        with mock.patch('iris.fileformats.rules._make_cube_from_metadata',
+                        wraps=_make_cube_from_metadata) as make_cube:
+            cubes = list(load_cubes(['fake_filename'], callback, fake_loader,
+                                    constraints=constraints))
+        self.assertEqual(make_cube.call_count, len(cubes))
+        return cubes
+
+    def test_constraints(self):
+        constraint = iris.Constraint('foo', height=iris.Range(15, 25))
+        cubes = self._constrained_load(constraint)
+        self.assertEqual(len(cubes), 1)
+        self.assertArrayEqual(cubes[0].coord('height').points, [20])
+
+    def test_constraints_name(self):
+        self.assertEqual(self._constrained_load(iris.Constraint('bar')), [])
+
+    def test_constraints_opaque(self):
+        constraint = iris.Constraint(height=lambda cell: cell > 15)
+        self.assertEqual(len(self._constrained_load(constraint)), 2)
+
+    def test_constraints_callback(self):
+        # The callback might change the cubes, so no fields are skipped.
+        def callback(cube, field, filename):
+            pass
+        constraint = iris.Constraint(height=iris.Range(15, 25))
+        self.assertEqual(len(self._constrained_load(constraint, callback)), 2)
+
 
 class Test_scalar_cell_method(tests.IrisTest):
     """ Tests for iris.fileformats.rules.scalar_cell_method() function """
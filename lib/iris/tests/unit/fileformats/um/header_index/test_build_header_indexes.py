@@ -0,0 +1,82 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Unit tests for the function
+:func:`iris.fileformats.um._header_index.build_header_indexes`.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# import iris tests first so that some things can be initialised
+# before importing anything else.
+import iris.tests as tests
+
+import os
+import shutil
+import tempfile
+
+import iris
+from iris.fileformats.um import build_header_indexes
+import iris.tests.stock as stock
+
+
+class Test(tests.IrisTest):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.temp_dir, 'sub'))
+        cube = stock.realistic_3d()
+        cube.data = cube.data.astype('f4')
+        self.pp_filenames = [os.path.join(self.temp_dir, 'a.pp'),
+                             os.path.join(self.temp_dir, 'sub', 'b.pp')]
+        for filename in self.pp_filenames:
+            iris.save(cube, filename)
+        iris.save(cube, os.path.join(self.temp_dir, 'c.nc'))
+        with open(os.path.join(self.temp_dir, 'empty'), 'wb'):
+            pass
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _index_exists(self, filename):
+        return os.path.exists(filename + '.iris-index.npz')
+
+    def test_directory(self):
+        result = build_header_indexes(self.temp_dir)
+        self.assertEqual(result, self.pp_filenames)
+        self.assertTrue(all(self._index_exists(filename)
+                            for filename in self.pp_filenames))
+        self.assertFalse(self._index_exists(
+            os.path.join(self.temp_dir, 'c.nc')))
+
+    def test_rebuild(self):
+        build_header_indexes(self.temp_dir)
+        result = build_header_indexes(self.temp_dir)
+        self.assertEqual(result, self.pp_filenames)
+
+    def test_files(self):
+        result = build_header_indexes(self.pp_filenames[::-1])
+        self.assertEqual(result, self.pp_filenames[::-1])
+
+    def test_non_um_file(self):
+        filename = os.path.join(self.temp_dir, 'c.nc')
+        self.assertEqual(build_header_indexes(filename), [])
+
+
+if __name__ == "__main__":
+    tests.main()
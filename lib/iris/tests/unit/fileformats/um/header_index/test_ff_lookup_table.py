@@ -0,0 +1,103 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Unit tests for the function
+:func:`iris.fileformats.um._header_index.ff_lookup_table`.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# import iris tests first so that some things can be initialised
+# before importing anything else.
+import iris.tests as tests
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from iris.fileformats._ff import FF2PP
+from iris.fileformats.um._header_index import ff_lookup_table
+from iris.tests import mock
+
+
+class Test(tests.IrisTest):
+    def setUp(self):
+        # A LOOKUP table of two fields, a terminator and an unused entry,
+        # preceded by a single word.
+        words = np.zeros((4, 64), dtype='>i8')
+        words[:2, :45] = np.arange(90).reshape(2, 45) + 1
+        words[:2, 45:] = np.arange(38, dtype='>f8').reshape(2, 19).view(
+            '>i8')
+        words[2:, 0] = -99
+        self.words = words
+        self.ff_header = mock.Mock(lookup_table=(2, 64, 4))
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, 'test.ff')
+        with open(self.filename, 'wb') as ff_file:
+            ff_file.write(np.zeros(1, dtype='>i8').tobytes())
+            ff_file.write(words.tobytes())
+        self.index_filename = self.filename + '.iris-index.npz'
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _lookup_table(self):
+        with open(self.filename, 'rb') as ff_file:
+            return ff_lookup_table(self.filename, self.ff_header, ff_file, 8)
+
+    def _make_stale_index(self):
+        with open(self.index_filename, 'wb') as index_file:
+            index_file.write(b'stale')
+
+    def test_no_index(self):
+        self.assertIsNone(self._lookup_table())
+
+    def test_index(self):
+        self._make_stale_index()
+        longs, floats = self._lookup_table()
+        self.assertArrayEqual(longs, self.words[:2, :45])
+        self.assertArrayEqual(floats, np.arange(38).reshape(2, 19))
+        # Check the result is now read from the rebuilt index.
+        with mock.patch('numpy.fromfile') as fromfile:
+            longs, floats = self._lookup_table()
+        self.assertEqual(fromfile.call_count, 0)
+        self.assertArrayEqual(longs, self.words[:2, :45])
+        self.assertArrayEqual(floats, np.arange(38).reshape(2, 19))
+
+    def test_FF2PP_lookup_headers(self):
+        # Check that FF2PP gives the same headers with or without an index.
+        with mock.patch('iris.fileformats._ff.FFHeader',
+                        return_value=self.ff_header):
+            ff2pp = FF2PP(self.filename)
+        with open(self.filename, 'rb') as ff_file:
+            expected = list(ff2pp._lookup_headers(ff_file))
+        self._make_stale_index()
+        with open(self.filename, 'rb') as ff_file:
+            result = list(ff2pp._lookup_headers(ff_file))
+        self.assertEqual(len(result), 2)
+        for (result_longs, result_floats), (longs, floats) in zip(result,
+                                                                  expected):
+            self.assertArrayEqual(result_longs, longs)
+            self.assertArrayEqual(result_floats, floats)
+
+
+if __name__ == "__main__":
+    tests.main()
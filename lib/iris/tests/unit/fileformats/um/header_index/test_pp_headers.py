@@ -0,0 +1,121 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Unit tests for the function
+:func:`iris.fileformats.um._header_index.pp_headers`.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# import iris tests first so that some things can be initialised
+# before importing anything else.
+import iris.tests as tests
+
+import os
+import shutil
+import tempfile
+
+import iris
+from iris.fileformats.pp import _scan_headers
+from iris.fileformats.um import build_header_indexes
+from iris.fileformats.um._header_index import pp_headers
+from iris.tests import mock
+import iris.tests.stock as stock
+
+
+class Test(tests.IrisTest):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, 'test.pp')
+        self.index_filename = self.filename + '.iris-index.npz'
+        self.cube = stock.realistic_3d()
+        self.cube.data = self.cube.data.astype('f4')
+        iris.save(self.cube, self.filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _headers(self, scan=_scan_headers):
+        patch = mock.patch('iris.fileformats.pp._scan_headers',
+                           side_effect=scan)
+        with open(self.filename, 'rb') as pp_file, patch as scan_patch:
+            result = pp_headers(self.filename, pp_file)
+        return result, scan_patch.call_count
+
+    def _check_result(self, result):
+        with open(self.filename, 'rb') as pp_file:
+            expected = _scan_headers(pp_file)
+        for result_array, expected_array in zip(result, expected):
+            self.assertArrayEqual(result_array, expected_array)
+
+    def test_no_index(self):
+        result, scans = self._headers()
+        self._check_result(result)
+        self.assertEqual(scans, 1)
+        self.assertFalse(os.path.exists(self.index_filename))
+
+    def test_index(self):
+        build_header_indexes(self.filename)
+        result, scans = self._headers()
+        self._check_result(result)
+        self.assertEqual(scans, 0)
+
+    def test_stale_index(self):
+        build_header_indexes(self.filename)
+        # Rewrite the file with more fields.
+        iris.save([self.cube, self.cube], self.filename)
+        result, scans = self._headers()
+        self._check_result(result)
+        self.assertEqual(len(result[0]), 2 * self.cube.shape[0])
+        self.assertEqual(scans, 1)
+        # Check that the index was rebuilt.
+        result, scans = self._headers()
+        self._check_result(result)
+        self.assertEqual(scans, 0)
+
+    def test_corrupt_index(self):
+        with open(self.index_filename, 'wb') as index_file:
+            index_file.write(b'not an index')
+        result, scans = self._headers()
+        self._check_result(result)
+        self.assertEqual(scans, 1)
+        result, scans = self._headers()
+        self.assertEqual(scans, 0)
+
+    def test_warnings_repeated(self):
+        with open(self.filename, 'ab') as pp_file:
+            pp_file.write(b'\0' * 300)
+        build_header_indexes(self.filename)
+        with mock.patch('warnings.warn') as warn:
+            self._headers()
+        self.assertEqual(warn.call_count, 1)
+        self.assertIn('Skipping the remainder of the file',
+                      str(warn.call_args[0][0]))
+
+    def test_load(self):
+        expected = iris.load_raw(self.filename)
+        build_header_indexes(self.filename)
+        result = iris.load_raw(self.filename)
+        self.assertEqual(str(result), str(expected))
+        self.assertEqual([cube.coords() for cube in result],
+                         [cube.coords() for cube in expected])
+
+
+if __name__ == "__main__":
+    tests.main()
@@ -1,4 +1,4 @@
-# (C) British Crown Copyright 2014 - 2016, Met Office
+# (C) British Crown Copyright 2014 - 2017, Met Office
 #
 # This file is part of Iris.
 #
@@ -54,7 +54,8 @@ class Test_call(tests.IrisTest):
 
         # Check that it called FF2PP in the expected way.
         self.assertEqual(mock_ff2pp_class.call_args_list,
-                         [mock.call('/any/old/file.name', read_data=False)])
+                         [mock.call('/any/old/file.name', read_data=False,
+                                    _pp_filter=None)])
         self.assertEqual(mock_ff2pp_instance.__iter__.call_args_list,
                          [mock.call()])
 
@@ -0,0 +1,103 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for the `iris.io.parallel_loading` context manager."""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import os.path
+import shutil
+import tempfile
+
+import iris
+from iris.io import parallel_loading, _PARALLEL_LOAD_CONTROLS
+import iris.tests.stock as stock
+
+
+class Test_controls(tests.IrisTest):
+    def test_default(self):
+        self.assertIsNone(_PARALLEL_LOAD_CONTROLS.workers)
+
+    def test_context(self):
+        with parallel_loading(workers=3):
+            self.assertEqual(_PARALLEL_LOAD_CONTROLS.workers, 3)
+        self.assertIsNone(_PARALLEL_LOAD_CONTROLS.workers)
+
+    def test_default_workers(self):
+        with parallel_loading():
+            self.assertGreaterEqual(_PARALLEL_LOAD_CONTROLS.workers, 1)
+
+    def test_invalid_workers(self):
+        with self.assertRaisesRegexp(ValueError, 'at least 1'):
+            with parallel_loading(workers=0):
+                pass
+
+
+def _add_source_callback(cube, field, filename):
+    cube.attributes['source_file'] = os.path.basename(filename)
+
+
+class Test_load(tests.IrisTest):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        cube = stock.realistic_3d()
+        cube.data = cube.data.astype('f4')
+        self.filenames = []
+        for i, time_slice in enumerate(cube.slices_over('time')):
+            filename = os.path.join(self.temp_dir, '{}.nc'.format(i))
+            iris.save(time_slice, filename)
+            self.filenames.append(filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _check_same_as_serial(self, load_func, **kwargs):
+        expected = load_func(self.filenames, **kwargs)
+        with parallel_loading(workers=3):
+            result = load_func(self.filenames, **kwargs)
+        self.assertEqual(result, expected)
+
+    def test_load(self):
+        self._check_same_as_serial(iris.load)
+
+    def test_load_raw(self):
+        self._check_same_as_serial(iris.load_raw)
+
+    def test_load_raw_order(self):
+        with parallel_loading(workers=3):
+            cubes = iris.load_raw(self.filenames,
+                                  callback=_add_source_callback)
+        names = [cube.attributes['source_file'] for cube in cubes]
+        self.assertEqual(names, [os.path.basename(filename)
+                                 for filename in self.filenames])
+
+    def test_constraint(self):
+        self._check_same_as_serial(
+            iris.load, constraints='air_potential_temperature')
+
+    def test_lazy(self):
+        with parallel_loading(workers=2):
+            cubes = iris.load_raw(self.filenames)
+        self.assertTrue(all(cube.has_lazy_data() for cube in cubes))
+
+
+if __name__ == "__main__":
+    tests.main()
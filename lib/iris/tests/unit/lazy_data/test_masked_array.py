@@ -0,0 +1,186 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for the :func:`iris._lazy_data.masked_array` function."""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import biggus
+import numpy as np
+import numpy.ma as ma
+
+from iris._lazy_data import masked_array
+from iris.tests import mock
+
+
+class _PlainProxy(object):
+    # A minimal data proxy.
+    def __init__(self, data):
+        self.data = data
+        self.shape = data.shape
+        self.dtype = data.dtype
+        self.ndim = data.ndim
+
+    def __getitem__(self, keys):
+        return self.data[keys]
+
+
+class _Proxy(_PlainProxy):
+    # A data proxy which supports batch reads, and records them.
+    batches = []
+
+    @staticmethod
+    def _batch_read(proxies):
+        _Proxy.batches.append(len(proxies))
+        for i in reversed(range(len(proxies))):
+            yield i, proxies[i].data
+
+
+class Test(tests.IrisTest):
+    def setUp(self):
+        _Proxy.batches = []
+
+    def _stack(self, datas, proxy_class=_Proxy):
+        stack = np.empty(len(datas), dtype=object)
+        for i, data in enumerate(datas):
+            stack[i] = biggus.NumpyArrayAdapter(proxy_class(data))
+        return biggus.ArrayStack(stack)
+
+    def test_batch_read(self):
+        datas = [np.arange(6.).reshape(2, 3) + 10 * i for i in range(3)]
+        result = masked_array(self._stack(datas))
+        self.assertEqual(_Proxy.batches, [3])
+        self.assertIsInstance(result, ma.MaskedArray)
+        self.assertIs(result.mask, ma.nomask)
+        self.assertArrayEqual(result, np.array(datas))
+
+    def test_batch_read_masked(self):
+        datas = [ma.masked_array([1., 2.]),
+                 ma.masked_array([3., 4.], mask=[False, True])]
+        result = masked_array(self._stack(datas))
+        self.assertEqual(_Proxy.batches, [2])
+        self.assertMaskedArrayEqual(result, ma.array(datas))
+
+    def test_indexed_items(self):
+        datas = [np.arange(4.) + 10 * i for i in range(2)]
+        array = self._stack(datas)[:, 1:3]
+        result = masked_array(array)
+        self.assertEqual(_Proxy.batches, [])
+        self.assertArrayEqual(result, np.array(datas)[:, 1:3])
+
+    def test_no_batch_read(self):
+        datas = [np.arange(4.) + 10 * i for i in range(2)]
+        result = masked_array(self._stack(datas, _PlainProxy))
+        self.assertEqual(_Proxy.batches, [])
+        self.assertArrayEqual(result, np.array(datas))
+
+    def test_not_a_stack(self):
+        data = np.arange(4.)
+        result = masked_array(biggus.NumpyArrayAdapter(data))
+        self.assertEqual(_Proxy.batches, [])
+        self.assertArrayEqual(result, data)
+
+
+class _ChunkedProxy(_PlainProxy):
+    # A data proxy which describes the chunking of its data, and records
+    # the keys of each read.
+    def __init__(self, data, chunks):
+        super(_ChunkedProxy, self).__init__(data)
+        self.chunks = chunks
+        self.reads = []
+
+    def __getitem__(self, keys):
+        self.reads.append(keys)
+        return self.data[keys]
+
+
+class Test_chunked_aggregation(tests.IrisTest):
+    def setUp(self):
+        self.data = np.arange(120.).reshape(6, 4, 5)
+        patch = mock.patch('iris._lazy_data._MAX_BLOCK_BYTES', 24 * 8)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def _check_reads(self, proxy):
+        # Each read is of whole chunks, and each element is read once.
+        reads = np.zeros(self.data.shape, dtype=int)
+        for keys in proxy.reads:
+            for key, chunk in zip(keys, proxy.chunks):
+                self.assertEqual(key.start % chunk, 0)
+            reads[keys] += 1
+        self.assertTrue(np.all(reads == 1))
+
+    def test_mean(self):
+        proxy = _ChunkedProxy(self.data, (2, 2, 5))
+        array = biggus.mean(biggus.OrthoArrayAdapter(proxy), axis=0)
+        result = masked_array(array)
+        self.assertArrayAlmostEqual(result, self.data.mean(axis=0))
+        self._check_reads(proxy)
+        self.assertGreater(len(proxy.reads), 1)
+
+    def test_middle_axis(self):
+        proxy = _ChunkedProxy(self.data, (3, 4, 2))
+        array = biggus.mean(biggus.OrthoArrayAdapter(proxy), axis=1)
+        result = masked_array(array)
+        self.assertArrayAlmostEqual(result, self.data.mean(axis=1))
+        self._check_reads(proxy)
+
+    def test_std(self):
+        proxy = _ChunkedProxy(self.data, (1, 4, 5))
+        array = biggus.std(biggus.OrthoArrayAdapter(proxy), axis=0)
+        result = masked_array(array)
+        self.assertArrayAlmostEqual(result, self.data.std(axis=0))
+        self._check_reads(proxy)
+
+    def test_masked(self):
+        data = ma.masked_greater(self.data, 100.)
+        proxy = _ChunkedProxy(data, (2, 2, 2))
+        array = biggus.mean(biggus.OrthoArrayAdapter(proxy), axis=0)
+        result = masked_array(array)
+        self.assertMaskedArrayAlmostEqual(result, data.mean(axis=0))
+
+    def test_single_dimension(self):
+        data = np.arange(50.)
+        proxy = _ChunkedProxy(data, (10,))
+        array = biggus.mean(biggus.OrthoArrayAdapter(proxy), axis=0)
+        result = masked_array(array)
+        self.assertEqual(result.shape, ())
+        self.assertAlmostEqual(result, 24.5)
+        self.assertEqual(proxy.reads, [(slice(0, 20),), (slice(20, 40),),
+                                       (slice(40, 50),)])
+
+    def test_not_chunked(self):
+        proxy = _ChunkedProxy(self.data, None)
+        array = biggus.mean(biggus.OrthoArrayAdapter(proxy), axis=0)
+        result = masked_array(array)
+        self.assertArrayAlmostEqual(result, self.data.mean(axis=0))
+        self.assertEqual(len(proxy.reads), 1)
+
+    def test_indexed_source(self):
+        proxy = _ChunkedProxy(self.data, (2, 2, 5))
+        array = biggus.mean(biggus.OrthoArrayAdapter(proxy)[:, 1:], axis=0)
+        result = masked_array(array)
+        self.assertArrayAlmostEqual(result, self.data[:, 1:].mean(axis=0))
+        self.assertEqual(len(proxy.reads), 1)
+
+
+if __name__ == '__main__':
+    tests.main()
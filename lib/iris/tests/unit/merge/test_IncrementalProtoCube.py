@@ -0,0 +1,137 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for the `iris._merge.IncrementalProtoCube` class."""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import numpy as np
+
+from iris._merge import IncrementalProtoCube
+from iris.coords import DimCoord
+from iris.cube import Cube
+from iris.exceptions import MergeError
+
+
+def _make_cube(time, height=None, forecast_period=None,
+               forecast_reference_time=0):
+    cube = Cube(np.arange(3) + time, standard_name='air_temperature',
+                units='K')
+    cube.add_aux_coord(DimCoord(time, standard_name='time',
+                                units='hours since 1970-01-01'))
+    cube.add_aux_coord(DimCoord(forecast_reference_time,
+                                standard_name='forecast_reference_time',
+                                units='hours since 1970-01-01'))
+    if height is not None:
+        cube.add_aux_coord(DimCoord(height, standard_name='height',
+                                    units='m'))
+    if forecast_period is not None:
+        cube.add_aux_coord(DimCoord(forecast_period,
+                                    standard_name='forecast_period',
+                                    units='hours'))
+    return cube
+
+
+def _proto_cube(cubes):
+    proto_cube = IncrementalProtoCube(cubes[0])
+    for cube in cubes[1:]:
+        proto_cube.register(cube, error_on_mismatch=True)
+    return proto_cube
+
+
+class Test_merge(tests.IrisTest):
+    def test_extend(self):
+        proto_cube = _proto_cube([_make_cube(0), _make_cube(1)])
+        cube, = proto_cube.merge()
+        self.assertEqual(cube.shape, (2, 3))
+        self.assertTrue(proto_cube.register(_make_cube(2)))
+        cube, = proto_cube.merge()
+        self.assertEqual(cube.shape, (3, 3))
+        self.assertArrayEqual(cube.coord('time').points, [0, 1, 2])
+        self.assertArrayEqual(cube.data[:, 0], [0, 1, 2])
+        self.assertEqual(cube.coord_dims('time'), (0,))
+
+    def test_extend_unordered(self):
+        proto_cube = _proto_cube([_make_cube(1), _make_cube(2)])
+        proto_cube.merge()
+        proto_cube.register(_make_cube(0))
+        cube, = proto_cube.merge()
+        self.assertArrayEqual(cube.coord('time').points, [0, 1, 2])
+        self.assertArrayEqual(cube.data[:, 0], [0, 1, 2])
+
+    def test_incomplete(self):
+        proto_cube = _proto_cube([_make_cube(t, height=h)
+                                  for t in range(2) for h in range(2)])
+        cube, = proto_cube.merge()
+        self.assertEqual(cube.shape, (2, 2, 3))
+        proto_cube.register(_make_cube(2, height=0))
+        with self.assertRaisesRegexp(MergeError, 'fill only 5 of the 6'):
+            proto_cube.merge()
+        proto_cube.register(_make_cube(2, height=1))
+        cube, = proto_cube.merge()
+        self.assertEqual(cube.shape, (3, 2, 3))
+
+    def test_dependent(self):
+        proto_cube = _proto_cube([_make_cube(t, forecast_period=t)
+                                  for t in range(2)])
+        proto_cube.merge()
+        proto_cube.register(_make_cube(2, forecast_period=2))
+        cube, = proto_cube.merge()
+        self.assertArrayEqual(cube.coord('forecast_period').points,
+                              [0, 1, 2])
+        self.assertEqual(cube.coord_dims('forecast_period'), (0,))
+
+
+class Test_register(tests.IrisTest):
+    def test_scalar_changed(self):
+        proto_cube = _proto_cube([_make_cube(0), _make_cube(1)])
+        proto_cube.merge()
+        with self.assertRaisesRegexp(MergeError, 'forecast_reference_time'):
+            proto_cube.register(_make_cube(2, forecast_reference_time=1))
+        # The rejected cube is not registered.
+        cube, = proto_cube.merge()
+        self.assertEqual(cube.shape, (2, 3))
+
+    def test_function_broken(self):
+        proto_cube = _proto_cube([_make_cube(t, forecast_period=t)
+                                  for t in range(2)])
+        proto_cube.merge()
+        with self.assertRaisesRegexp(MergeError, 'forecast_period'):
+            proto_cube.register(_make_cube(1, forecast_period=5))
+
+    def test_before_merge(self):
+        # Until the first merge, the structure is not constrained.
+        proto_cube = _proto_cube([_make_cube(0), _make_cube(1)])
+        self.assertTrue(proto_cube.register(
+            _make_cube(2, forecast_reference_time=1)))
+        cube, = proto_cube.merge()
+        self.assertEqual(cube.shape, (3, 3))
+
+    def test_signature_mismatch(self):
+        proto_cube = _proto_cube([_make_cube(0), _make_cube(1)])
+        proto_cube.merge()
+        cube = _make_cube(2)
+        cube.units = 'degC'
+        self.assertFalse(proto_cube.register(cube))
+
+
+if __name__ == '__main__':
+    tests.main()
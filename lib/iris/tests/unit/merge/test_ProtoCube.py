@@ -532,5 +532,52 @@ class Test_register__CoordSig_aux(_MergeTest_coordprops_vect, tests.IrisTest):
         self.cube2 = self.cube1.copy()
 
 
+class Test_merge__data(tests.IrisTest):
+    def _merge(self, datas):
+        cubes = []
+        for i, data in enumerate(datas):
+            cube = iris.cube.Cube(data)
+            cube.add_aux_coord(AuxCoord([i], long_name='level'))
+            cubes.append(cube)
+        proto_cube = ProtoCube(cubes[0])
+        for cube in cubes[1:]:
+            proto_cube.register(cube)
+        with mock.patch('biggus.ArrayStack') as array_stack:
+            result, = proto_cube.merge()
+        self.assertEqual(array_stack.call_count, 0)
+        return result.data
+
+    def test_unmasked(self):
+        data = self._merge([np.arange(3, dtype='f4'),
+                            ma.arange(3, dtype='f4') + 3])
+        self.assertNotIsInstance(data, ma.MaskedArray)
+        self.assertEqual(data.dtype, np.dtype('f4'))
+        self.assertArrayEqual(data, np.arange(6).reshape(2, 3))
+
+    def test_masked(self):
+        data = self._merge([np.arange(3),
+                            ma.masked_array([3, 4, 5],
+                                            mask=[False, True, False])])
+        self.assertMaskedArrayEqual(
+            data, ma.masked_array([[0, 1, 2], [3, 4, 5]],
+                                  mask=[[False, False, False],
+                                        [False, True, False]]))
+
+    def test_masked_fill_value(self):
+        datas = [ma.masked_array([0, 1, 2], mask=[True, False, False],
+                                 fill_value=-999),
+                 ma.masked_array([3, 4, 5], fill_value=-999)]
+        data = self._merge(datas)
+        self.assertEqual(data.fill_value, -999)
+
+    def test_masked_mixed_fill_values(self):
+        datas = [ma.masked_array([0, 1, 2], mask=[True, False, False],
+                                 fill_value=-999),
+                 ma.masked_array([3, 4, 5], fill_value=-1)]
+        data = self._merge(datas)
+        self.assertEqual(data.fill_value,
+                         ma.default_fill_value(data.dtype))
+
+
 if __name__ == "__main__":
     tests.main()
@@ -0,0 +1,96 @@
+# (C) British Crown Copyright 2017, Met Office
+#
+# This file is part of Iris.
+#
+# Iris is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Iris is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Iris.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Unit tests for :func:`iris._merge.encode_positions` and
+:func:`iris._merge.derive_coded_relation_matrix`.
+
+"""
+
+from __future__ import (absolute_import, division, print_function)
+from six.moves import (filter, input, map, range, zip)  # noqa
+
+# Import iris.tests first so that some things can be initialised before
+# importing anything else.
+import iris.tests as tests
+
+import itertools
+
+from iris._merge import (build_indexes, derive_coded_relation_matrix,
+                         derive_relation_matrix, encode_positions)
+from iris.coords import Cell
+
+
+class Test_encode_positions(tests.IrisTest):
+    def test_codes(self):
+        positions = [{'a': Cell(0), 'b': Cell(10, (5, 15))},
+                     {'a': Cell(1), 'b': Cell(10, (5, 15))},
+                     {'a': Cell(0), 'b': Cell(20, (15, 25))}]
+        scalars, codes = encode_positions(positions)
+        self.assertEqual(scalars['a'], {Cell(0): 0, Cell(1): 1})
+        self.assertEqual(scalars['b'], {Cell(10, (5, 15)): 0,
+                                        Cell(20, (15, 25)): 1})
+        self.assertArrayEqual(codes['a'], [0, 1, 0])
+        self.assertArrayEqual(codes['b'], [0, 0, 1])
+
+    def test_unhashable(self):
+        positions = [{'a': 0, 'b': [1]},
+                     {'a': 1, 'b': [1]}]
+        with self.assertRaises(TypeError):
+            encode_positions(positions)
+
+
+class Test_derive_coded_relation_matrix(tests.IrisTest):
+    def _check(self, positions):
+        expected = derive_relation_matrix(build_indexes(positions))
+        result = derive_coded_relation_matrix(*encode_positions(positions))
+        self.assertEqual(result, expected)
+        return result
+
+    def test_inseparable(self):
+        positions = [{'a': 0, 'b': 10, 'c': 100},
+                     {'a': 1, 'b': 10, 'c': 200},
+                     {'a': 2, 'b': 20, 'c': 300}]
+        result = self._check(positions)
+        self.assertEqual(result['a'].inseparable, set(['b', 'c']))
+
+    def test_separable(self):
+        positions = [{'a': a, 'b': b, 'c': a * 10 + b}
+                     for a, b in itertools.product(range(3), range(4))]
+        result = self._check(positions)
+        self.assertEqual(result['a'].separable, set(['b']))
+        self.assertEqual(result['a'].inseparable, set(['c']))
+
+    def test_partial_product(self):
+        # One (a, b) combination is missing.
+        positions = [{'a': a, 'b': b}
+                     for a, b in itertools.product(range(3), range(3))
+                     if (a, b) != (1, 1)]
+        result = self._check(positions)
+        self.assertEqual(result['a'].inseparable, set(['b']))
+
+    def test_duplicates(self):
+        positions = [{'a': a, 'b': b, 'c': 0}
+                     for a, b in itertools.product(range(2), range(2))] * 2
+        result = self._check(positions)
+        self.assertEqual(result['c'].separable, set(['a', 'b']))
+
+    def test_single_candidate(self):
+        self._check([{'a': 0}, {'a': 1}])
+
+
+if __name__ == '__main__':
+    tests.main()